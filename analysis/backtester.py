@@ -0,0 +1,420 @@
+import glob
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from .trend_predictor import TrendPredictor
+
+# 每個工作進程內的回測數據，由_init_worker在進程啟動時載入
+_worker_data = None
+
+
+def load_prices(csv_path, price_column=None):
+    """
+    讀取本地股價CSV（例如Yahoo Finance匯出的歷史股價）
+
+    參數:
+        csv_path: CSV文件路徑，需包含日期列（Date/date/日期）和收盤價列
+        price_column: 可選，收盤價列名，默認依次嘗試 Adj Close、Close、收盤價
+
+    返回:
+        pandas.Series: 以日期為索引、按日期排序的收盤價
+    """
+    import pandas as pd
+
+    prices = pd.read_csv(csv_path)
+    columns = {column.lower(): column for column in prices.columns}
+
+    date_column = columns.get("date") or columns.get("日期")
+    if date_column is None:
+        raise ValueError(f"股價文件缺少日期列: {csv_path}")
+    if price_column is None:
+        price_column = columns.get("adj close") or columns.get("close") or columns.get("收盤價")
+    if price_column not in prices.columns:
+        raise ValueError(f"股價文件缺少收盤價列: {csv_path}")
+
+    series = pd.Series(pd.to_numeric(prices[price_column], errors="coerce").values,
+                       index=pd.to_datetime(prices[date_column], errors="coerce"))
+    series = series[series.index.notna()].dropna()
+    return series[~series.index.duplicated(keep="last")].sort_index()
+
+
+def load_stored_sentiments(ticker, data_dir="data", analyzer=None):
+    """
+    讀取DataManager保存的某個關鍵字的全部新聞，去重後計算情感得分
+
+    新聞文件以保存時的關鍵字命名；關鍵字能解析為股票時，以代號、簡稱或別名保存的新聞都會讀取，
+    與情感匯總的歸類方式一致。情感得分經由分析器的持久化緩存計算，已分析過的文章不會重新評分。
+
+    參數:
+        ticker: 股票代號、簡稱或關鍵字
+        data_dir: 數據目錄
+        analyzer: 可選，SentimentAnalyzer實例，默認使用共用分析器
+
+    返回:
+        list: 每條新聞的情感結果（含date和sentiment），與analyze返回的news_sentiments相同結構
+    """
+    from utils.data_manager import load_news_file
+
+    if analyzer is None:
+        from .registry import get_analyzer
+        analyzer = get_analyzer()
+
+    from .registry import get_entity_linker
+
+    linker = get_entity_linker()
+    ticker_key = linker.ticker_key(ticker)
+    json_paths = []
+    for json_path in sorted(glob.glob(os.path.join(data_dir, "news", "*_*.json"))):
+        # 文件名為 YYYYMMDD_HHMMSS_<關鍵字>.json
+        keyword = os.path.basename(json_path)[16:-5]
+        if keyword and linker.ticker_key(keyword) == ticker_key:
+            json_paths.append(json_path)
+
+    news_list = []
+    seen = set()
+    for json_path in json_paths:
+        for news in load_news_file(json_path):
+            identity = news.get("link") or news.get("title")
+            if identity in seen:
+                continue
+            seen.add(identity)
+            news_list.append(news)
+
+    if not news_list:
+        return []
+    return analyzer.analyze(news_list, extract_keywords=False)["news_sentiments"]
+
+
+def _prepare_ticker(prices, news_sentiments, lookback_hours, horizon, decision_time):
+    """
+    把一個股票的新聞和股價整理為回測所需的數組
+
+    每個交易日的決策時間為一個評估點，窗口為 (決策時間 - lookback_hours, 決策時間] 內發布的新聞，
+    不使用決策時間之後的新聞。所有窗口展開為 (窗口ID, 新聞) 配對數組，後續參數掃描只需重算權重。
+    """
+    predictor = TrendPredictor()
+
+    # 無法解析的日期被_to_timestamps替換為基準時間（1970-01-01），回測時無法定位，直接丟棄
+    timestamps = predictor._to_timestamps([item.get("date") for item in news_sentiments], datetime(1970, 1, 1))
+    compounds = np.fromiter((item["sentiment"]["compound"] for item in news_sentiments),
+                            dtype=np.float64, count=len(news_sentiments))
+    valid = timestamps > 0
+    order = np.argsort(timestamps[valid], kind="stable")
+    timestamps = timestamps[valid][order]
+    compounds = compounds[valid][order]
+
+    hour, minute = (int(part) for part in decision_time.split(":"))
+    eval_times = (prices.index.values.astype("datetime64[D]").astype("datetime64[s]")
+                  + np.timedelta64(hour * 3600 + minute * 60, "s")).astype(np.int64)
+
+    # 未來horizon個交易日的收盤價報酬，最後horizon天沒有結果
+    closes = prices.values.astype(np.float64)
+    forward_returns = np.full(len(closes), np.nan)
+    if len(closes) > horizon:
+        forward_returns[:-horizon] = closes[horizon:] / closes[:-horizon] - 1
+
+    # 每個評估點的窗口範圍
+    starts = np.searchsorted(timestamps, eval_times - int(lookback_hours * 3600), side="right")
+    ends = np.searchsorted(timestamps, eval_times, side="right")
+    counts = ends - starts
+
+    # 展開為配對數組；文章已按時間排序，每個窗口內的配對也按時間排序
+    window_ids = np.repeat(np.arange(len(eval_times)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    article_index = np.repeat(starts, counts) + offsets
+
+    pair_timestamps = timestamps[article_index]
+    return {
+        "counts": counts,
+        "forward_returns": forward_returns,
+        "window_ids": window_ids,
+        "pair_timestamps": pair_timestamps,
+        "pair_compounds": compounds[article_index],
+        "pair_hours": (eval_times[window_ids] - pair_timestamps) / 3600.0
+    }
+
+
+def _predict_windows(prepared, params):
+    """
+    以向量運算重放TrendPredictor在每個評估點的預測
+
+    返回:
+        numpy.ndarray: 每個評估點的預測方向（1看漲、-1看跌、0震盪），新聞少於2條的評估點為NaN
+    """
+    predictor = TrendPredictor()
+    n_windows = len(prepared["counts"])
+    compounds = prepared["pair_compounds"]
+
+    # 與TrendPredictor._apply_weights相同的時間權重和情感權重，只是每個配對有各自的基準時間
+    sentiment_weights = np.where(compounds > 0, params["positive_weight"], params["negative_weight"])
+    weighted = compounds * sentiment_weights * np.power(params["time_decay_factor"], prepared["pair_hours"])
+    weighted_avg = (np.bincount(prepared["window_ids"], weights=weighted, minlength=n_windows)
+                    / np.maximum(prepared["counts"], 1))
+
+    momentum = predictor._group_momentum(prepared["window_ids"], prepared["pair_timestamps"], compounds, n_windows)
+    trend_scores = weighted_avg + momentum * 0.5
+
+    threshold = params["trend_threshold"]
+    calls = np.where(trend_scores > threshold, 1.0, np.where(trend_scores < -threshold, -1.0, 0.0))
+    return np.where(prepared["counts"] >= 2, calls, np.nan)
+
+
+def _evaluate(calls, returns, windows, horizon, flat_band):
+    """
+    根據預測方向和實際報酬計算命中率和報酬統計
+
+    參數:
+        calls: 預測方向數組
+        returns: 對應的未來報酬數組
+        windows: 有未來報酬的評估點數，用於計算覆蓋率
+        horizon: 報酬的交易日數，用於年化
+        flat_band: 震盪預測視為正確的報酬絕對值上限
+    """
+    bullish = calls == 1
+    bearish = calls == -1
+    neutral = calls == 0
+    directional = bullish | bearish
+    correct = (bullish & (returns > 0)) | (bearish & (returns < 0))
+
+    def rate(hits, total):
+        return float(hits.sum() / total.sum()) if total.any() else None
+
+    def mean(values):
+        return float(values.mean()) if len(values) else None
+
+    # 看漲做多、看跌做空、震盪空手的策略報酬
+    strategy_returns = calls * returns
+    std = strategy_returns.std() if len(strategy_returns) > 1 else 0.0
+    sharpe = float(strategy_returns.mean() / std * np.sqrt(252 / horizon)) if std > 0 else None
+
+    return {
+        "evaluations": int(len(calls)),
+        "coverage": len(calls) / windows if windows else None,
+        "bullish": int(bullish.sum()),
+        "bearish": int(bearish.sum()),
+        "neutral": int(neutral.sum()),
+        "hit_rate": rate(correct, directional),
+        "bullish_hit_rate": rate(correct & bullish, bullish),
+        "bearish_hit_rate": rate(correct & bearish, bearish),
+        "neutral_hit_rate": rate(neutral & (np.abs(returns) < flat_band), neutral),
+        "accuracy": float((correct | (neutral & (np.abs(returns) < flat_band))).mean()) if len(calls) else None,
+        "avg_return_bullish": mean(returns[bullish]),
+        "avg_return_bearish": mean(returns[bearish]),
+        "avg_return_neutral": mean(returns[neutral]),
+        "strategy_avg_return": mean(strategy_returns),
+        "strategy_total_return": float(strategy_returns.sum()),
+        "strategy_sharpe": sharpe
+    }
+
+
+def _run_params(data, params, horizon, flat_band):
+    """計算一組參數在所有股票上的回測結果"""
+    results = {}
+    all_calls = []
+    all_returns = []
+    total_windows = 0
+    for ticker, prepared in data.items():
+        calls = _predict_windows(prepared, params)
+        returns = prepared["forward_returns"]
+        has_return = ~np.isnan(returns)
+        evaluated = has_return & ~np.isnan(calls)
+        results[ticker] = _evaluate(calls[evaluated], returns[evaluated], int(has_return.sum()), horizon, flat_band)
+        all_calls.append(calls[evaluated])
+        all_returns.append(returns[evaluated])
+        total_windows += int(has_return.sum())
+
+    overall = _evaluate(np.concatenate(all_calls), np.concatenate(all_returns), total_windows, horizon, flat_band)
+    return {"params": params, "tickers": results, "overall": overall}
+
+
+def _init_worker(data, horizon, flat_band):
+    """工作進程初始化：保存回測數據，之後每個任務只需傳遞參數"""
+    global _worker_data
+    _worker_data = (data, horizon, flat_band)
+
+
+def _run_in_worker(params):
+    """在工作進程中計算一組參數"""
+    data, horizon, flat_band = _worker_data
+    return _run_params(data, params, horizon, flat_band)
+
+
+class Backtester:
+    """
+    趨勢預測回測器
+
+    用歷史新聞情感和本地股價重放TrendPredictor的每日預測，統計每個股票、每組參數的命中率和報酬，
+    並可並行掃描時間衰減因子、情感權重等參數。
+    """
+
+    # 可以掃描的參數
+    PARAMETERS = ("time_decay_factor", "positive_weight", "negative_weight", "trend_threshold")
+
+    def __init__(self, lookback_hours=24, horizon=1, decision_time="13:30", flat_band=0.01):
+        """
+        初始化回測器
+
+        參數:
+            lookback_hours: 每次預測使用的新聞時間範圍（小時），與爬蟲的hours參數對應
+            horizon: 驗證預測的持有交易日數
+            decision_time: 每個交易日做出預測的時間（台股收盤13:30），只使用此時間前的新聞
+            flat_band: 震盪預測視為正確的報酬絕對值上限
+        """
+        self.lookback_hours = lookback_hours
+        self.horizon = horizon
+        self.decision_time = decision_time
+        self.flat_band = flat_band
+        self.data = {}
+
+    def add_ticker(self, ticker, prices, news_sentiments):
+        """
+        加入一個股票的回測數據
+
+        參數:
+            ticker: 股票代號
+            prices: 以日期為索引的收盤價（load_prices的結果）
+            news_sentiments: 新聞情感結果列表（analyze返回的news_sentiments）
+        """
+        self.data[ticker] = _prepare_ticker(prices, news_sentiments, self.lookback_hours,
+                                            self.horizon, self.decision_time)
+
+    @classmethod
+    def from_store(cls, tickers, data_dir="data", price_dir=None, analyzer=None, **options):
+        """
+        從保存的新聞和 data/prices/<股票代號>.csv 建立回測器
+
+        參數:
+            tickers: 股票代號或簡稱列表
+            data_dir: 數據目錄
+            price_dir: 股價CSV目錄，默認為 data_dir/prices
+            analyzer: 可選，SentimentAnalyzer實例
+            options: 傳給Backtester的參數
+
+        返回:
+            Backtester: 回測器，缺少股價文件或新聞的股票會被跳過
+        """
+        from .registry import get_entity_linker
+
+        price_dir = price_dir or os.path.join(data_dir, "prices")
+        backtester = cls(**options)
+        for ticker in tickers:
+            price_path = os.path.join(price_dir, f"{ticker}.csv")
+            if not os.path.exists(price_path):
+                # 以簡稱回測時使用以股票代號命名的股價文件
+                price_path = os.path.join(price_dir, f"{get_entity_linker().ticker_key(ticker)}.csv")
+            if not os.path.exists(price_path):
+                print(f"找不到 {ticker} 的股價文件: {price_path}")
+                continue
+            news_sentiments = load_stored_sentiments(ticker, data_dir, analyzer)
+            if not news_sentiments:
+                print(f"沒有 {ticker} 的歷史新聞")
+                continue
+            backtester.add_ticker(ticker, load_prices(price_path), news_sentiments)
+        return backtester
+
+    def default_params(self):
+        """TrendPredictor當前使用的參數"""
+        predictor = TrendPredictor()
+        return {
+            "time_decay_factor": predictor.time_decay_factor,
+            "positive_weight": predictor.positive_weight,
+            "negative_weight": predictor.negative_weight,
+            "trend_threshold": 0.1
+        }
+
+    def _full_params(self, params):
+        """以預設參數補全部分參數"""
+        unknown = set(params or {}) - set(self.PARAMETERS)
+        if unknown:
+            raise ValueError(f"不支持的回測參數: {', '.join(sorted(unknown))}")
+        full = self.default_params()
+        full.update(params or {})
+        return full
+
+    def run(self, params=None):
+        """
+        用一組參數回測所有股票
+
+        參數:
+            params: 可選，覆蓋預設值的參數字典
+
+        返回:
+            dict: 參數、每個股票的統計（tickers）和合併統計（overall）
+        """
+        if not self.data:
+            raise ValueError("沒有可回測的股票數據")
+        return _run_params(self.data, self._full_params(params), self.horizon, self.flat_band)
+
+    def sweep(self, grid, workers=None, sort_by="hit_rate"):
+        """
+        網格掃描參數，多組參數在進程池中並行計算
+
+        參數:
+            grid: {參數名: 候選值列表}，未列出的參數使用預設值
+            workers: 工作進程數，默認為CPU核心數，1表示在當前進程計算
+            sort_by: 按合併統計中的哪一項由高到低排序
+
+        返回:
+            list: 每組參數的回測結果
+        """
+        if not self.data:
+            raise ValueError("沒有可回測的股票數據")
+        names = list(grid)
+        param_sets = [self._full_params(dict(zip(names, values)))
+                      for values in itertools.product(*(grid[name] for name in names))]
+
+        workers = min(workers or os.cpu_count(), len(param_sets))
+        if workers <= 1:
+            results = [_run_params(self.data, params, self.horizon, self.flat_band) for params in param_sets]
+        else:
+            # 回測數據只在進程啟動時傳遞一次
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.data, self.horizon, self.flat_band)) as executor:
+                results = list(executor.map(_run_in_worker, param_sets, chunksize=max(1, len(param_sets) // (workers * 4))))
+
+        if sort_by:
+            results.sort(key=lambda result: (result["overall"].get(sort_by) is not None,
+                                             result["overall"].get(sort_by) or 0), reverse=True)
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="趨勢預測回測與參數掃描")
+    parser.add_argument("tickers", nargs="+", help="股票代號，股價文件為 data/prices/<股票代號>.csv")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--lookback", type=float, default=24, help="每次預測使用的新聞小時數")
+    parser.add_argument("--horizon", type=int, default=1, help="驗證預測的持有交易日數")
+    parser.add_argument("--decay", type=float, nargs="+", help="掃描的time_decay_factor")
+    parser.add_argument("--positive-weight", type=float, nargs="+", help="掃描的positive_weight")
+    parser.add_argument("--negative-weight", type=float, nargs="+", help="掃描的negative_weight")
+    parser.add_argument("--threshold", type=float, nargs="+", help="掃描的趨勢判斷閾值")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10, help="顯示前幾組參數")
+    parser.add_argument("--output", help="可選，完整結果的JSON輸出路徑")
+    args = parser.parse_args()
+
+    backtester = Backtester.from_store(args.tickers, data_dir=args.data_dir,
+                                       lookback_hours=args.lookback, horizon=args.horizon)
+    grid = {name: values for name, values in (("time_decay_factor", args.decay),
+                                               ("positive_weight", args.positive_weight),
+                                               ("negative_weight", args.negative_weight),
+                                               ("trend_threshold", args.threshold)) if values}
+    results = backtester.sweep(grid, workers=args.workers)
+
+    for result in results[:args.top]:
+        overall = result["overall"]
+        hit_rate = f"{overall['hit_rate']:.2%}" if overall["hit_rate"] is not None else "-"
+        print(f"{result['params']}  命中率: {hit_rate}  評估次數: {overall['evaluations']}  "
+              f"策略累計報酬: {overall['strategy_total_return']:.2%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"結果已保存: {args.output}")
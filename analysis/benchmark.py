@@ -0,0 +1,443 @@
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from .entity_linker import BUNDLED_TICKER_TABLE
+
+# 默認的基準結果文件，用於比較吞吐量是否退化
+BASELINE_PATH = os.path.join("data", "benchmarks", "baseline.json")
+
+STAGES = ("analyze", "analyze_cached", "keywords", "trend", "stream")
+ENGINES = ("jieba", "automaton", "transformer")
+LANGS = ("zh", "en", "mixed")
+
+# 合成語料的固定基準時間，使同一個seed產生完全相同的語料
+_CORPUS_REFERENCE_TIME = datetime(2025, 1, 1, 13, 30)
+
+_ZH_TOPICS = ["營收", "獲利", "毛利率", "法說會", "財報", "股價", "訂單", "出貨", "資本支出", "股利",
+              "外資", "投信", "庫存", "產能", "新廠", "AI伺服器", "電動車", "半導體", "先進製程", "季報"]
+_ZH_POSITIVE = ["創新高", "大幅成長", "優於預期", "強勁", "看好", "上漲", "買超", "調升目標價", "利多", "突破"]
+_ZH_NEGATIVE = ["下滑", "不如預期", "疲軟", "擔憂", "下跌", "賣超", "調降目標價", "利空", "衰退", "虧損"]
+_ZH_NEUTRAL = ["持平", "符合預期", "觀望", "整理", "公布", "說明", "維持", "表示"]
+_ZH_ACTORS = ["外資", "法人", "分析師", "投資人", "董事長", "市場", "券商", "投信"]
+_ZH_FILLERS = ["根據最新公布的資料", "市場人士指出", "公司在記者會上表示", "法人預估", "展望下半年",
+               "受到國際情勢影響", "隨著旺季到來", "在美國降息預期下"]
+
+_EN_TOPICS = ["revenue", "earnings", "gross margin", "guidance", "orders", "shipments", "capex", "dividend",
+              "AI servers", "chip demand", "inventory", "capacity"]
+_EN_POSITIVE = ["surge", "beat estimates", "strong", "record high", "upgrade", "rally", "gain", "robust"]
+_EN_NEGATIVE = ["plunge", "miss estimates", "weak", "decline", "downgrade", "selloff", "loss", "concern"]
+_EN_NEUTRAL = ["flat", "in line", "steady", "unchanged", "report", "announce"]
+_EN_ACTORS = ["Analysts", "Investors", "Foreign funds", "The company", "Brokers", "Traders"]
+
+
+def _load_companies():
+    """從股票代號表取得公司中英文名稱，用於合成新聞"""
+    names = []
+    with open(BUNDLED_TICKER_TABLE, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            english = [alias for alias in row["aliases"].split("|") if alias.isascii() and alias]
+            names.append((row["name"], english[0] if english else row["code"]))
+    return names
+
+
+def generate_corpus(size, lang="zh", seed=0, days=30):
+    """
+    產生可重現的合成財經新聞語料
+
+    參數:
+        size: 文章數（100到1,000,000）
+        lang: "zh"（繁體中文）、"en"（英文）或 "mixed"（各半）
+        seed: 隨機種子，相同參數產生完全相同的語料
+        days: 發布時間分佈在基準時間前多少天內
+
+    返回:
+        list: 與爬蟲輸出相同結構的新聞列表（title、summary、link、published_time、source、platform）
+    """
+    rng = random.Random(seed)
+    companies = _load_companies()
+    span = days * 86400
+    news_list = []
+
+    for i in range(size):
+        is_chinese = lang == "zh" or (lang == "mixed" and i % 2 == 0)
+        company, english_name = rng.choice(companies)
+        tone = rng.random()
+        if is_chinese:
+            words = _ZH_POSITIVE if tone < 0.4 else _ZH_NEGATIVE if tone < 0.75 else _ZH_NEUTRAL
+            title = f"{company}{rng.choice(_ZH_TOPICS)}{rng.choice(words)}，{rng.choice(_ZH_ACTORS)}{rng.choice(words)}"
+            sentences = []
+            for _ in range(rng.randint(3, 6)):
+                sentences.append(f"{rng.choice(_ZH_FILLERS)}，{rng.choice(companies)[0]}{rng.choice(_ZH_TOPICS)}"
+                                 f"{rng.choice(words)}，{rng.choice(_ZH_ACTORS)}{rng.choice(_ZH_NEUTRAL)}"
+                                 f"{rng.choice(_ZH_TOPICS)}{rng.choice(_ZH_POSITIVE + _ZH_NEGATIVE)}。")
+            summary = "".join(sentences)
+        else:
+            words = _EN_POSITIVE if tone < 0.4 else _EN_NEGATIVE if tone < 0.75 else _EN_NEUTRAL
+            title = f"{english_name} {rng.choice(_EN_TOPICS)} {rng.choice(words)} as {rng.choice(_EN_ACTORS).lower()} react"
+            sentences = []
+            for _ in range(rng.randint(3, 6)):
+                sentences.append(f"{rng.choice(_EN_ACTORS)} said {rng.choice(companies)[1]} {rng.choice(_EN_TOPICS)} "
+                                 f"would {rng.choice(words)} while {rng.choice(_EN_TOPICS)} stayed "
+                                 f"{rng.choice(_EN_NEUTRAL + _EN_POSITIVE + _EN_NEGATIVE)}.")
+            summary = " ".join(sentences)
+
+        # 部分文章帶有HTML標籤和網址，使清理文本的步驟有實際工作
+        if rng.random() < 0.1:
+            summary = f"<p>{summary}</p> https://news.example.com/{i}"
+
+        published = _CORPUS_REFERENCE_TIME - timedelta(seconds=rng.randrange(span))
+        news_list.append({
+            "title": title,
+            "summary": summary,
+            "link": f"https://news.example.com/article/{seed}/{i}",
+            "published_time": published.strftime("%Y-%m-%d %H:%M:%S"),
+            "source": "合成新聞",
+            "platform": "Benchmark"
+        })
+    return news_list
+
+
+def _peak_rss_mb():
+    """當前進程的峰值常駐內存（MB），不支持resource模組的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux單位為KB，macOS為字節
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile_ms(latencies, percent):
+    """以最近秩法計算延遲百分位數（毫秒）"""
+    if not latencies:
+        return None
+    ordered = sorted(latencies)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index] * 1000
+
+
+def _timed(func, *args):
+    """返回 (耗時秒數, 函數結果)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def _fresh(news_list):
+    """
+    新聞的淺拷貝：標準化文本緩存在新聞字典上，熱運行若重用同一批新聞會跳過標準化，
+    因此每次熱運行在計時之外先複製一份
+    """
+    return [dict(news) for news in news_list]
+
+
+def _build_analyzer(engine, cache=None, model_dir=None):
+    """建立基準測試使用的分析器，默認不使用緩存以測量實際評分成本"""
+    from .registry import configure_jieba
+    from .sentiment_analyzer import SentimentAnalyzer
+
+    configure_jieba()
+    if engine == "transformer":
+        if not model_dir:
+            raise ValueError("transformer後端需要提供本地模型目錄")
+        from .transformer_backend import TransformerSentimentBackend
+        return SentimentAnalyzer(cache=cache, backend=TransformerSentimentBackend(model_dir))
+    return SentimentAnalyzer(engine=engine, cache=cache)
+
+
+def run_stage(stage, engine="jieba", lang="zh", size=1000, seed=0, repeat=3, latency_samples=200, model_dir=None):
+    """
+    在當前進程測量一個分析階段
+
+    冷啟動為建立分析器到第一次調用完成的時間，應在新進程中調用才有意義（run_benchmarks會為每個階段啟動子進程）；
+    熱運行為之後repeat次調用的中位數。
+
+    參數:
+        stage: STAGES之一
+        engine: "jieba"、"automaton" 或 "transformer"
+        lang: 語料語言
+        size: 文章數
+        seed: 語料隨機種子
+        repeat: 熱運行次數
+        latency_samples: 測量單次延遲的樣本數
+        model_dir: transformer後端的本地模型目錄
+
+    返回:
+        dict: 吞吐量、延遲百分位數、冷/熱運行時間和峰值內存
+    """
+    from .trend_predictor import TrendPredictor
+
+    news_list = generate_corpus(size, lang, seed)
+    sample = news_list[:min(latency_samples, size)]
+    rss_before = _peak_rss_mb()
+    latencies = []
+    latency_unit = "article"
+    temp_dir = None
+
+    if stage in ("analyze", "analyze_cached"):
+        cache = None
+        if stage == "analyze_cached":
+            from .sentiment_cache import SentimentCache
+            temp_dir = tempfile.TemporaryDirectory()
+            cache = SentimentCache(os.path.join(temp_dir.name, "sentiment_cache.db"))
+
+        start = time.perf_counter()
+        analyzer = _build_analyzer(engine, cache, model_dir)
+        analyzer.analyze(news_list)
+        cold = time.perf_counter() - start
+
+        # 緩存版本的熱運行全部命中第一次寫入的緩存
+        runs = [_timed(analyzer.analyze, _fresh(news_list))[0] for _ in range(repeat)]
+        for news in _fresh(sample):
+            latencies.append(_timed(analyzer.analyze, [news])[0])
+        if cache is not None:
+            cache.close()
+
+    elif stage == "keywords":
+        # 從原始文本提取關鍵詞：標準化、分詞、建立詞-文檔矩陣和TF-IDF排序，不包含情感評分
+        # 冷啟動包含建立分析器、jieba載入詞典和jieba.analyse載入IDF表
+        start = time.perf_counter()
+        analyzer = _build_analyzer(engine, None, model_dir)
+        analyzer._extract_keywords(news_list)
+        cold = time.perf_counter() - start
+
+        runs = [_timed(analyzer._extract_keywords, _fresh(news_list))[0] for _ in range(repeat)]
+        for news in _fresh(sample):
+            latencies.append(_timed(analyzer._extract_keywords, [news])[0])
+
+    elif stage == "trend":
+        analyzer = _build_analyzer(engine, None, model_dir)
+        results = analyzer.analyze(news_list)
+
+        start = time.perf_counter()
+        predictor = TrendPredictor()
+        predictor.predict(news_list, results)
+        cold = time.perf_counter() - start
+
+        runs = [_timed(predictor.predict, news_list, results)[0] for _ in range(repeat)]
+
+        # 單次延遲以一次爬取的規模（30篇）為單位
+        latency_unit = "prediction_30_articles"
+        items = results["news_sentiments"]
+        for offset in range(0, min(len(items), latency_samples * 30), 30):
+            window = {"news_sentiments": items[offset:offset + 30], "overall_sentiment": results["overall_sentiment"],
+                      "keywords": results["keywords"]}
+            latencies.append(_timed(predictor.predict, news_list[offset:offset + 30], window)[0])
+
+    elif stage == "stream":
+        start = time.perf_counter()
+        analyzer = _build_analyzer(engine, None, model_dir)
+        aggregator = analyzer.stream()
+        aggregator.add(news_list[0])
+        cold = time.perf_counter() - start
+
+        # 逐條加入全部文章，每條的耗時即單篇延遲
+        runs = []
+        for _ in range(repeat):
+            aggregator = analyzer.stream()
+            articles = _fresh(news_list)
+            start = time.perf_counter()
+            for news in articles:
+                latencies.append(_timed(aggregator.add, news)[0])
+            aggregator.snapshot()
+            runs.append(time.perf_counter() - start)
+
+    else:
+        raise ValueError(f"不支持的測試階段: {stage}")
+
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+    warm = statistics.median(runs)
+    peak_rss = _peak_rss_mb()
+    return {
+        "stage": stage,
+        "engine": engine,
+        "lang": lang,
+        "size": size,
+        "articles_per_sec": size / warm if warm > 0 else None,
+        "p50_ms": _percentile_ms(latencies, 50),
+        "p99_ms": _percentile_ms(latencies, 99),
+        "latency_unit": latency_unit,
+        "cold_seconds": cold,
+        "warm_seconds": warm,
+        "peak_rss_mb": peak_rss,
+        # 語料本身佔用的內存不計入
+        "stage_rss_mb": peak_rss - rss_before if peak_rss is not None and rss_before is not None else None
+    }
+
+
+def _run_isolated(config):
+    """在新的Python進程中運行一個階段，使冷啟動和峰值內存互不影響"""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = project_root + os.pathsep + env.get("PYTHONPATH", "")
+    completed = subprocess.run(
+        [sys.executable, "-m", "analysis.benchmark", "--worker", json.dumps(config)],
+        capture_output=True, text=True, encoding="utf-8", env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"基準測試子進程失敗: {config}\n{completed.stderr[-2000:]}")
+    # 子進程最後一行輸出為JSON結果，之前的輸出是jieba等庫的日誌
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmarks(sizes=(100, 1000, 10000), langs=("zh", "en"), engines=("jieba", "automaton"), stages=STAGES,
+                   seed=0, repeat=3, latency_samples=200, model_dir=None, isolate=True):
+    """
+    運行所有組合的基準測試
+
+    參數:
+        sizes: 語料大小列表
+        langs: 語料語言列表
+        engines: 中文評分引擎/後端列表，包含"transformer"時需要model_dir
+        stages: 測試階段列表
+        seed: 語料隨機種子
+        repeat: 熱運行次數
+        latency_samples: 測量單次延遲的樣本數
+        model_dir: transformer後端的本地模型目錄
+        isolate: 是否每個階段使用獨立子進程（冷啟動和峰值內存需要）
+
+    返回:
+        dict: 環境資訊（meta）和每個組合的結果（results）
+    """
+    results = []
+    for size in sizes:
+        for lang in langs:
+            for engine in engines:
+                for stage in stages:
+                    config = {"stage": stage, "engine": engine, "lang": lang, "size": size, "seed": seed,
+                              "repeat": repeat, "latency_samples": latency_samples, "model_dir": model_dir}
+                    print(f"測試 {stage} / {engine} / {lang} / {size}篇...")
+                    results.append(_run_isolated(config) if isolate else run_stage(**config))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "repeat": repeat,
+            "isolated": isolate
+        },
+        "results": results
+    }
+
+
+def compare(report, baseline, tolerance=0.1):
+    """
+    與基準結果比較，找出吞吐量下降或尾延遲上升超過容忍度的組合
+
+    參數:
+        report: run_benchmarks的結果
+        baseline: 之前保存的run_benchmarks結果
+        tolerance: 容忍的相對變化，0.1表示10%
+
+    返回:
+        list: 每個可比較組合的變化，regression為True表示退化
+    """
+    def key(result):
+        return result["stage"], result["engine"], result["lang"], result["size"]
+
+    baseline_results = {key(result): result for result in baseline.get("results", [])}
+    comparisons = []
+    for result in report["results"]:
+        base = baseline_results.get(key(result))
+        if base is None:
+            continue
+
+        throughput_change = None
+        if result["articles_per_sec"] and base["articles_per_sec"]:
+            throughput_change = result["articles_per_sec"] / base["articles_per_sec"] - 1
+        p99_change = None
+        if result["p99_ms"] and base["p99_ms"]:
+            p99_change = result["p99_ms"] / base["p99_ms"] - 1
+
+        comparisons.append({
+            "stage": result["stage"],
+            "engine": result["engine"],
+            "lang": result["lang"],
+            "size": result["size"],
+            "throughput_change": throughput_change,
+            "p99_change": p99_change,
+            "regression": (throughput_change is not None and throughput_change < -tolerance)
+                          or (p99_change is not None and p99_change > tolerance)
+        })
+    return comparisons
+
+
+def save_report(report, path):
+    """保存結果為JSON文件"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def _format_number(value, digits=1):
+    return "-" if value is None else f"{value:,.{digits}f}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="分析吞吐量基準測試（合成語料，可離線運行）")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="語料大小，100到1000000")
+    parser.add_argument("--langs", nargs="+", default=["zh", "en"], choices=LANGS)
+    parser.add_argument("--engines", nargs="+", default=["jieba", "automaton"], choices=ENGINES)
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-samples", type=int, default=200)
+    parser.add_argument("--model-dir", help="transformer後端的本地模型目錄")
+    parser.add_argument("--no-isolate", action="store_true", help="所有階段在同一進程運行（冷啟動數據不準確）")
+    parser.add_argument("--output", help="結果JSON路徑，默認為 data/benchmarks/<時間>.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="比較用的基準結果")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次結果保存為基準")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_stage(**json.loads(args.worker))))
+        sys.exit(0)
+
+    report = run_benchmarks(args.sizes, args.langs, args.engines, args.stages, args.seed, args.repeat,
+                            args.latency_samples, args.model_dir, isolate=not args.no_isolate)
+
+    print(f"\n{'階段':<16}{'引擎':<12}{'語言':<7}{'篇數':>9}{'篇/秒':>12}{'p50(ms)':>10}{'p99(ms)':>10}"
+          f"{'冷啟動(s)':>11}{'峰值(MB)':>10}")
+    for result in report["results"]:
+        print(f"{result['stage']:<16}{result['engine']:<12}{result['lang']:<7}{result['size']:>9}"
+              f"{_format_number(result['articles_per_sec']):>12}{_format_number(result['p50_ms'], 2):>10}"
+              f"{_format_number(result['p99_ms'], 2):>10}{_format_number(result['cold_seconds'], 2):>11}"
+              f"{_format_number(result['peak_rss_mb']):>10}")
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        regressions = [item for item in report["comparison"] if item["regression"]]
+        print(f"\n與基準比較: {len(report['comparison'])}項可比較，{len(regressions)}項退化")
+        for item in regressions:
+            print(f"  退化: {item['stage']} / {item['engine']} / {item['lang']} / {item['size']}篇 "
+                  f"吞吐量變化 {_format_number((item['throughput_change'] or 0) * 100)}%，"
+                  f"p99變化 {_format_number((item['p99_change'] or 0) * 100)}%")
+
+    output = args.output or os.path.join("data", "benchmarks", f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    save_report(report, output)
+    print(f"\n結果已保存: {output}")
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"已更新基準: {args.baseline}")
@@ -0,0 +1,186 @@
+import csv
+import os
+import re
+
+from .lexicon_matcher import AhoCorasickAutomaton
+
+# 隨專案附帶的股票代號表
+BUNDLED_TICKER_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tickers.csv")
+
+# 只轉換ASCII大小寫，保持文本長度不變，匹配位置可直接對應原文
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_ASCII_WORD = re.compile(r'[0-9a-z]')
+
+
+class EntityLinker:
+    """
+    新聞實體連結器
+
+    把股票代號、簡稱和別名編譯為一個Aho-Corasick自動機，單次掃描文本即可找出文章提到的所有股票。
+    """
+
+    # 包含公司簡稱但不指該公司的常見詞，匹配到時跳過（最左最長匹配會優先選中這些詞）
+    BLOCKED_PHRASES = (
+        "東南亞", "南亞洲", "陽明山", "陽明交大", "陽明交通大學", "長榮大學", "台灣大學",
+        "中華電視", "中鋼構", "可成為", "可成長", "可成功", "創意"
+    )
+
+    def __init__(self, table_path=BUNDLED_TICKER_TABLE, match_codes=True):
+        """
+        初始化實體連結器
+
+        參數:
+            table_path: 股票代號表CSV路徑，包含 code、name、aliases（以 | 分隔）、market 列
+            match_codes: 是否把文本中獨立出現的股票代號（如 2330）視為提及
+        """
+        self.table_path = table_path
+        self.match_codes = match_codes
+        self.entities = {}
+        self._lookup = {}
+        self._automaton = None
+
+        with open(table_path, "r", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                aliases = [alias.strip() for alias in (row.get("aliases") or "").split("|") if alias.strip()]
+                self.add_entity(row["code"].strip(), row["name"].strip(), aliases,
+                                (row.get("market") or "TW").strip())
+        self.compile()
+
+    @staticmethod
+    def _normalize(text):
+        """別名比對使用的標準形式：去除首尾空白、ASCII轉小寫"""
+        return text.strip().translate(_ASCII_LOWER)
+
+    def add_entity(self, code, name, aliases=(), market="TW"):
+        """
+        加入或覆蓋一個股票，加入後需要重新調用compile()
+
+        參數:
+            code: 股票代號
+            name: 公司簡稱
+            aliases: 其他名稱（全稱、英文名等）
+            market: 市場，TW為上市、TWO為上櫃
+        """
+        self.entities[code] = {
+            "code": code,
+            "name": name,
+            "aliases": list(aliases),
+            "market": market,
+            "symbol": f"{code}.{market}"
+        }
+
+    def compile(self):
+        """把所有代號、簡稱和別名編譯為自動機"""
+        self._lookup = {}
+        automaton = AhoCorasickAutomaton()
+        for phrase in self.BLOCKED_PHRASES:
+            automaton.add_word(self._normalize(phrase), None)
+
+        for code, entity in self.entities.items():
+            names = [entity["name"]] + entity["aliases"]
+            for name in names:
+                key = self._normalize(name)
+                self._lookup[key] = code
+                automaton.add_word(key, code)
+            self._lookup[self._normalize(code)] = code
+            self._lookup[self._normalize(entity["symbol"])] = code
+            if self.match_codes:
+                automaton.add_word(code, code)
+
+        automaton.build()
+        self._automaton = automaton
+
+    def resolve(self, keyword):
+        """
+        把用戶輸入的關鍵字解析為股票
+
+        參數:
+            keyword: 股票代號（2330、2330.TW）、簡稱或別名
+
+        返回:
+            dict: 股票資訊（code、name、aliases、market、symbol），不是已知股票時返回None
+        """
+        code = self._lookup.get(self._normalize(keyword or ""))
+        return self.entities.get(code) if code else None
+
+    def ticker_key(self, keyword):
+        """
+        匯總和指數使用的鍵：能解析為股票時返回股票代號，否則返回原關鍵字
+
+        使「台積電」、「TSMC」和「2330」共用同一份數據。
+        """
+        entity = self.resolve(keyword)
+        return entity["code"] if entity else keyword
+
+    def mentions(self, text):
+        """
+        單次掃描文本，統計每個股票被提及的次數
+
+        返回:
+            dict: {股票代號: 次數}，按首次出現的順序
+        """
+        if not text:
+            return {}
+        lowered = text.translate(_ASCII_LOWER)
+
+        candidates = []
+        for start, end, word, code in self._automaton.iter_matches(lowered):
+            # 英文別名和數字代號要求前後不接英數字，避免 2330 匹配 12330、UMC 匹配單詞的一部分
+            if _ASCII_WORD.match(word[0]) and start > 0 and _ASCII_WORD.match(lowered[start - 1]):
+                continue
+            if _ASCII_WORD.match(word[-1]) and end < len(lowered) and _ASCII_WORD.match(lowered[end]):
+                continue
+            candidates.append((start, end, code))
+
+        # 最左最長、互不重疊的匹配，與LexiconScorer一致
+        counts = {}
+        last_end = 0
+        for start, end, code in sorted(candidates, key=lambda m: (m[0], m[0] - m[1])):
+            if start < last_end:
+                continue
+            last_end = end
+            if code is not None:
+                counts[code] = counts.get(code, 0) + 1
+        return counts
+
+    def link(self, text):
+        """返回文本提到的所有股票代號，按首次出現的順序"""
+        return list(self.mentions(text))
+
+    def tag(self, news_list):
+        """
+        為每條新聞加上 tickers 字段（標題和摘要中實際提到的股票代號）
+
+        參數:
+            news_list: 新聞列表，會直接修改
+
+        返回:
+            list: 同一個新聞列表
+        """
+        for news in news_list:
+            news["tickers"] = self.link(news.get("title", "") + " " + (news.get("summary") or ""))
+        return news_list
+
+    def split_by_ticker(self, news_list, sentiment_results):
+        """
+        把一次分析的結果按股票拆分，使一次爬取可以更新多個股票的情感數據
+
+        參數:
+            news_list: 已經過tag()的新聞列表
+            sentiment_results: SentimentAnalyzer.analyze的結果，news_sentiments與news_list逐一對應
+
+        返回:
+            dict: {股票代號: (該股票的新聞列表, 只含這些新聞的情感結果)}
+        """
+        news_sentiments = sentiment_results.get("news_sentiments", [])
+        groups = {}
+        for news, item in zip(news_list, news_sentiments):
+            for code in news.get("tickers", []):
+                group_news, group_items = groups.setdefault(code, ([], []))
+                group_news.append(news)
+                group_items.append(item)
+
+        return {
+            code: (group_news, {"news_sentiments": group_items, "keywords": sentiment_results.get("keywords", [])})
+            for code, (group_news, group_items) in groups.items()
+        }
@@ -0,0 +1,176 @@
+import re
+
+
+class AhoCorasickAutomaton:
+    """Aho-Corasick多模式匹配自動機，單次掃描文本即可找出所有詞典詞"""
+
+    def __init__(self, words=None):
+        """
+        初始化自動機
+
+        參數:
+            words: 可選，{詞: 附加資料} 字典或詞的可迭代對象
+        """
+        # 每個狀態的轉移表、失敗指針及輸出（詞, 附加資料）
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._built = False
+        self.size = 0
+
+        if words:
+            items = words.items() if isinstance(words, dict) else ((w, None) for w in words)
+            for word, payload in items:
+                self.add_word(word, payload)
+            self.build()
+
+    def add_word(self, word, payload=None):
+        """加入一個詞，加入後需要重新調用build()"""
+        if not word:
+            return
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        if not any(w == word for w, _ in self._output[state]):
+            self._output[state].append((word, payload))
+            self.size += 1
+        self._built = False
+
+    def build(self):
+        """以廣度優先順序計算失敗指針"""
+        queue = []
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # 合併失敗狀態的輸出，使後綴詞也能被匹配
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def iter_matches(self, text):
+        """
+        單次掃描文本，產生所有匹配（可能互相重疊）
+
+        返回:
+            generator: (起始位置, 結束位置, 詞, 附加資料)
+        """
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        root = goto[0]
+        state = 0
+
+        for index, char in enumerate(text):
+            if state == 0:
+                # 根狀態下大部分字符都不是詞首，直接跳過
+                state = root.get(char, 0)
+                if state == 0:
+                    continue
+            else:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+            for word, payload in output[state]:
+                yield index - len(word) + 1, index + 1, word, payload
+
+    def find_all(self, text):
+        """
+        找出最左最長、互不重疊的匹配，近似分詞後的詞典命中
+
+        返回:
+            list: [(起始位置, 結束位置, 詞, 附加資料), ...]
+        """
+        matches = sorted(self.iter_matches(text), key=lambda m: (m[0], m[0] - m[1]))
+        selected = []
+        last_end = 0
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+
+class LexiconScorer:
+    """基於自動機的中文詞典情感評分器，無需分詞"""
+
+    # 非中文片段的切分規則：連續英數字為一詞，其餘每個非空白字符為一詞，空白為一詞
+    _NON_CJK_TOKEN = re.compile(r'[A-Za-z0-9_.]+|\s+|[^一-鿿\sA-Za-z0-9_.]')
+    _CJK_CHAR = re.compile(r'[一-鿿]')
+
+    def __init__(self, positive_words, negative_words, cjk_chars_per_token=1.6):
+        """
+        初始化評分器
+
+        參數:
+            positive_words: 積極詞集合
+            negative_words: 消極詞集合
+            cjk_chars_per_token: 估算詞數時每個詞的平均中文字數（jieba分詞的經驗值）
+        """
+        self.cjk_chars_per_token = cjk_chars_per_token
+        self.compile(positive_words, negative_words)
+
+    def compile(self, positive_words, negative_words):
+        """將詞典編譯為自動機，同時出現在兩個詞典中的詞以消極為準"""
+        lexicon = {word: 1 for word in positive_words}
+        lexicon.update({word: -1 for word in negative_words})
+        self.automaton = AhoCorasickAutomaton(lexicon)
+
+    def _estimate_token_count(self, text, matches):
+        """估算jieba分詞後的詞數，用作得分的分母"""
+        cjk_chars = len(self._CJK_CHAR.findall(text))
+        non_cjk_tokens = len(self._NON_CJK_TOKEN.findall(text))
+
+        # 命中的詞典詞各算一個詞，其餘中文字按平均詞長估算
+        matched_chars = sum(end - start for start, end, _, _ in matches)
+        rest = max(0, cjk_chars - matched_chars)
+        return len(matches) + non_cjk_tokens + int(round(rest / self.cjk_chars_per_token))
+
+    def score(self, text):
+        """
+        計算文本情感得分
+
+        返回:
+            dict: 與jieba路徑相同結構的 pos/neg/neu/compound 得分
+        """
+        matches = self.automaton.find_all(text)
+        total_words = self._estimate_token_count(text, matches)
+        if total_words == 0:
+            return {"pos": 0, "neg": 0, "neu": 1, "compound": 0}
+
+        positive_count = sum(1 for match in matches if match[3] > 0)
+        negative_count = len(matches) - positive_count
+
+        positive_score = positive_count / total_words
+        negative_score = negative_count / total_words
+        neutral_score = 1 - positive_score - negative_score
+        compound = (positive_score - negative_score) / (positive_score + negative_score + 0.001)
+
+        return {
+            "pos": positive_score,
+            "neg": negative_score,
+            "neu": neutral_score,
+            "compound": compound
+        }
@@ -0,0 +1,171 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# 延遲直方圖的默認分桶（秒），覆蓋從詞典評分的毫秒級到整頁爬取的分鐘級
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class MetricsRegistry:
+    """
+    進程內的指標登記表，支持計數器、量表和直方圖，以Prometheus文本格式輸出
+
+    放在analysis包中是為了讓爬蟲和分析模塊都能記錄指標，而不必導入utils（會載入pandas和matplotlib）。
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        初始化登記表
+
+        參數:
+            buckets: 直方圖的分桶上界（秒）
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._types = {}
+        self._help = {}
+        self._values = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def describe(self, name, metric_type, help_text):
+        """登記指標的類型和說明"""
+        with self._lock:
+            self._types[name] = metric_type
+            self._help[name] = help_text
+
+    def inc(self, name, amount=1, **labels):
+        """計數器（或量表）加上amount"""
+        key = self._key(labels)
+        with self._lock:
+            self._types.setdefault(name, "counter")
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """設置量表的值"""
+        with self._lock:
+            self._types.setdefault(name, "gauge")
+            self._values.setdefault(name, {})[self._key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        """在直方圖中記錄一個觀測值"""
+        key = self._key(labels)
+        with self._lock:
+            self._types.setdefault(name, "histogram")
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = histogram[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """計時區塊，結束時（包括拋出異常時）把耗時記入直方圖"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """裝飾器版本的timer，記錄每次調用的耗時"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def get(self, name, **labels):
+        """
+        讀取計數器或量表的當前值；直方圖返回 (觀測次數, 總和)
+
+        返回:
+            數值或tuple，不存在時為0
+        """
+        key = self._key(labels)
+        with self._lock:
+            if name in self._histograms:
+                histogram = self._histograms[name].get(key)
+                return (histogram[2], histogram[1]) if histogram else (0, 0.0)
+            return self._values.get(name, {}).get(key, 0)
+
+    @staticmethod
+    def _format_labels(key, extra=None):
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = []
+        for label, value in pairs:
+            value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+            escaped.append(f'{label}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self):
+        """
+        以Prometheus文本格式輸出所有指標
+
+        返回:
+            str: text/plain; version=0.0.4 格式的內容
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(set(self._values) | set(self._histograms)):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {self._types.get(name, 'untyped')}")
+
+                for key, value in sorted(self._values.get(name, {}).items()):
+                    lines.append(f"{name}{self._format_labels(key)} {value}")
+
+                for key, (counts, total, count) in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{self._format_labels(key, ('le', bound))} {cumulative}")
+                    lines.append(f"{name}_bucket{self._format_labels(key, ('le', '+Inf'))} {count}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {total}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# 進程內共用的登記表
+metrics = MetricsRegistry()
+
+metrics.describe("crawler_stage_seconds", "histogram", "爬蟲各階段耗時（browser_start、page_load、sleep、extract、parse、total）")
+metrics.describe("crawler_pages_fetched_total", "counter", "爬蟲載入的頁面數")
+metrics.describe("crawler_articles_total", "counter", "爬蟲返回的新聞數")
+metrics.describe("crawler_sample_fallbacks_total", "counter", "爬取失敗改用示例數據（is_sample）的新聞數")
+metrics.describe("crawler_errors_total", "counter", "爬取時拋出異常的次數")
+metrics.describe("crawler_deadline_cancellations_total", "counter", "因超過時限被取消的來源爬取次數")
+metrics.describe("browser_sessions_total", "counter", "啟動的Chrome瀏覽器數")
+metrics.describe("browsers_active", "gauge", "當前運行中的Chrome瀏覽器數")
+metrics.describe("analysis_stage_seconds", "histogram", "分析各階段耗時（tokenize、score、keywords、analyze、trend）")
+metrics.describe("cache_requests_total", "counter", "緩存查詢次數，按緩存名稱和結果分類")
+metrics.describe("storage_operation_seconds", "histogram", "DataManager存儲操作耗時")
+metrics.describe("http_request_seconds", "histogram", "API請求處理耗時")
+metrics.describe("crawl_jobs", "gauge", "後台爬取任務數，按狀態分類")
+metrics.describe("response_cache_entries", "gauge", "響應緩存中的條目數")
+metrics.describe("admission_active", "gauge", "正在進行的即時爬取數")
+metrics.describe("admission_max_active", "gauge", "即時爬取的名額上限")
+metrics.describe("admission_queued", "gauge", "等待爬取名額的請求數")
+metrics.describe("admission_rejected_total", "counter", "因過載被拒絕的爬取請求數（queue_full、queue_timeout）")
+metrics.describe("admission_wait_seconds", "histogram", "取得爬取名額前的排隊時間")
+metrics.describe("subscription_clients", "gauge", "訂閱新文章推送的客戶端數")
+metrics.describe("subscription_tickers", "gauge", "推送中心輪詢的股票數")
+metrics.describe("subscription_polls_total", "counter", "推送中心的爬取次數")
+metrics.describe("subscription_poll_errors_total", "counter", "推送中心爬取失敗的次數")
+metrics.describe("subscription_articles_pushed_total", "counter", "推送的新文章數（每篇只計一次，與訂閱者數無關）")
+
@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 每個工作進程內的分析器，由_init_worker在進程啟動時建立
+_worker_analyzer = None
+
+
+def _init_worker(engine, positive_words, negative_words):
+    """工作進程初始化：載入jieba詞典和VADER，建立與父進程詞典一致的分析器"""
+    global _worker_analyzer
+    import jieba
+
+    from .registry import configure_jieba
+    from .sentiment_analyzer import SentimentAnalyzer
+
+    configure_jieba()
+    jieba.initialize()
+
+    analyzer = SentimentAnalyzer(engine=engine)
+    # 父進程中用戶擴充的詞也要加入，保證評分結果一致
+    analyzer.add_lexicon_words(positive_words - analyzer.cn_positive_words,
+                               negative_words - analyzer.cn_negative_words)
+    analyzer.sia
+    _worker_analyzer = analyzer
+
+
+def _score_chunk(texts, tokenize=True):
+    """
+    在工作進程中對一批文本評分，jieba引擎或需要關鍵詞時同時分詞
+
+    返回:
+        tuple: (每篇文本的詞列表，沒有分詞時為None, 每篇文本的 (pos, neg, neu, compound) 元組)
+    """
+    from .term_matrix import TermDocumentMatrix
+
+    analyzer = _worker_analyzer
+    if tokenize or analyzer._needs_tokens():
+        tokenized = [analyzer.tokenize(text) for text in texts]
+        sentiments = analyzer._score_texts(texts, TermDocumentMatrix(tokenized))
+    else:
+        tokenized = [None] * len(texts)
+        sentiments = analyzer._score_texts(texts)
+    return tokenized, [(s["pos"], s["neg"], s["neu"], s["compound"]) for s in sentiments]
+
+
+def create_pool(analyzer, workers=None):
+    """
+    建立預先初始化好的分析進程池，可在多次analyze調用之間重用
+
+    參數:
+        analyzer: 父進程中的SentimentAnalyzer，工作進程使用相同的引擎和詞典
+        workers: 工作進程數，默認為CPU核心數
+
+    返回:
+        ProcessPoolExecutor: 進程池
+    """
+    if analyzer.backend is not None:
+        raise ValueError("可插拔評分後端無法在工作進程中共用，請使用單進程分析")
+
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(analyzer.engine, set(analyzer.cn_positive_words), set(analyzer.cn_negative_words))
+    )
+
+
+def score_in_pool(executor, texts, chunk_size=500, tokenize=True):
+    """
+    把文本分塊交給進程池評分
+
+    參數:
+        executor: create_pool建立的進程池
+        texts: 已清理的文本列表
+        chunk_size: 每塊的文章數
+        tokenize: 是否返回分詞結果（關鍵詞提取需要）
+
+    返回:
+        tuple: (詞列表的列表, 情感得分字典的列表)，順序與texts一致；沒有分詞的文本對應None
+    """
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    tokenized = []
+    sentiments = []
+    for chunk_tokens, chunk_scores in executor.map(_score_chunk, chunks, [tokenize] * len(chunks)):
+        tokenized.extend(chunk_tokens)
+        sentiments.extend({"pos": pos, "neg": neg, "neu": neu, "compound": compound}
+                          for pos, neg, neu, compound in chunk_scores)
+    return tokenized, sentiments
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+# jieba前綴詞典的持久緩存目錄，避免每次啟動都重新構建詞典
+JIEBA_CACHE_DIR = os.path.join("data", "cache")
+
+# 默認的中文情感評分引擎："jieba"為分詞後計數，"automaton"為自動機單次掃描（不需分詞）
+SENTIMENT_ENGINE = os.environ.get("SENTIMENT_ENGINE", "jieba")
+
+# 可選的Transformer評分後端：設置本地模型目錄後，中文文本改由模型評分（需要安裝torch和transformers）
+SENTIMENT_MODEL_DIR = os.environ.get("SENTIMENT_MODEL_DIR")
+SENTIMENT_MODEL_THREADS = int(os.environ.get("SENTIMENT_MODEL_THREADS", 0)) or None
+SENTIMENT_MODEL_QUANTIZE = os.environ.get("SENTIMENT_MODEL_QUANTIZE", "0") == "1"
+
+_lock = threading.RLock()
+_analyzers = {}
+_sentiment_cache = None
+_entity_linker = None
+_backend = None
+_jieba_configured = False
+
+
+def configure_jieba(cache_dir=JIEBA_CACHE_DIR):
+    """
+    設置jieba的詞典緩存文件位置
+
+    jieba第一次分詞時需要構建前綴詞典（約1秒），構建結果會寫入緩存文件，
+    之後的進程直接從緩存載入。默認緩存在系統臨時目錄，這裡改為專案的持久目錄。
+    """
+    global _jieba_configured
+    with _lock:
+        if _jieba_configured:
+            return
+        import jieba
+
+        os.makedirs(cache_dir, exist_ok=True)
+        jieba.dt.tmp_dir = os.path.abspath(cache_dir)
+        jieba.dt.cache_file = "jieba.cache"
+        _jieba_configured = True
+
+
+def get_sentiment_cache():
+    """返回進程內共用的SentimentCache實例"""
+    global _sentiment_cache
+    with _lock:
+        if _sentiment_cache is None:
+            from .sentiment_cache import SentimentCache
+            _sentiment_cache = SentimentCache()
+        return _sentiment_cache
+
+
+def get_entity_linker():
+    """返回進程內共用的EntityLinker，股票代號表只編譯一次"""
+    global _entity_linker
+    with _lock:
+        if _entity_linker is None:
+            from .entity_linker import EntityLinker
+            _entity_linker = EntityLinker()
+        return _entity_linker
+
+
+def get_backend():
+    """返回SENTIMENT_MODEL_DIR設置的Transformer後端，模型只載入一次；未設置時返回None"""
+    global _backend
+    with _lock:
+        if _backend is None and SENTIMENT_MODEL_DIR:
+            from .transformer_backend import TransformerSentimentBackend
+            _backend = TransformerSentimentBackend(
+                SENTIMENT_MODEL_DIR,
+                num_threads=SENTIMENT_MODEL_THREADS,
+                quantize=SENTIMENT_MODEL_QUANTIZE
+            )
+        return _backend
+
+
+def get_analyzer(engine=None, use_cache=True, backend=None):
+    """
+    返回進程內共用的SentimentAnalyzer，相同配置只構建一次
+
+    參數:
+        engine: 中文情感評分引擎，默認由環境變量SENTIMENT_ENGINE設置
+        use_cache: 是否使用持久化的情感結果緩存
+        backend: 可選，可插拔的評分後端，默認為SENTIMENT_MODEL_DIR設置的Transformer後端
+
+    返回:
+        SentimentAnalyzer: 分析器實例
+    """
+    engine = engine or SENTIMENT_ENGINE
+    if backend is None:
+        backend = get_backend()
+    key = (engine, use_cache, id(backend) if backend is not None else None)
+    with _lock:
+        analyzer = _analyzers.get(key)
+        if analyzer is None:
+            from .sentiment_analyzer import SentimentAnalyzer
+
+            configure_jieba()
+            analyzer = SentimentAnalyzer(
+                engine=engine,
+                cache=get_sentiment_cache() if use_cache else None,
+                backend=backend
+            )
+            _analyzers[key] = analyzer
+        return analyzer
+
+
+def warm_up(engines=None):
+    """
+    預先完成分析相關的一次性初始化，供API伺服器在開始服務前調用
+
+    包括：載入jieba詞典、導入sklearn並建立詞-文檔矩陣、載入VADER詞典、構建分析器。
+
+    參數:
+        engines: 需要預熱的中文評分引擎，默認為SENTIMENT_ENGINE
+
+    返回:
+        dict: 各步驟耗時（秒）
+    """
+    import jieba
+
+    from .text_normalizer import prepare_articles
+
+    timings = {}
+
+    start = time.perf_counter()
+    configure_jieba()
+    jieba.initialize()
+    timings["jieba_dictionary"] = time.perf_counter() - start
+
+    sample = [{"title": "台積電營收創新高，股價上漲", "summary": "Shares rise on strong AI demand"}]
+    for engine in engines or (SENTIMENT_ENGINE,):
+        start = time.perf_counter()
+        analyzer = get_analyzer(engine)
+        analyzer.sia
+        texts, chinese_flags = prepare_articles(sample)
+        analyzer._score_texts(texts, chinese_flags=chinese_flags)
+        if analyzer.tokenizes_for_scoring:
+            analyzer._extract_keywords(sample)
+        timings[f"analyzer_{engine}"] = time.perf_counter() - start
+
+    return timings
@@ -1,25 +1,88 @@
 import jieba
-import jieba.analyse
-import re
-from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import pandas as pd
+import hashlib
+import os
+import threading
+from functools import lru_cache
+
+from .lexicon_matcher import LexiconScorer
+from .metrics import metrics
+from .term_matrix import TermDocumentMatrix
+from .text_normalizer import is_chinese as is_chinese_text, normalize_text, prepare_articles
+
+# 隨專案附帶的VADER詞典（只保留詞和得分兩列），避免在運行時下載
+BUNDLED_VADER_LEXICON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "vader_lexicon.txt")
+
+
+@lru_cache(maxsize=1)
+def load_vader():
+    """
+    載入VADER分析器，整個進程共用一個實例
+    
+    nltk只在第一次分析英文文本時才導入；優先使用附帶的詞典，
+    沒有附帶詞典時才查找本地nltk_data，均不會觸發網絡下載。
+    """
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    
+    if not os.path.exists(BUNDLED_VADER_LEXICON):
+        return SentimentIntensityAnalyzer()
+    
+    # file:前綴使nltk.data直接讀取本地文件；較新的nltk只允許讀取nltk.data.path內的文件，因此先登記附帶詞典的目錄
+    lexicon_dir = os.path.dirname(BUNDLED_VADER_LEXICON)
+    if lexicon_dir not in nltk.data.path:
+        nltk.data.path.append(lexicon_dir)
+    return SentimentIntensityAnalyzer(lexicon_file="file:" + BUNDLED_VADER_LEXICON)
+
+
+@lru_cache(maxsize=1)
+def _vader_version():
+    """VADER路徑的緩存版本，由附帶詞典的內容雜湊值決定，不需要導入nltk"""
+    if os.path.exists(BUNDLED_VADER_LEXICON):
+        with open(BUNDLED_VADER_LEXICON, "rb") as f:
+            return "vader-" + hashlib.sha1(f.read()).hexdigest()[:12]
+    from importlib.metadata import version
+    return "vader-nltk-" + version("nltk")
+
 
 class SentimentAnalyzer:
     """新聞情感分析器"""
     
-    def __init__(self):
-        """初始化情感分析器"""
-        # 確保下載必要的nltk資源
-        try:
-            nltk.data.find('vader_lexicon')
-        except LookupError:
-            nltk.download('vader_lexicon')
+    # 可用的中文情感評分引擎
+    ENGINES = ("jieba", "automaton")
+    
+    # 分析邏輯版本，評分方式改變時遞增，使舊的緩存條目失效
+    ANALYZER_VERSION = "1"
+    
+    def __init__(self, engine="jieba", extra_positive_words=None, extra_negative_words=None, parity=False,
+                 cache=None, corpus_stats=None, backend=None):
+        """
+        初始化情感分析器
+        
+        參數:
+            engine: 中文情感評分引擎，"jieba"為分詞後計數，"automaton"為自動機單次掃描
+            extra_positive_words: 用戶自定義的積極詞
+            extra_negative_words: 用戶自定義的消極詞
+            parity: 是否在結果中附加自動機與jieba路徑的差異報告
+            cache: 可選，SentimentCache實例，用於持久化每篇文章的評分結果
+            corpus_stats: 可選，CorpusStats實例，提供時關鍵詞提取使用本地語料的IDF代替jieba內建IDF表
+            backend: 可選，可插拔的中文評分後端（例如TransformerSentimentBackend），
+                     需提供score_batch(texts)方法和version屬性，提供時代替engine評分中文文本
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"不支持的情感評分引擎: {engine}")
+        self.engine = engine
+        self.parity = parity
+        self.cache = cache
+        self.corpus_stats = corpus_stats
+        self.backend = backend
+        
+        # VADER分析器在第一次分析英文文本時才載入
+        self._sia = None
         
-        # 初始化情感分析器
-        self.sia = SentimentIntensityAnalyzer()
+        # 用戶詞只加入本分析器私有的jieba分詞器，在第一次分詞時才建立
+        self._user_words = set()
+        self._tokenizer = None
+        self._tokenizer_lock = threading.Lock()
         
         # 初始化中文情感詞典（簡化版）
         self.cn_positive_words = set([
@@ -33,21 +96,105 @@ class SentimentAnalyzer:
             '下滑', '疲軟', '衰退', '失敗', '困難', '挑戰', '壓力', '負面',
             '違規', '處罰', '調查', '訴訟', '悲觀', '萎縮', '下降', '惡化'
         ])
+        
+        # 自動機評分器在加入用戶詞後統一編譯
+        self._lexicon_scorer = None
+        self.add_lexicon_words(extra_positive_words, extra_negative_words)
+    
+    def add_lexicon_words(self, positive_words=None, negative_words=None):
+        """
+        擴充中文情感詞典
+        
+        參數:
+            positive_words: 要加入的積極詞
+            negative_words: 要加入的消極詞
+        """
+        positive_words = set(positive_words or [])
+        negative_words = set(negative_words or [])
+        self.cn_positive_words.update(positive_words)
+        self.cn_negative_words.update(negative_words)
+        
+        # 讓jieba路徑能把新詞切成完整的詞；只修改本分析器的分詞器，
+        # jieba的全局詞典不變，其他分析器和CorpusStats的分詞不受影響
+        new_words = (positive_words | negative_words) - self._user_words
+        with self._tokenizer_lock:
+            self._user_words.update(new_words)
+            if self._tokenizer is not None:
+                for word in new_words:
+                    self._tokenizer.add_word(word)
+        
+        if self._lexicon_scorer is None:
+            self._lexicon_scorer = LexiconScorer(self.cn_positive_words, self.cn_negative_words)
+        else:
+            self._lexicon_scorer.compile(self.cn_positive_words, self.cn_negative_words)
+        
+        # 詞典內容變更後版本隨之改變，緩存自動失效；分詞器的用戶詞都在詞典中，同樣由此版本涵蓋
+        lexicon = "|".join(sorted(self.cn_positive_words)) + "#" + "|".join(sorted(self.cn_negative_words))
+        self.lexicon_version = hashlib.sha1(lexicon.encode("utf-8")).hexdigest()[:12]
+    
+    def _cache_version(self, is_chinese):
+        """返回中文詞典路徑或VADER路徑的緩存版本字符串"""
+        if is_chinese and self.backend is not None:
+            return f"{self.ANALYZER_VERSION}|{self.backend.version}"
+        if is_chinese:
+            return f"{self.ANALYZER_VERSION}|{self.engine}|{self.lexicon_version}"
+        return f"{self.ANALYZER_VERSION}|{_vader_version()}"
+    
+    @property
+    def tokenizer(self):
+        """分詞器：沒有用戶詞時使用jieba的全局分詞器，否則使用本分析器私有的分詞器"""
+        if not self._user_words:
+            return jieba.dt
+        with self._tokenizer_lock:
+            if self._tokenizer is None:
+                tokenizer = jieba.Tokenizer()
+                # 與全局分詞器共用持久化的前綴詞典緩存
+                tokenizer.tmp_dir = jieba.dt.tmp_dir
+                tokenizer.cache_file = jieba.dt.cache_file
+                for word in self._user_words:
+                    tokenizer.add_word(word)
+                self._tokenizer = tokenizer
+            return self._tokenizer
+    
+    def tokenize(self, text):
+        """對文本分詞"""
+        return self.tokenizer.lcut(text)
+    
+    def _needs_tokens(self):
+        """只有jieba引擎以分詞結果評分，自動機引擎和可插拔後端直接從原文評分"""
+        return self.backend is None and self.engine == "jieba"
+    
+    @property
+    def tokenizes_for_scoring(self):
+        """
+        評分是否已經需要分詞
+        
+        為True時關鍵詞可從評分的分詞結果中順帶提取；為False時提取關鍵詞需要額外分詞一遍，
+        對延遲敏感的調用方應傳入extract_keywords=False
+        """
+        return self._needs_tokens()
+    
+    @property
+    def sia(self):
+        """VADER英文情感分析器（延遲載入）"""
+        if self._sia is None:
+            self._sia = load_vader()
+        return self._sia
     
     def _clean_text(self, text):
-        """清理文本，去除HTML標籤、URL等"""
-        # 去除HTML標籤
-        text = re.sub(r'<.*?>', '', text)
-        # 去除URL
-        text = re.sub(r'http\S+', '', text)
-        # 去除多餘空白
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        """清理文本，去除HTML標籤、URL等，並把全形英數字轉為半形"""
+        return normalize_text(text)
     
     def _analyze_chinese_sentiment(self, text):
         """分析中文文本情感"""
+        if self.engine == "automaton":
+            return self._lexicon_scorer.score(text)
+        return self._analyze_chinese_sentiment_jieba(text)
+    
+    def _analyze_chinese_sentiment_jieba(self, text):
+        """使用jieba分詞後計數的方式分析中文文本情感"""
         # 分詞
-        words = jieba.lcut(text)
+        words = self.tokenize(text)
         
         # 計算積極和消極詞出現的次數
         positive_count = sum(1 for word in words if word in self.cn_positive_words)
@@ -72,30 +219,298 @@ class SentimentAnalyzer:
             "compound": compound
         }
     
+    def check_parity(self, news_list):
+        """
+        比較自動機引擎與jieba路徑的評分差異
+        
+        參數:
+            news_list: 新聞列表
+            
+        返回:
+            dict: 差異報告，包含複合得分的平均/最大絕對差及情感標籤一致率
+        """
+        diffs = []
+        label_matches = 0
+        texts, chinese_flags = prepare_articles(news_list)
+        for text, chinese in zip(texts, chinese_flags):
+            if not chinese:
+                continue
+            
+            jieba_compound = self._analyze_chinese_sentiment_jieba(text)["compound"]
+            automaton_compound = self._lexicon_scorer.score(text)["compound"]
+            diffs.append(abs(jieba_compound - automaton_compound))
+            if self._label(jieba_compound) == self._label(automaton_compound):
+                label_matches += 1
+        
+        if not diffs:
+            return {"compared": 0, "mean_abs_diff": 0, "max_abs_diff": 0, "label_agreement": 1.0}
+        
+        return {
+            "compared": len(diffs),
+            "mean_abs_diff": sum(diffs) / len(diffs),
+            "max_abs_diff": max(diffs),
+            "label_agreement": label_matches / len(diffs)
+        }
+    
+    def _label(self, compound):
+        """根據複合得分確定情感標籤"""
+        if compound >= 0.05:
+            return "積極"
+        elif compound <= -0.05:
+            return "消極"
+        return "中性"
+    
+    def analyze_batch(self, news_list, workers=None, chunk_size=500, extract_keywords=True):
+        """
+        使用進程池分析大量新聞（回補歷史、自選股批量分析等）
+        
+        文章按塊分配給預先載入詞典的工作進程，工作進程只返回分詞和每篇的得分，
+        整體情感和關鍵詞在父進程中匯總。文章數不足兩塊時直接在當前進程分析。
+        
+        參數:
+            news_list: 新聞列表
+            workers: 工作進程數，默認為CPU核心數
+            chunk_size: 每塊的文章數
+            extract_keywords: 與analyze相同
+            
+        返回:
+            dict: 與analyze相同結構的分析結果
+        """
+        if len(news_list) < chunk_size * 2 or self.backend is not None:
+            return self.analyze(news_list, extract_keywords=extract_keywords)
+        
+        from .parallel import create_pool
+        with create_pool(self, workers) as executor:
+            return self.analyze(news_list, executor, chunk_size, extract_keywords)
+    
     def _analyze_english_sentiment(self, text):
         """使用VADER分析英文文本情感"""
         return self.sia.polarity_scores(text)
     
-    def _extract_keywords(self, news_list, top_n=10):
-        """提取新聞中的關鍵詞"""
-        # 合併所有新聞文本
-        all_text = " ".join([news["title"] + " " + news.get("summary", "") for news in news_list])
+    def _extract_keywords(self, news_list, top_n=10, term_matrix=None, rows=None):
+        """
+        提取新聞中的關鍵詞
+        
+        參數:
+            news_list: 新聞列表
+            top_n: 返回的關鍵詞數量
+            term_matrix: 可選，已建立的詞-文檔矩陣，提供時不再重新分詞
+            rows: 可選，news_list在term_matrix中的行號，默認使用整個矩陣
+        """
+        if term_matrix is None:
+            texts, _ = prepare_articles(news_list)
+            term_matrix = TermDocumentMatrix.from_texts(texts, self.tokenize)
+            rows = None
         
-        # 使用jieba提取關鍵詞
-        keywords = jieba.analyse.extract_tags(all_text, topK=top_n, withWeight=True)
+        keywords = term_matrix.top_keywords(top_n, rows=rows, idf=self.corpus_stats or "jieba")
         
         return [{"keyword": kw, "weight": weight} for kw, weight in keywords]
     
-    def analyze(self, news_list):
+    def _score_texts(self, texts, term_matrix=None, rows=None, chinese_flags=None):
+        """
+        批量計算文本情感得分
+        
+        參數:
+            texts: 已清理的文本列表
+            term_matrix: 可選，詞-文檔矩陣，jieba引擎直接用它做矩陣運算
+            rows: 可選，texts在term_matrix中對應的行號，默認與texts逐行對應
+            chinese_flags: 可選，每篇文本是否為中文，默認重新檢測
+            
+        返回:
+            list: 每篇文本的 pos/neg/neu/compound 得分字典
+        """
+        is_chinese = chinese_flags if chinese_flags is not None else [is_chinese_text(text) for text in texts]
+        
+        # 可插拔後端：所有中文文本一次交給後端批量推理
+        backend_scores = {}
+        if self.backend is not None and any(is_chinese):
+            chinese_rows = [row for row in range(len(texts)) if is_chinese[row]]
+            backend_scores = dict(zip(chinese_rows, self.backend.score_batch([texts[row] for row in chinese_rows])))
+        
+        # jieba引擎：用共用矩陣一次算出所有中文文本的詞典得分
+        lexicon_scores = None
+        if self.backend is None and self.engine == "jieba" and term_matrix is not None and any(is_chinese):
+            lexicon_scores = term_matrix.lexicon_scores(self.cn_positive_words, self.cn_negative_words, rows=rows)
+        
+        sentiments = []
+        for row, text in enumerate(texts):
+            if not is_chinese[row]:
+                sentiments.append(self._analyze_english_sentiment(text))
+            elif row in backend_scores:
+                sentiments.append(backend_scores[row])
+            elif lexicon_scores is not None:
+                sentiments.append({key: float(values[row]) for key, values in lexicon_scores.items()})
+            else:
+                sentiments.append(self._analyze_chinese_sentiment(text))
+        
+        return sentiments
+    
+    def _analyze_texts(self, texts, executor=None, chunk_size=500, chinese_flags=None, tokenize=True):
+        """
+        對清理後的文本評分，命中緩存的文章直接使用之前的得分和分詞
+        
+        參數:
+            texts: 已清理的文本列表
+            executor: 可選，parallel.create_pool建立的進程池，未命中緩存的文章分塊交給工作進程
+            chunk_size: 交給工作進程時每塊的文章數
+            chinese_flags: 可選，每篇文本是否為中文，默認重新檢測
+            tokenize: 是否為所有文本建立詞-文檔矩陣（關鍵詞提取需要）。為False時只有jieba引擎
+                      會對未命中緩存的文章分詞，自動機引擎和可插拔後端完全不分詞
+        
+        返回:
+            tuple: (詞-文檔矩陣，tokenize為False時為None, 每篇文本的情感得分列表)
+        """
+        if chinese_flags is None:
+            chinese_flags = [is_chinese_text(text) for text in texts]
+        
+        keys = []
+        cached = {}
+        if self.cache is not None:
+            keys = [self.cache.make_key(text, self._cache_version(chinese))
+                    for text, chinese in zip(texts, chinese_flags)]
+            cached = self.cache.get_many(keys)
+        
+        miss_rows = [row for row in range(len(texts)) if not keys or keys[row] not in cached]
+        miss_texts = [texts[row] for row in miss_rows]
+        if self.cache is not None:
+            metrics.inc("cache_requests_total", len(texts) - len(miss_rows), cache="sentiment", result="hit")
+            metrics.inc("cache_requests_total", len(miss_rows), cache="sentiment", result="miss")
+        
+        # 自動機引擎的緩存條目可能沒有保存分詞
+        tokenized = [cached[key].get("tokens") if key in cached else None for key in keys] if keys \
+            else [None] * len(texts)
+        
+        scores = None
+        if executor is not None and miss_rows:
+            from .parallel import score_in_pool
+            with metrics.timer("analysis_stage_seconds", stage="score"):
+                miss_tokens, scores = score_in_pool(executor, miss_texts, chunk_size, tokenize)
+            for row, tokens in zip(miss_rows, miss_tokens):
+                tokenized[row] = tokens
+        
+        # 共用分詞階段：每篇文章最多分詞一次，只對確實需要分詞的文章進行
+        if tokenize:
+            token_rows = [row for row in range(len(texts)) if tokenized[row] is None]
+        elif scores is None and self._needs_tokens():
+            token_rows = miss_rows
+        else:
+            token_rows = []
+        if token_rows:
+            with metrics.timer("analysis_stage_seconds", stage="tokenize"):
+                for row in token_rows:
+                    tokenized[row] = self.tokenize(texts[row])
+        
+        term_matrix = TermDocumentMatrix(tokenized) if tokenize else None
+        
+        if scores is None:
+            # jieba引擎用矩陣一次算出詞典得分；不提取關鍵詞時只為未命中的文章建立矩陣
+            score_matrix, score_rows = term_matrix, miss_rows
+            if score_matrix is None and self._needs_tokens() and miss_rows:
+                score_matrix = TermDocumentMatrix([tokenized[row] for row in miss_rows])
+                score_rows = None
+            with metrics.timer("analysis_stage_seconds", stage="score"):
+                scores = self._score_texts(miss_texts, score_matrix, rows=score_rows,
+                                           chinese_flags=[chinese_flags[row] for row in miss_rows])
+        
+        sentiments = [cached[key]["sentiment"] if key in cached else None for key in keys] if keys \
+            else [None] * len(texts)
+        for row, sentiment in zip(miss_rows, scores):
+            sentiments[row] = sentiment
+        
+        if self.cache is not None:
+            # 新評分的文章，以及這次才補上分詞的緩存條目
+            updated_rows = sorted(set(miss_rows) | set(token_rows))
+            if updated_rows:
+                self.cache.put_many({keys[row]: {"sentiment": sentiments[row], "tokens": tokenized[row]}
+                                     for row in updated_rows})
+        
+        return term_matrix, sentiments
+    
+    def _news_sentiment(self, news, sentiment):
+        """整理單條新聞的情感分析結果"""
+        return {
+            "title": news["title"],
+            "sentiment": sentiment,
+            # 確定情感標籤
+            "label": self._label(sentiment["compound"]),
+            "date": news.get("published_time") or news.get("date", "未知日期")
+        }
+    
+    def stream(self, keyword_capacity=200, top_n=10, keep_items=False):
+        """
+        建立增量情感匯總器，可逐條加入新聞並隨時查詢當前整體情感
+        
+        參數:
+            keyword_capacity: 關鍵詞計數器的容量上限
+            top_n: 快照中返回的關鍵詞數量
+            keep_items: 是否保留每條新聞的情感結果
+            
+        返回:
+            StreamingSentimentAggregator: 匯總器
+        """
+        from .sentiment_stream import StreamingSentimentAggregator
+        return StreamingSentimentAggregator(self, keyword_capacity, top_n, keep_items)
+    
+    def analyze(self, news_list, executor=None, chunk_size=500, extract_keywords=True):
         """
         分析新聞列表的情感
         
         參數:
             news_list: 新聞列表，每個新聞是一個字典
+            executor: 可選，parallel.create_pool建立的進程池，用於多核並行分詞和評分
+            chunk_size: 使用進程池時每塊的文章數
+            extract_keywords: 是否提取關鍵詞。不需要關鍵詞時傳入False，自動機引擎和可插拔後端
+                              就完全不分詞，結果中的keywords為空列表
             
         返回:
             dict: 情感分析結果，包含整體情感、信心指數、每條新聞的情感以及關鍵詞
         """
+        return self.analyze_many({None: news_list}, executor, chunk_size, extract_keywords)[None]
+    
+    @metrics.timed("analysis_stage_seconds", stage="analyze")
+    def analyze_many(self, news_by_key, executor=None, chunk_size=500, extract_keywords=True):
+        """
+        一次分析多組新聞（例如多個關鍵字的新聞），所有文章共用一次緩存查詢、評分和詞-文檔矩陣
+        
+        參數:
+            news_by_key: {鍵: 新聞列表}
+            executor、chunk_size、extract_keywords: 與analyze相同
+            
+        返回:
+            dict: {鍵: 與analyze相同結構的結果}，每組的整體情感和關鍵詞只根據該組的新聞計算
+        """
+        groups = list(news_by_key.items())
+        all_news = [news for _, news_list in groups for news in news_list]
+        
+        term_matrix, sentiments = None, []
+        if all_news:
+            # 合併標題和概要並標準化，結果緩存在新聞上，之後的階段不再重複處理
+            texts, chinese_flags = prepare_articles(all_news)
+            
+            # 情感評分和關鍵詞提取共用同一個詞-文檔矩陣
+            term_matrix, sentiments = self._analyze_texts(texts, executor, chunk_size, chinese_flags,
+                                                          tokenize=extract_keywords)
+        
+        results = {}
+        offset = 0
+        for key, news_list in groups:
+            end = offset + len(news_list)
+            # 只有一組時直接使用整個矩陣
+            rows = list(range(offset, end)) if len(groups) > 1 else None
+            results[key] = self._summarize(news_list, sentiments[offset:end], term_matrix, rows)
+            offset = end
+        return results
+    
+    def _summarize(self, news_list, sentiments, term_matrix=None, rows=None):
+        """
+        匯總一組新聞的情感分析結果
+        
+        參數:
+            news_list: 新聞列表
+            sentiments: 與news_list逐一對應的情感得分
+            term_matrix: 可選，詞-文檔矩陣，為None時不提取關鍵詞
+            rows: 可選，這組新聞在term_matrix中的行號
+        """
         if not news_list:
             return {
                 "overall_sentiment": "中性",
@@ -104,56 +519,28 @@ class SentimentAnalyzer:
                 "keywords": []
             }
         
-        # 對每條新聞進行情感分析
+        # 對每條新聞整理情感分析結果
         news_sentiments = []
         overall_compound = 0
         
-        for news in news_list:
-            # 合併標題和概要
-            text = news["title"] + " " + news.get("summary", "")
-            text = self._clean_text(text)
-            
-            # 根據文本內容判斷使用中文還是英文情感分析
-            if re.search(r'[\u4e00-\u9fff]', text):  # 包含中文字符
-                sentiment = self._analyze_chinese_sentiment(text)
-            else:
-                sentiment = self._analyze_english_sentiment(text)
-            
-            # 確定情感標籤
-            compound = sentiment["compound"]
-            if compound >= 0.05:
-                label = "積極"
-            elif compound <= -0.05:
-                label = "消極"
-            else:
-                label = "中性"
-            
-            news_sentiment = {
-                "title": news["title"],
-                "sentiment": sentiment,
-                "label": label,
-                "date": news.get("published_time") or news.get("date", "未知日期")
-            }
-            
-            news_sentiments.append(news_sentiment)
+        for news, sentiment in zip(news_list, sentiments):
+            news_sentiments.append(self._news_sentiment(news, sentiment))
             overall_compound += sentiment["compound"]
         
         # 計算整體情感得分
         avg_compound = overall_compound / len(news_list)
         
         # 確定整體情感
-        if avg_compound >= 0.05:
-            overall_sentiment = "積極"
-        elif avg_compound <= -0.05:
-            overall_sentiment = "消極"
-        else:
-            overall_sentiment = "中性"
+        overall_sentiment = self._label(avg_compound)
         
         # 計算信心指數（0-1之間）
         confidence = abs(avg_compound)
         
         # 提取關鍵詞
-        keywords = self._extract_keywords(news_list)
+        keywords = []
+        if term_matrix is not None:
+            with metrics.timer("analysis_stage_seconds", stage="keywords"):
+                keywords = self._extract_keywords(news_list, term_matrix=term_matrix, rows=rows)
         
         # 生成結果
         result = {
@@ -164,4 +551,8 @@ class SentimentAnalyzer:
             "keywords": [kw["keyword"] for kw in keywords]
         }
         
-        return result 
\ No newline at end of file
+        # 附加自動機與jieba路徑的差異報告
+        if self.parity:
+            result["parity"] = self.check_parity(news_list)
+        
+        return result
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SentimentCache:
+    """持久化的情感分析結果緩存，以清理後文本和分析器/詞典版本的雜湊值為鍵"""
+
+    def __init__(self, db_path=os.path.join("data", "cache", "sentiment_cache.db")):
+        """
+        初始化緩存
+
+        參數:
+            db_path: SQLite數據庫文件路徑
+        """
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(text, version):
+        """根據文本和版本字符串生成緩存鍵"""
+        return hashlib.sha1(f"{version}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """
+        批量查詢緩存
+
+        返回:
+            dict: {鍵: 緩存值}，只包含命中的鍵
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # SQLite對參數數量有限制，分批查詢
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM sentiment_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items):
+        """
+        批量寫入緩存
+
+        參數:
+            items: {鍵: 可JSON序列化的值}
+        """
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, json.dumps(value, ensure_ascii=False), now) for key, value in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_cache (key, value, created_at) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def prune(self, max_age_days=30):
+        """刪除超過指定天數的緩存條目（例如詞典更新後遺留的舊版本條目）"""
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sentiment_cache WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self):
+        """清空緩存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM sentiment_cache")
+            self._conn.commit()
+
+    def close(self):
+        """關閉數據庫連接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,164 @@
+import numpy as np
+
+from .text_normalizer import prepare_articles
+
+
+class TopKeywordSketch:
+    """
+    有界的加權關鍵詞計數器（Space-Saving）
+
+    最多保存約2倍容量的詞，超出時一次性保留權重最高的capacity個。被淘汰的最大權重記為下限，
+    新詞以「下限+本次權重」計入，因此每個詞的計數最多高估該下限，真正的高頻詞不會被淘汰。
+    """
+
+    def __init__(self, capacity=200):
+        """
+        初始化計數器
+
+        參數:
+            capacity: 保留的詞數
+        """
+        self.capacity = capacity
+        self.counts = {}
+        self.floor = 0.0
+
+    def update(self, weights):
+        """
+        累加一批詞的權重
+
+        參數:
+            weights: [(詞, 權重), ...] 或 {詞: 權重}
+        """
+        items = weights.items() if isinstance(weights, dict) else weights
+        counts = self.counts
+        for term, weight in items:
+            if term in counts:
+                counts[term] += weight
+            else:
+                counts[term] = self.floor + weight
+
+        if len(counts) > self.capacity * 2:
+            ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+            self.floor = max(self.floor, ranked[self.capacity][1])
+            self.counts = dict(ranked[:self.capacity])
+
+    def top(self, n=10):
+        """返回權重最高的n個詞：[(詞, 權重), ...]"""
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class StreamingSentimentAggregator:
+    """
+    增量情感匯總器
+
+    新聞可以逐條或分批加入，每條新聞的評分走分析器的緩存路徑；整體得分、標籤計數和關鍵詞都是累計值，
+    任何時候都可以取得與analyze結構一致的當前快照，不需要等全部新聞處理完。
+    """
+
+    def __init__(self, analyzer, keyword_capacity=200, top_n=10, keep_items=False):
+        """
+        初始化匯總器
+
+        參數:
+            analyzer: SentimentAnalyzer實例
+            keyword_capacity: 關鍵詞計數器的容量上限
+            top_n: 快照中返回的關鍵詞數量
+            keep_items: 是否保留每條新聞的情感結果（result()需要）
+        """
+        self.analyzer = analyzer
+        self.top_n = top_n
+        self.keep_items = keep_items
+        self.keywords = TopKeywordSketch(keyword_capacity)
+        self.news_sentiments = []
+
+        self.count = 0
+        self.sum_compound = 0.0
+        self.label_counts = {"積極": 0, "消極": 0, "中性": 0}
+
+    def add_many(self, news_list):
+        """
+        加入一批新聞，整批只建立一次詞-文檔矩陣
+
+        參數:
+            news_list: 新聞列表
+
+        返回:
+            list: 每條新聞的情感結果，與analyze返回的news_sentiments相同結構
+        """
+        if not news_list:
+            return []
+        analyzer = self.analyzer
+        texts, chinese_flags = prepare_articles(news_list)
+        term_matrix, sentiments = analyzer._analyze_texts(texts, chinese_flags=chinese_flags)
+
+        items = []
+        for news, sentiment in zip(news_list, sentiments):
+            item = analyzer._news_sentiment(news, sentiment)
+            self.count += 1
+            self.sum_compound += sentiment["compound"]
+            self.label_counts[item["label"]] += 1
+            items.append(item)
+
+        # 未歸一化的TF-IDF權重可以跨批次累加，排序與整批計算一致
+        _, weights = term_matrix.term_weights(idf=analyzer.corpus_stats or "jieba")
+        nonzero = np.flatnonzero(weights)
+        self.keywords.update(zip(term_matrix.vocabulary[nonzero].tolist(), weights[nonzero].tolist()))
+
+        if self.keep_items:
+            self.news_sentiments.extend(items)
+        return items
+
+    def add(self, news):
+        """加入一條新聞，返回其情感結果"""
+        return self.add_many([news])[0]
+
+    def consume(self, news_iterable, batch_size=1):
+        """
+        從可迭代對象（例如爬蟲的生成器）逐條加入新聞
+
+        參數:
+            news_iterable: 新聞的可迭代對象
+            batch_size: 每累積多少條新聞評分一次，1表示每條到達時立即評分
+
+        返回:
+            generator: 逐條產生 (新聞情感結果, 當前快照)
+        """
+        batch = []
+        for news in news_iterable:
+            batch.append(news)
+            if len(batch) >= batch_size:
+                for item in self.add_many(batch):
+                    yield item, self.snapshot()
+                batch = []
+        for item in self.add_many(batch):
+            yield item, self.snapshot()
+
+    def snapshot(self):
+        """
+        當前的整體情感
+
+        返回:
+            dict: 整體情感、信心指數、平均複合得分、文章數、各標籤數量和關鍵詞
+        """
+        avg_compound = self.sum_compound / self.count if self.count else 0
+        return {
+            "overall_sentiment": self.analyzer._label(avg_compound),
+            "confidence": abs(avg_compound),
+            "avg_compound": avg_compound,
+            "count": self.count,
+            "positive": self.label_counts["積極"],
+            "negative": self.label_counts["消極"],
+            "neutral": self.label_counts["中性"],
+            "keywords": [term for term, _ in self.keywords.top(self.top_n)]
+        }
+
+    def result(self):
+        """與analyze結構相同的結果，需要keep_items=True"""
+        if not self.keep_items:
+            raise ValueError("建立匯總器時需要設置keep_items=True才能取得每條新聞的結果")
+        result = self.snapshot()
+        result["news_sentiments"] = list(self.news_sentiments)
+        return result
@@ -0,0 +1,152 @@
+import jieba
+import numpy as np
+
+
+def _identity(tokens):
+    """CountVectorizer的分析函數：文本已預先分詞，直接返回詞列表"""
+    return tokens
+
+
+class TermDocumentMatrix:
+    """詞-文檔稀疏矩陣，每篇文章只分詞一次，供情感評分和關鍵詞提取共用"""
+
+    def __init__(self, tokenized_docs):
+        """
+        初始化詞-文檔矩陣
+
+        參數:
+            tokenized_docs: 已分詞的文檔列表，每個文檔是詞列表
+        """
+        # sklearn只在第一次建立矩陣時才導入
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self.vectorizer = CountVectorizer(analyzer=_identity, lowercase=False)
+        if any(tokenized_docs):
+            # 形狀為 (文檔數, 詞彙數) 的CSR稀疏計數矩陣
+            self.matrix = self.vectorizer.fit_transform(tokenized_docs)
+            self.vocabulary = self.vectorizer.get_feature_names_out()
+        else:
+            self.matrix = None
+            self.vocabulary = np.array([], dtype=object)
+        self.n_docs = len(tokenized_docs)
+
+    @classmethod
+    def from_texts(cls, texts, tokenize=jieba.lcut):
+        """
+        對每篇文本分詞一次並建立矩陣
+
+        參數:
+            texts: 文本列表
+            tokenize: 分詞函數，默認為jieba的全局分詞器
+        """
+        return cls([tokenize(text) for text in texts])
+
+    def _indicator(self, words):
+        """建立詞彙表上的指示向量，詞在集合中為1，否則為0"""
+        return np.fromiter((1.0 if term in words else 0.0 for term in self.vocabulary),
+                           dtype=np.float64, count=len(self.vocabulary))
+
+    def lexicon_scores(self, positive_words, negative_words, rows=None):
+        """
+        以矩陣-向量乘法計算每篇文檔的詞典情感得分
+
+        參數:
+            positive_words: 積極詞集合
+            negative_words: 消極詞集合
+            rows: 可選，只計算指定的文檔行
+
+        返回:
+            dict: pos/neg/neu/compound 四個 numpy 數組，長度為文檔數（或rows的長度）
+        """
+        n_rows = self.n_docs if rows is None else len(rows)
+        if self.matrix is None or n_rows == 0:
+            zeros = np.zeros(n_rows)
+            return {"pos": zeros, "neg": zeros, "neu": np.ones(n_rows), "compound": zeros}
+
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        lexicon = np.column_stack([self._indicator(positive_words), self._indicator(negative_words)])
+        counts = matrix @ lexicon
+        totals = np.asarray(matrix.sum(axis=1)).ravel()
+
+        # 空文檔與逐篇計算時一致，得分為中性
+        safe_totals = np.where(totals > 0, totals, 1)
+        positive_score = np.where(totals > 0, counts[:, 0] / safe_totals, 0.0)
+        negative_score = np.where(totals > 0, counts[:, 1] / safe_totals, 0.0)
+        neutral_score = 1 - positive_score - negative_score
+        compound = (positive_score - negative_score) / (positive_score + negative_score + 0.001)
+
+        return {"pos": positive_score, "neg": negative_score, "neu": neutral_score, "compound": compound}
+
+    def term_weights(self, rows=None, idf="jieba"):
+        """
+        計算每個詞的未歸一化TF-IDF權重（詞頻×IDF），不是候選關鍵詞的詞權重為0
+
+        參數:
+            rows: 可選，只使用指定的文檔行
+            idf: 與top_keywords相同
+
+        返回:
+            tuple: (候選詞的詞頻數組, 權重數組)，都與vocabulary逐一對應
+        """
+        if self.matrix is None:
+            return np.zeros(0), np.zeros(0)
+
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        if idf == "corpus":
+            from sklearn.feature_extraction.text import TfidfTransformer
+            matrix = TfidfTransformer().fit_transform(matrix)
+        term_freq = np.asarray(matrix.sum(axis=0)).ravel().astype(np.float64)
+
+        # 與jieba.analyse.extract_tags相同的過濾規則：至少兩個字符且不是停用詞
+        # jieba.analyse在導入時會載入IDF表，因此只在提取關鍵詞時才導入
+        import jieba.analyse
+        tfidf = jieba.analyse.default_tfidf
+        candidate = np.fromiter(
+            (len(term.strip()) >= 2 and term.lower() not in tfidf.stop_words for term in self.vocabulary),
+            dtype=bool, count=len(self.vocabulary)
+        )
+        term_freq = np.where(candidate, term_freq, 0.0)
+
+        if idf == "corpus":
+            return term_freq, term_freq
+        if not isinstance(idf, str):
+            # 外部語料統計只需要查詢候選詞的IDF
+            idf_values = np.zeros(len(self.vocabulary))
+            candidate_idx = np.flatnonzero(term_freq)
+            if len(candidate_idx):
+                idf_values[candidate_idx] = idf.idf_values(self.vocabulary[candidate_idx].tolist())
+        else:
+            idf_freq, median_idf = tfidf.idf_freq, tfidf.median_idf
+            idf_values = np.fromiter((idf_freq.get(term, median_idf) for term in self.vocabulary),
+                                     dtype=np.float64, count=len(self.vocabulary))
+        return term_freq, term_freq * idf_values
+
+    def top_keywords(self, top_n=10, rows=None, idf="jieba"):
+        """
+        以向量化方式提取TF-IDF權重最高的關鍵詞
+
+        參數:
+            top_n: 返回的關鍵詞數量
+            rows: 可選，只使用指定的文檔行
+            idf: "jieba"使用jieba內建的IDF表（與extract_tags一致），"corpus"使用本批文檔計算的IDF，
+                 也可以傳入提供idf_values(terms)方法的對象（例如CorpusStats）
+
+        返回:
+            list: [(關鍵詞, 權重), ...]，按權重降序
+        """
+        if self.matrix is None:
+            return []
+
+        term_freq, weights = self.term_weights(rows, idf)
+        total = term_freq.sum()
+        if total == 0:
+            return []
+        weights = weights / total
+
+        # 先用argpartition取出前K個，再對這K個排序
+        k = min(top_n, int(np.count_nonzero(weights)))
+        if k == 0:
+            return []
+        top = np.argpartition(-weights, k - 1)[:k]
+        top = top[np.argsort(-weights[top], kind="stable")]
+        return [(self.vocabulary[i], float(weights[i])) for i in top]
@@ -0,0 +1,103 @@
+import re
+
+# 緩存在新聞字典上的字段名，保存新聞時會被略過
+CACHE_FIELD = "_normalized"
+
+# 全形英數字及數值相關符號（＄％＆＋－．／）轉半形，全形空格轉為普通空格；
+# 中文標點（，。：；！？（）等）保持不變，避免改動大部分中文新聞的文本
+_WIDTH_TABLE = {ord(char): ord(char) - 0xFEE0 for char in "０１２３４５６７８９＄％＆＋－．／"}
+_WIDTH_TABLE.update({code: code - 0xFEE0 for code in range(0xFF21, 0xFF3B)})
+_WIDTH_TABLE.update({code: code - 0xFEE0 for code in range(0xFF41, 0xFF5B)})
+_WIDTH_TABLE[0x3000] = 0x20
+
+# 預先編譯的規則，與原來的 <.*?>、http\S+ 相同
+_TAG = re.compile(r'<[^>\n]*>')
+_URL = re.compile(r'http\S+')
+_CJK = re.compile(r'[一-鿿]')
+
+
+def clean_display_text(text):
+    """
+    爬蟲使用的顯示文本清理：去除首尾空白，並把內部連續空白（包括換行）合併為一個空格
+
+    參數:
+        text: 網頁元素的文字
+
+    返回:
+        str: 清理後的文本，不改變全形字符以保持原文顯示
+    """
+    return " ".join(text.split()) if text else ""
+
+
+def normalize_text(text, fold_width=True):
+    """
+    分析使用的文本標準化：去除HTML標籤和網址、全形英數字轉半形、合併空白
+
+    只在文本中可能有標籤或網址時才執行對應的正則替換，空白合併使用str.split在C層完成。
+
+    參數:
+        text: 原始文本
+        fold_width: 是否把全形英數字轉為半形
+
+    返回:
+        str: 標準化後的文本
+    """
+    if not text:
+        return ""
+    if fold_width:
+        text = text.translate(_WIDTH_TABLE)
+    if "<" in text:
+        text = _TAG.sub("", text)
+    if "http" in text:
+        text = _URL.sub("", text)
+    return " ".join(text.split())
+
+
+def is_chinese(text):
+    """文本是否包含中文字符"""
+    return _CJK.search(text) is not None
+
+
+def prepare_article(news):
+    """
+    取得新聞用於分析的標準化文本（標題+概要）和語言，結果緩存在新聞字典上
+
+    標題或概要被修改後緩存自動失效。
+
+    參數:
+        news: 新聞字典
+
+    返回:
+        tuple: (標準化文本, 是否為中文)
+    """
+    title = news.get("title", "")
+    summary = news.get("summary") or ""
+    cached = news.get(CACHE_FIELD)
+    if cached is not None and cached[0] == title and cached[1] == summary:
+        return cached[2], cached[3]
+
+    text = normalize_text(title + " " + summary)
+    chinese = is_chinese(text)
+    news[CACHE_FIELD] = (title, summary, text, chinese)
+    return text, chinese
+
+
+def prepare_articles(news_list):
+    """
+    批量取得新聞的標準化文本和語言
+
+    返回:
+        tuple: (文本列表, 是否為中文的列表)，與news_list逐一對應
+    """
+    texts = []
+    flags = []
+    for news in news_list:
+        text, chinese = prepare_article(news)
+        texts.append(text)
+        flags.append(chinese)
+    return texts, flags
+
+
+def strip_cache_fields(news):
+    """返回去除緩存字段的新聞副本，用於保存或輸出"""
+    return {key: value for key, value in news.items() if key != CACHE_FIELD}
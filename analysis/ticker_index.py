@@ -0,0 +1,286 @@
+import bisect
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+
+def _to_epoch(date, default):
+    """將新聞日期轉換為秒級時間戳，無法解析時使用默認值"""
+    if isinstance(date, datetime):
+        return date.timestamp()
+    if isinstance(date, str):
+        try:
+            return datetime.strptime(date, "%Y-%m-%d %H:%M:%S").timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+class TickerSentimentState:
+    """
+    單一股票的增量情感狀態
+
+    保存指數衰減的情感加權和與權重和（以ref_time為基準），每篇新文章O(1)更新，
+    讀取時才把衰減推進到查詢時間；另外按發布時間維護最近window篇文章的得分，用於計算動量，
+    分批或亂序到達的文章也按發布時間排列。
+    """
+
+    def __init__(self, ticker, time_decay_factor=0.9, positive_weight=1.5, negative_weight=1.0,
+                 window=50, max_seen=1000):
+        """
+        初始化狀態
+
+        參數:
+            ticker: 股票代號或關鍵字
+            time_decay_factor: 每小時的衰減因子，與TrendPredictor一致
+            positive_weight: 積極情感的權重
+            negative_weight: 消極情感的權重
+            window: 計算動量時使用的最近文章數
+            max_seen: 用於去重的最近文章ID數量
+        """
+        self.ticker = ticker
+        self.time_decay_factor = time_decay_factor
+        self.positive_weight = positive_weight
+        self.negative_weight = negative_weight
+        self.window = window
+        self.max_seen = max_seen
+
+        self.ref_time = None
+        self.weighted_sum = 0.0
+        self.weight_sum = 0.0
+        self.count = 0
+
+        # 動量窗口：按發布時間排序的 [時間戳, 複合得分]，只保留最新的window篇
+        self.recent_items = []
+
+        self._seen = deque()
+        self._seen_set = set()
+
+    def _decay(self, hours):
+        """計算經過指定小時數後的衰減係數"""
+        return self.time_decay_factor ** hours
+
+    def add(self, compound, timestamp, article_id=None):
+        """
+        加入一篇文章的情感得分
+
+        參數:
+            compound: 複合情感得分
+            timestamp: 文章發布時間（秒級時間戳）
+            article_id: 可選，文章ID（例如連結），重複的文章會被忽略
+
+        返回:
+            bool: 是否加入（重複文章返回False）
+        """
+        if article_id is not None:
+            if article_id in self._seen_set:
+                return False
+            self._seen.append(article_id)
+            self._seen_set.add(article_id)
+            if len(self._seen) > self.max_seen:
+                self._seen_set.discard(self._seen.popleft())
+
+        # 新文章比基準時間更晚時，把累積值推進到新的基準時間
+        if self.ref_time is None:
+            self.ref_time = timestamp
+        elif timestamp > self.ref_time:
+            factor = self._decay((timestamp - self.ref_time) / 3600)
+            self.weighted_sum *= factor
+            self.weight_sum *= factor
+            self.ref_time = timestamp
+
+        time_weight = self._decay((self.ref_time - timestamp) / 3600)
+        sentiment_weight = self.positive_weight if compound > 0 else self.negative_weight
+        self.weighted_sum += compound * sentiment_weight * time_weight
+        self.weight_sum += time_weight
+        self.count += 1
+
+        # 更新動量窗口：按發布時間插入，超出窗口時去掉最早的一篇（可能就是剛插入的較舊文章）
+        bisect.insort(self.recent_items, [timestamp, compound], key=lambda item: item[0])
+        if len(self.recent_items) > self.window:
+            del self.recent_items[0]
+        return True
+
+    def effective_weight(self, now=None):
+        """查詢時間點的衰減後權重和，可視為有效樣本量（一篇剛發布的文章為1）"""
+        if self.ref_time is None:
+            return 0.0
+        now = now if now is not None else datetime.now().timestamp()
+        return self.weight_sum * self._decay(max(0, now - self.ref_time) / 3600)
+
+    def momentum(self):
+        """最近窗口內按發布時間的後半部分與前半部分的平均得分差，文章少於3篇時為0"""
+        size = len(self.recent_items)
+        if size < 3:
+            return 0.0
+        mid_point = size // 2
+        early_sum = sum(compound for _, compound in self.recent_items[:mid_point])
+        recent_sum = sum(compound for _, compound in self.recent_items[mid_point:])
+        return recent_sum / (size - mid_point) - early_sum / mid_point
+
+    def snapshot(self, now=None):
+        """
+        O(1)查詢當前趨勢
+
+        趨勢得分與TrendPredictor相同：把加權和衰減到查詢時間後除以文章數，再加上動量的一半，
+        因此近期沒有新聞時得分會隨時間趨向0，閾值同樣為±0.1。
+
+        參數:
+            now: 可選，查詢時間（秒級時間戳），默認為當前時間
+
+        返回:
+            dict: 與TrendPredictor相同結構的趨勢、信心指數、趨勢得分和動量
+        """
+        if self.count < 2:
+            return {
+                "trend": "不確定",
+                "confidence": 0,
+                "reason": "新聞數量不足，無法預測趨勢"
+            }
+
+        now = now if now is not None else datetime.now().timestamp()
+        decay = self._decay(max(0, now - self.ref_time) / 3600)
+        weighted_avg = self.weighted_sum * decay / self.count
+        momentum = self.momentum()
+        trend_score = weighted_avg + momentum * 0.5
+
+        if trend_score > 0.1:
+            trend = "看漲"
+        elif trend_score < -0.1:
+            trend = "看跌"
+        else:
+            trend = "震盪"
+
+        return {
+            "trend": trend,
+            "confidence": min(1.0, abs(trend_score) * 2),
+            "trend_score": trend_score,
+            "momentum": momentum,
+            "weighted_avg": weighted_avg,
+            "effective_weight": self.weight_sum * decay,
+            "count": self.count,
+            "reason": f"基於{self.count}條新聞的時間衰減情感指數"
+        }
+
+    def to_dict(self):
+        """序列化為可JSON保存的字典"""
+        return {
+            "ticker": self.ticker,
+            "time_decay_factor": self.time_decay_factor,
+            "positive_weight": self.positive_weight,
+            "negative_weight": self.negative_weight,
+            "window": self.window,
+            "max_seen": self.max_seen,
+            "ref_time": self.ref_time,
+            "weighted_sum": self.weighted_sum,
+            "weight_sum": self.weight_sum,
+            "count": self.count,
+            "recent_items": self.recent_items,
+            "seen": list(self._seen)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """從to_dict的結果恢復狀態"""
+        state = cls(data["ticker"], data["time_decay_factor"], data["positive_weight"],
+                    data["negative_weight"], data["window"], data["max_seen"])
+        state.ref_time = data["ref_time"]
+        state.weighted_sum = data["weighted_sum"]
+        state.weight_sum = data["weight_sum"]
+        state.count = data["count"]
+        if "recent_items" in data:
+            state.recent_items = [list(item) for item in data["recent_items"]]
+        else:
+            # 舊格式只保存了按加入順序的得分，沒有時間戳，以基準時間代替並保留原有順序
+            state.recent_items = [[state.ref_time, compound] for compound in data["early"] + data["recent"]]
+        state._seen = deque(data["seen"])
+        state._seen_set = set(state._seen)
+        return state
+
+
+class TickerSentimentIndex:
+    """多個股票的增量情感指數，持久化為JSON文件"""
+
+    def __init__(self, path=os.path.join("data", "state", "ticker_index.json"), **state_options):
+        """
+        初始化指數
+
+        參數:
+            path: 狀態文件路徑
+            state_options: 傳給TickerSentimentState的參數（衰減因子、權重、窗口大小等）
+        """
+        self.path = path
+        self.state_options = state_options
+        self.states = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """從文件載入狀態"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            self.states = {ticker: TickerSentimentState.from_dict(state) for ticker, state in data.items()}
+
+    def save(self):
+        """保存狀態到文件（先寫臨時文件再替換，避免寫到一半損壞）"""
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._lock:
+            data = {ticker: state.to_dict() for ticker, state in self.states.items()}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def update(self, ticker, sentiment_results, news_list=None):
+        """
+        把一次情感分析的結果加入指數
+
+        參數:
+            ticker: 股票代號或關鍵字
+            sentiment_results: SentimentAnalyzer.analyze的結果
+            news_list: 可選，與news_sentiments逐一對應的新聞列表，用於以連結去重
+
+        返回:
+            int: 新加入的文章數
+        """
+        now = datetime.now().timestamp()
+        news_sentiments = sentiment_results.get("news_sentiments", [])
+        added = 0
+        with self._lock:
+            state = self.states.get(ticker)
+            if state is None:
+                state = self.states[ticker] = TickerSentimentState(ticker, **self.state_options)
+
+            # 按時間順序加入，基準時間只需向前推進
+            items = []
+            for i, item in enumerate(news_sentiments):
+                news = news_list[i] if news_list is not None and i < len(news_list) else {}
+                # 爬取失敗時生成的示例數據不計入指數
+                if news.get("is_sample"):
+                    continue
+                link = news.get("link")
+                items.append((_to_epoch(item.get("date"), now), item["sentiment"]["compound"], link or item.get("title")))
+            for timestamp, compound, article_id in sorted(items, key=lambda x: x[0]):
+                if state.add(compound, timestamp, article_id):
+                    added += 1
+        return added
+
+    def trend(self, ticker, now=None):
+        """O(1)查詢指定股票的當前趨勢，沒有狀態時返回不確定"""
+        with self._lock:
+            state = self.states.get(ticker)
+            if state is None:
+                return {"trend": "不確定", "confidence": 0, "reason": "沒有該股票的情感數據"}
+            return state.snapshot(now)
+
+    def trends(self, tickers=None, now=None):
+        """查詢多個股票的當前趨勢，默認為全部"""
+        tickers = list(self.states) if tickers is None else tickers
+        return {ticker: self.trend(ticker, now) for ticker in tickers}
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import time
+
+
+class TransformerSentimentBackend:
+    """
+    可選的Transformer情感評分後端
+
+    從本地目錄載入中文財經情感分類模型（不會下載），在CPU上按長度分桶、動態批次推理，
+    輸出與詞典路徑相同的 pos/neg/neu/compound 結構。需要安裝 torch 和 transformers。
+    """
+
+    # 標籤名稱中用於判斷情感方向的關鍵字
+    POSITIVE_LABELS = ("pos", "positive", "bull", "正面", "積極", "利多", "看漲")
+    NEGATIVE_LABELS = ("neg", "negative", "bear", "負面", "消極", "利空", "看跌")
+
+    # 參與版本哈希的文件：config、tokenizer詞表和權重
+    MODEL_FILE_SUFFIXES = (".json", ".txt", ".model", ".safetensors", ".bin")
+
+    def __init__(self, model_dir, batch_size=32, max_batch_tokens=8192, max_length=256,
+                 num_threads=None, quantize=False):
+        """
+        初始化後端
+
+        參數:
+            model_dir: 本地模型目錄（包含config、tokenizer和權重文件）
+            batch_size: 每批最多的文章數
+            max_batch_tokens: 每批填充後的詞元總數上限，長文本會自動使用較小的批次
+            max_length: 單篇文章的最大詞元數，超出部分截斷
+            num_threads: PyTorch推理使用的CPU線程數，None表示使用默認值
+            quantize: 是否對線性層進行int8動態量化
+        """
+        try:
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        except ImportError as e:
+            raise ImportError("Transformer後端需要安裝 torch 和 transformers") from e
+
+        if not os.path.isdir(model_dir):
+            raise FileNotFoundError(f"模型目錄不存在: {model_dir}")
+
+        self._torch = torch
+        self.model_dir = model_dir
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_length = max_length
+        self.quantize = quantize
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        # local_files_only確保不會在服務過程中觸發網絡下載
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir, local_files_only=True)
+        model.eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+        self._label_index = self._map_labels(model.config.id2label)
+
+        # 用於緩存鍵，模型文件、截斷長度或量化設置改變時緩存自動失效
+        self.version = (f"transformer-{self._fingerprint()}-len{max_length}" +
+                        ("-int8" if quantize else ""))
+
+    def _fingerprint(self):
+        """計算模型目錄中config、tokenizer和權重文件內容的哈希"""
+        digest = hashlib.sha1()
+        for name in sorted(os.listdir(self.model_dir)):
+            path = os.path.join(self.model_dir, name)
+            if not name.endswith(self.MODEL_FILE_SUFFIXES) or not os.path.isfile(path):
+                continue
+            digest.update(name.encode("utf-8") + b"\x00")
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()[:12]
+
+    def _map_labels(self, id2label):
+        """將模型的標籤映射為 pos/neg/neu 三類"""
+        mapping = {"pos": [], "neg": [], "neu": []}
+        for index, label in id2label.items():
+            name = str(label).lower()
+            if any(key in name for key in self.NEGATIVE_LABELS):
+                mapping["neg"].append(int(index))
+            elif any(key in name for key in self.POSITIVE_LABELS):
+                mapping["pos"].append(int(index))
+            else:
+                mapping["neu"].append(int(index))
+
+        # 沒有可識別標籤名稱的二分類模型，按慣例 0 為消極、1 為積極
+        if not mapping["pos"] and not mapping["neg"] and len(id2label) == 2:
+            mapping = {"pos": [1], "neg": [0], "neu": []}
+        return mapping
+
+    def _batches(self, lengths):
+        """按長度排序後切分動態批次，使同一批次內的填充最少"""
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        batch = []
+        longest = 0
+        for index in order:
+            longest_if_added = max(longest, lengths[index])
+            if batch and (len(batch) >= self.batch_size or
+                          longest_if_added * (len(batch) + 1) > self.max_batch_tokens):
+                yield batch
+                batch = []
+                longest_if_added = lengths[index]
+            batch.append(index)
+            longest = longest_if_added
+        if batch:
+            yield batch
+
+    def score_batch(self, texts):
+        """
+        批量計算文本情感得分
+
+        參數:
+            texts: 文本列表
+
+        返回:
+            list: 與texts逐一對應的 pos/neg/neu/compound 得分字典
+        """
+        if not texts:
+            return []
+
+        torch = self._torch
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+        results = [None] * len(texts)
+
+        with torch.inference_mode():
+            for batch in self._batches(lengths):
+                features = self.tokenizer.pad(
+                    {key: [encoded[key][i] for i in batch] for key in encoded.keys()},
+                    return_tensors="pt"
+                )
+                probs = torch.softmax(self.model(**features).logits, dim=-1).tolist()
+                for index, row in zip(batch, probs):
+                    pos = sum(row[i] for i in self._label_index["pos"])
+                    neg = sum(row[i] for i in self._label_index["neg"])
+                    neu = sum(row[i] for i in self._label_index["neu"])
+                    results[index] = {"pos": pos, "neg": neg, "neu": neu, "compound": pos - neg}
+
+        return results
+
+
+def benchmark(texts, backend, lexicon_analyzer=None, repeat=1):
+    """
+    比較Transformer後端與詞典後端的吞吐量
+
+    參數:
+        texts: 用於測試的文本列表
+        backend: TransformerSentimentBackend實例
+        lexicon_analyzer: 可選，SentimentAnalyzer實例，默認新建一個jieba詞典分析器
+        repeat: 重複次數
+
+    返回:
+        dict: 各後端的每秒文章數及相對倍數
+    """
+    if lexicon_analyzer is None:
+        from .sentiment_analyzer import SentimentAnalyzer
+        lexicon_analyzer = SentimentAnalyzer()
+
+    def measure(score):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            score(texts)
+        elapsed = time.perf_counter() - start
+        return len(texts) * repeat / elapsed if elapsed > 0 else float("inf")
+
+    # 先各運行一次，排除模型和詞典的初始化時間
+    backend.score_batch(texts[:1])
+    lexicon_analyzer._score_texts(texts[:1])
+
+    transformer_rate = measure(backend.score_batch)
+    lexicon_rate = measure(lexicon_analyzer._score_texts)
+    return {
+        "articles": len(texts) * repeat,
+        "transformer_articles_per_sec": transformer_rate,
+        "lexicon_articles_per_sec": lexicon_rate,
+        "lexicon_speedup": lexicon_rate / transformer_rate if transformer_rate else None
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from .text_normalizer import prepare_articles
+
+    from .sentiment_analyzer import SentimentAnalyzer
+
+    parser = argparse.ArgumentParser(description="Transformer情感後端吞吐量測試")
+    parser.add_argument("model_dir", help="本地模型目錄")
+    parser.add_argument("news_json", help="新聞JSON文件，例如 data/news/*.json")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.news_json, "r", encoding="utf-8-sig") as f:
+        news_list = json.load(f)
+
+    analyzer = SentimentAnalyzer()
+    sample, _ = prepare_articles(news_list)
+    transformer = TransformerSentimentBackend(args.model_dir, num_threads=args.threads, quantize=args.quantize)
+    print(json.dumps(benchmark(sample, transformer, analyzer, args.repeat), ensure_ascii=False, indent=2))
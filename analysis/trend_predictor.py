@@ -1,146 +1,122 @@
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import re
+from datetime import datetime
+
+from .metrics import metrics
 
 class TrendPredictor:
     """趨勢預測器"""
-    
+
     def __init__(self):
         """初始化趨勢預測器"""
         # 積極情感詞和消極情感詞的權重
         self.positive_weight = 1.5
         self.negative_weight = 1.0
-        
+
         # 時間權重參數（越近的新聞權重越高）
         self.time_decay_factor = 0.9
-    
-    def _calculate_time_weight(self, news_date, now=None):
-        """計算時間權重，越近的新聞權重越高"""
-        if now is None:
-            now = datetime.now()
-        
-        # 將字符串日期轉換為datetime對象
-        if isinstance(news_date, str):
-            try:
-                news_date = datetime.strptime(news_date, "%Y-%m-%d %H:%M:%S")
-            except:
-                news_date = now
-        
-        # 計算距離現在的小時數
-        hours_diff = max(0, (now - news_date).total_seconds() / 3600)
-        
-        # 應用時間衰減因子
-        weight = self.time_decay_factor ** hours_diff
-        
-        return weight
-    
-    def _apply_weights(self, news_sentiments):
-        """應用時間權重和情感權重"""
-        now = datetime.now()
-        weighted_sentiments = []
-        
-        for item in news_sentiments:
-            # 獲取情感得分
-            sentiment = item["sentiment"]
-            compound = sentiment["compound"]
-            
-            # 計算時間權重
-            time_weight = self._calculate_time_weight(item["date"], now)
-            
-            # 應用情感權重
-            if compound > 0:
-                weighted_sentiment = compound * self.positive_weight * time_weight
-            else:
-                weighted_sentiment = compound * self.negative_weight * time_weight
-            
-            weighted_sentiments.append(weighted_sentiment)
-        
-        return weighted_sentiments
-    
-    def _analyze_momentum(self, news_sentiments):
-        """分析情感動量（趨勢）"""
-        # 按時間排序
-        sorted_sentiments = sorted(news_sentiments, key=lambda x: x["date"])
-        
-        # 如果新聞數量太少，無法分析動量
-        if len(sorted_sentiments) < 3:
-            return 0
-        
-        # 將新聞分為前半部分和後半部分
-        mid_point = len(sorted_sentiments) // 2
-        early_sentiments = sorted_sentiments[:mid_point]
-        recent_sentiments = sorted_sentiments[mid_point:]
-        
-        # 計算前半部分和後半部分的平均情感得分
-        early_avg = sum(item["sentiment"]["compound"] for item in early_sentiments) / len(early_sentiments)
-        recent_avg = sum(item["sentiment"]["compound"] for item in recent_sentiments) / len(recent_sentiments)
-        
-        # 計算動量（情感變化）
-        momentum = recent_avg - early_avg
-        
-        return momentum
-    
-    def predict(self, news_list, sentiment_results=None):
+
+    def _to_timestamps(self, dates, now):
         """
-        基於新聞和情感分析結果預測趨勢
-        
+        將日期列轉換為int64秒級時間戳，無法解析的日期視為當前時間
+
         參數:
-            news_list: 新聞列表
-            sentiment_results: 情感分析結果，如果為None則內部計算
-            
+            dates: 日期列表（"YYYY-MM-DD HH:MM:SS"字符串或datetime對象）
+            now: 當前時間（datetime）
+
         返回:
-            dict: 趨勢預測結果
+            numpy.ndarray: int64時間戳數組
         """
-        # 如果沒有提供情感分析結果
-        if sentiment_results is None:
-            from .sentiment_analyzer import SentimentAnalyzer
-            sentiment_analyzer = SentimentAnalyzer()
-            sentiment_results = sentiment_analyzer.analyze(news_list)
-        
-        # 獲取情感分析結果
-        news_sentiments = sentiment_results.get("news_sentiments", [])
-        overall_sentiment = sentiment_results.get("overall_sentiment", "中性")
-        keywords = sentiment_results.get("keywords", [])
-        
-        # 如果沒有足夠的新聞，無法預測
-        if len(news_sentiments) < 2:
-            return {
-                "trend": "不確定",
-                "confidence": 0,
-                "reason": "新聞數量不足，無法預測趨勢"
-            }
-        
-        # 應用權重
-        weighted_sentiments = self._apply_weights(news_sentiments)
-        
-        # 計算加權平均情感得分
-        weighted_avg = sum(weighted_sentiments) / len(weighted_sentiments)
-        
-        # 分析情感動量（趨勢）
-        momentum = self._analyze_momentum(news_sentiments)
-        
-        # 結合情感得分和動量預測趨勢
-        trend_score = weighted_avg + momentum * 0.5
-        
+        now_ts = np.datetime64(now, "s")
+        # 快速路徑：全部是datetime或標準格式字符串時整列一次解析；
+        # 只有日期等其他形式的字符串走逐個處理，與strptime一樣視為無法解析
+        if all(isinstance(d, datetime) or (isinstance(d, str) and len(d) == 19 and d[10] == " ") or d is None
+               for d in dates):
+            try:
+                values = np.array(["" if d is None else d for d in dates], dtype="datetime64[s]")
+                return np.where(np.isnat(values), now_ts, values).astype(np.int64)
+            except ValueError:
+                pass
+
+        # 含有無法解析的日期時逐個處理
+        values = np.empty(len(dates), dtype="datetime64[s]")
+        for i, date in enumerate(dates):
+            try:
+                if isinstance(date, str):
+                    date = datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
+                values[i] = np.datetime64(date, "s") if isinstance(date, datetime) else now_ts
+            except ValueError:
+                values[i] = now_ts
+        return np.where(np.isnat(values), now_ts, values).astype(np.int64)
+
+    def _to_columns(self, news_sentiments, now):
+        """把每條新聞的情感結果轉換為列式數組：(時間戳int64, 複合得分float64)"""
+        timestamps = self._to_timestamps([item["date"] for item in news_sentiments], now)
+        compounds = np.fromiter((item["sentiment"]["compound"] for item in news_sentiments),
+                                dtype=np.float64, count=len(news_sentiments))
+        return timestamps, compounds
+
+    def _apply_weights(self, timestamps, compounds, now):
+        """應用時間權重和情感權重（向量化）"""
+        # 計算距離現在的小時數，並應用時間衰減因子
+        hours_diff = np.maximum(0, (np.datetime64(now, "s").astype(np.int64) - timestamps) / 3600.0)
+        time_weights = np.power(self.time_decay_factor, hours_diff)
+
+        # 積極和消極情感使用不同權重
+        sentiment_weights = np.where(compounds > 0, self.positive_weight, self.negative_weight)
+        return compounds * sentiment_weights * time_weights
+
+    def _group_momentum(self, groups, timestamps, compounds, n_groups):
+        """
+        分組計算情感動量：每組按時間排序後，後半部分平均得分減去前半部分平均得分
+
+        返回:
+            numpy.ndarray: 每組的動量，新聞少於3條的組為0
+        """
+        counts = np.bincount(groups, minlength=n_groups)
+        order = np.lexsort((timestamps, groups))
+        sorted_groups = groups[order]
+
+        # 每條新聞在組內按時間的名次
+        group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rank = np.arange(len(order)) - group_starts[sorted_groups]
+
+        mid_points = counts // 2
+        is_early = rank < mid_points[sorted_groups]
+        sorted_compounds = compounds[order]
+
+        early_sum = np.bincount(sorted_groups, weights=np.where(is_early, sorted_compounds, 0), minlength=n_groups)
+        recent_sum = np.bincount(sorted_groups, weights=np.where(is_early, 0, sorted_compounds), minlength=n_groups)
+
+        valid = counts >= 3
+        early_avg = np.divide(early_sum, mid_points, out=np.zeros(n_groups), where=valid)
+        recent_avg = np.divide(recent_sum, counts - mid_points, out=np.zeros(n_groups), where=valid)
+        return np.where(valid, recent_avg - early_avg, 0.0)
+
+    def _analyze_momentum(self, timestamps, compounds):
+        """分析情感動量（趨勢）"""
+        groups = np.zeros(len(compounds), dtype=np.int64)
+        return float(self._group_momentum(groups, timestamps, compounds, 1)[0])
+
+    def _build_prediction(self, news_count, trend_score, momentum, overall_sentiment, keywords):
+        """根據趨勢得分生成預測結果"""
         # 根據趨勢得分確定趨勢
         if trend_score > 0.1:
             trend = "看漲"
-            reason = f"基於{len(news_list)}條新聞分析，整體情感為{overall_sentiment}，且情感持續向好"
+            reason = f"基於{news_count}條新聞分析，整體情感為{overall_sentiment}，且情感持續向好"
         elif trend_score < -0.1:
             trend = "看跌"
-            reason = f"基於{len(news_list)}條新聞分析，整體情感為{overall_sentiment}，且情感持續惡化"
+            reason = f"基於{news_count}條新聞分析，整體情感為{overall_sentiment}，且情感持續惡化"
         else:
             trend = "震盪"
-            reason = f"基於{len(news_list)}條新聞分析，整體情感為{overall_sentiment}，但趨勢不明顯"
-        
+            reason = f"基於{news_count}條新聞分析，整體情感為{overall_sentiment}，但趨勢不明顯"
+
         # 添加關鍵詞信息
         if keywords:
             reason += f"，關鍵詞包括: {', '.join(keywords[:3])}"
-        
+
         # 計算信心指數（0-1之間）
         confidence = min(1.0, abs(trend_score) * 2)
-        
+
         return {
             "trend": trend,
             "confidence": confidence,
@@ -148,4 +124,93 @@ class TrendPredictor:
             "momentum": momentum,
             "reason": reason,
             "keywords": keywords[:5] if keywords else []
-        } 
\ No newline at end of file
+        }
+
+    @metrics.timed("analysis_stage_seconds", stage="trend")
+    def predict_many(self, items, now=None):
+        """
+        一次計算多個股票的趨勢預測
+
+        所有股票的新聞合併為列式數組，時間衰減、加權平均和分半動量都以分組向量運算完成。
+
+        參數:
+            items: {股票代號: (新聞列表, 情感分析結果)}，新聞列表可為None
+            now: 可選，計算時間權重的基準時間，默認為當前時間
+
+        返回:
+            dict: {股票代號: 趨勢預測結果}
+        """
+        if now is None:
+            now = datetime.now()
+
+        tickers = list(items)
+        predictions = {}
+        group_ids = []
+        timestamps = []
+        compounds = []
+
+        for ticker in tickers:
+            _, sentiment_results = items[ticker]
+            news_sentiments = (sentiment_results or {}).get("news_sentiments", [])
+
+            # 如果沒有足夠的新聞，無法預測
+            if len(news_sentiments) < 2:
+                predictions[ticker] = {
+                    "trend": "不確定",
+                    "confidence": 0,
+                    "reason": "新聞數量不足，無法預測趨勢"
+                }
+                continue
+
+            ticker_timestamps, ticker_compounds = self._to_columns(news_sentiments, now)
+            group_ids.append(np.full(len(news_sentiments), len(group_ids), dtype=np.int64))
+            timestamps.append(ticker_timestamps)
+            compounds.append(ticker_compounds)
+
+        if not group_ids:
+            return predictions
+
+        scored = [ticker for ticker in tickers if ticker not in predictions]
+        groups = np.concatenate(group_ids)
+        timestamps = np.concatenate(timestamps)
+        compounds = np.concatenate(compounds)
+        n_groups = len(scored)
+
+        # 應用權重並計算每組的加權平均情感得分
+        weighted = self._apply_weights(timestamps, compounds, now)
+        weighted_avg = np.bincount(groups, weights=weighted, minlength=n_groups) / np.bincount(groups, minlength=n_groups)
+
+        # 分析情感動量（趨勢），並結合情感得分和動量預測趨勢
+        momentum = self._group_momentum(groups, timestamps, compounds, n_groups)
+        trend_scores = weighted_avg + momentum * 0.5
+
+        for index, ticker in enumerate(scored):
+            news_list, sentiment_results = items[ticker]
+            news_count = len(news_list) if news_list is not None else len(sentiment_results["news_sentiments"])
+            predictions[ticker] = self._build_prediction(
+                news_count,
+                float(trend_scores[index]),
+                float(momentum[index]),
+                sentiment_results.get("overall_sentiment", "中性"),
+                sentiment_results.get("keywords", [])
+            )
+
+        return {ticker: predictions[ticker] for ticker in tickers}
+
+    def predict(self, news_list, sentiment_results=None):
+        """
+        基於新聞和情感分析結果預測趨勢
+
+        參數:
+            news_list: 新聞列表
+            sentiment_results: 情感分析結果，如果為None則內部計算
+
+        返回:
+            dict: 趨勢預測結果
+        """
+        # 如果沒有提供情感分析結果
+        if sentiment_results is None:
+            from .registry import get_analyzer
+            sentiment_results = get_analyzer().analyze(news_list)
+
+        return self.predict_many({None: (news_list, sentiment_results)})[None]
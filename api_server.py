@@ -1,20 +1,207 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 import os
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 
 from crawlers.yahoo_crawler import YahooFinanceCrawler
 from crawlers.moneydj_crawler import MoneyDJCrawler
 from crawlers.cnyes_crawler import CnyesCrawler
+from crawlers.browser import Deadline
 from utils.data_manager import DataManager
+from utils.news_service import NewsService
+from utils.news_store import NewsStore
+from utils.job_manager import CrawlJobManager, JobQueueFullError
+from utils.admission import BACKGROUND, AdmissionController, AdmissionRejected
+from utils.subscriptions import SubscriberLimitError, SubscriptionHub
+from utils.response_cache import ResponseCache
+from utils.api_encoding import FastJSONProvider, compress_response, parse_fields, project_fields
+from analysis.metrics import metrics
+from analysis.registry import get_analyzer, get_entity_linker, warm_up
+from analysis.sentiment_stream import StreamingSentimentAggregator
+from analysis.ticker_index import TickerSentimentIndex
+from analysis.trend_predictor import TrendPredictor
 
 app = Flask(__name__)
+# 安裝了orjson時用它序列化響應
+app.json = FastJSONProvider(app)
+
+# 大於COMPRESS_MIN_SIZE字節的JSON響應按Accept-Encoding壓縮
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
 
 # 初始化爬蟲和數據管理器
 yahoo_crawler = YahooFinanceCrawler()
 moneydj_crawler = MoneyDJCrawler()
 cnyes_crawler = CnyesCrawler()
 data_manager = DataManager()
+news_service = NewsService({
+    "yahoo": yahoo_crawler,
+    "cnyes": cnyes_crawler,
+    "moneydj": moneydj_crawler
+}, data_manager)
+
+# 後台爬取任務：有界線程池執行，相同參數的任務自動合併，結果保留10分鐘
+# 爬取時限（秒）：deadline參數未指定時使用NEWS_DEADLINE，最多NEWS_DEADLINE_MAX；後台任務使用CRAWL_JOB_DEADLINE
+NEWS_DEADLINE = float(os.environ.get("NEWS_DEADLINE", 45))
+NEWS_DEADLINE_MAX = float(os.environ.get("NEWS_DEADLINE_MAX", 300))
+CRAWL_JOB_DEADLINE = float(os.environ.get("CRAWL_JOB_DEADLINE", 300))
+
+# 即時爬取的准入控制：最多CRAWL_MAX_ACTIVE個同時爬取，前台請求最多CRAWL_MAX_QUEUE個排隊、
+# 每個最多等待CRAWL_MAX_QUEUE_WAIT秒；緩存和存儲讀取不經過准入控制
+admission = AdmissionController(
+    max_active=int(os.environ.get("CRAWL_MAX_ACTIVE", 2)),
+    max_queue=int(os.environ.get("CRAWL_MAX_QUEUE", 8)),
+    max_wait=float(os.environ.get("CRAWL_MAX_QUEUE_WAIT", 10))
+)
+
+def _run_job(params):
+    """後台任務以低優先級取得爬取名額，名額空出時前台請求優先"""
+    with admission.slot(priority=BACKGROUND):
+        return news_service.crawl(**params, deadline=CRAWL_JOB_DEADLINE)
+
+def _live_crawl(params, deadline):
+    """
+    取得爬取名額後即時爬取，過載時拋出AdmissionRejected
+    
+    排隊時間計入請求時限：最多排隊到時限為止，取得名額後只用剩餘的時間爬取，
+    避免請求已經返回後才開始爬取。
+    """
+    if not deadline:
+        with admission.slot():
+            return news_service.crawl(**params, deadline=deadline)
+    
+    budget = Deadline(deadline)
+    with admission.slot(max_wait=min(admission.max_wait, deadline)):
+        remaining = budget.remaining()
+        if remaining <= 0:
+            raise AdmissionRejected(f"排隊超過{deadline:g}秒時限，伺服器繁忙", 503, 1)
+        return news_service.crawl(**params, deadline=remaining)
+
+job_manager = CrawlJobManager(
+    _run_job,
+    max_workers=int(os.environ.get("CRAWL_JOB_WORKERS", 2)),
+    result_ttl=int(os.environ.get("CRAWL_JOB_TTL", 600))
+)
+
+# /api/v2/news 的響應緩存：新鮮期內直接返回，過期後先返回舊值並後台刷新，同時未命中的相同請求只爬取一次
+news_cache = ResponseCache(
+    ttl=int(os.environ.get("NEWS_CACHE_TTL", 60)),
+    stale_ttl=int(os.environ.get("NEWS_CACHE_STALE", 300)),
+    name="news",
+    # 因時限只取得部分結果時不緩存
+    cacheable=lambda result: not result.get("partial")
+)
+
+# 存儲讀取模式：數據超過NEWS_STORE_REFRESH_AFTER秒時提交後台刷新，超過NEWS_STORE_MAX_AGE秒或從未爬取時才同步爬取
+NEWS_READ_MODE = os.environ.get("NEWS_READ_MODE", "live")
+NEWS_STORE_REFRESH_AFTER = int(os.environ.get("NEWS_STORE_REFRESH_AFTER", 300))
+NEWS_STORE_MAX_AGE = int(os.environ.get("NEWS_STORE_MAX_AGE", 1800))
+
+# 情感和趨勢接口：一次請求最多的關鍵字數，默認從存儲讀取新聞
+MAX_BATCH_KEYWORDS = int(os.environ.get("MAX_BATCH_KEYWORDS", 50))
+ANALYSIS_READ_MODE = os.environ.get("ANALYSIS_READ_MODE", "store")
+# 批量分析同時讀取或爬取的關鍵字數，即時爬取仍受准入控制限制
+BATCH_FETCH_WORKERS = int(os.environ.get("BATCH_FETCH_WORKERS", 4))
+BATCH_DEADLINE_GRACE = 1.0
+trend_predictor = TrendPredictor()
+
+# 進程內共用的增量情感指數，每次分析後更新，/api/v2/index直接查詢而不需重新讀取新聞
+ticker_index = TickerSentimentIndex(os.path.join(data_manager.data_dir, "state", "ticker_index.json"))
+
+# 新文章推送：每個被訂閱的股票每SUBSCRIPTION_INTERVAL秒只爬取一次，新文章經情感分析後推送給所有訂閱者
+SUBSCRIPTION_INTERVAL = int(os.environ.get("SUBSCRIPTION_INTERVAL", 300))
+SUBSCRIPTION_LIMIT = int(os.environ.get("SUBSCRIPTION_LIMIT", 10))
+SUBSCRIPTION_HEARTBEAT = 15
+
+def _analyze_many(news_by_keyword):
+    """
+    一次分析多個關鍵字的新聞
+    
+    自動機引擎評分不分詞，此時不為關鍵詞額外分詞一遍，改從語料統計查詢近30天的熱門關鍵詞
+    """
+    analyzer = get_analyzer()
+    extract_keywords = analyzer.tokenizes_for_scoring
+    results = analyzer.analyze_many(news_by_keyword, extract_keywords=extract_keywords)
+    if not extract_keywords:
+        for keyword, sentiment_results in results.items():
+            sentiment_results["keywords"] = [item["keyword"] for item in data_manager.get_keywords(keyword)]
+    return results
+
+def _save_sentiment(keyword, news_list, sentiment_results):
+    """
+    把分析結果寫入情感匯總，並更新增量情感指數
+    
+    新聞提到的其他股票也一併更新，與命令行程式相同，一次爬取可供多個股票使用
+    """
+    linker = get_entity_linker()
+    ticker_key = linker.ticker_key(keyword)
+    groups = {ticker_key: (news_list, sentiment_results)}
+    for ticker, group in linker.split_by_ticker(news_list, sentiment_results).items():
+        groups.setdefault(ticker, group)
+    
+    for ticker, (ticker_news, ticker_results) in groups.items():
+        data_manager.save_sentiment(ticker, ticker_news, ticker_results)
+        ticker_index.update(ticker, ticker_results, ticker_news)
+    ticker_index.save()
+
+def _poll_ticker(keyword):
+    """推送中心的爬取：以低優先級取得名額，結果同時寫入存儲和響應緩存"""
+    params = {"keyword": keyword, "source": "all", "limit": SUBSCRIPTION_LIMIT, "hours": 24}
+    result = _run_job(params)
+    if not result["partial"]:
+        news_cache.put(_cache_key(params), result)
+    return result["news"]
+
+def _analyze_new_articles(keyword, news_list):
+    """對新文章做情感分析並寫入情感匯總"""
+    news_list = [dict(news) for news in news_list]
+    sentiment_results = _analyze_many({keyword: news_list})[keyword]
+    _save_sentiment(keyword, news_list, sentiment_results)
+    return sentiment_results["news_sentiments"]
+
+subscription_hub = SubscriptionHub(
+    _poll_ticker,
+    _analyze_new_articles,
+    interval=SUBSCRIPTION_INTERVAL,
+    max_clients=int(os.environ.get("SUBSCRIPTION_MAX_CLIENTS", 200))
+)
+
+# 在開始服務前完成詞典載入等一次性初始化，避免第一個請求承擔冷啟動延遲
+warm_up()
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_latency(response):
+    """記錄每個請求的處理耗時（流式響應記錄到開始發送為止）"""
+    start = g.get('request_start')
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe("http_request_seconds", time.perf_counter() - start,
+                        endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+@app.after_request
+def _encode_response(response):
+    """為GET請求的JSON響應加上ETag（If-None-Match相符時返回304），再按客戶端支持的方式壓縮"""
+    if (request.method in ('GET', 'HEAD') and response.status_code == 200
+            and response.is_json and not response.is_streamed):
+        # 弱ETag：壓縮前後的內容視為同一版本
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+    return compress_response(response, request.headers.get('Accept-Encoding', ''), min_size=COMPRESS_MIN_SIZE)
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus文本格式的指標"""
+    # 從任務管理器和響應緩存取得當前狀態
+    for status, count in job_manager.stats().items():
+        metrics.set("crawl_jobs", count, status=status)
+    metrics.set("admission_max_active", admission.max_active)
+    metrics.set("response_cache_entries", len(news_cache), cache=news_cache.name)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route('/')
 def index():
@@ -24,11 +211,255 @@ def index():
         "version": "2.0",
         "endpoints": {
             "/api/v2/news": "獲取新聞數據",
-            "/api/v2/news_detail": "獲取新聞詳情"
+            "/api/v2/news_detail": "獲取新聞詳情",
+            "/api/v2/sentiment": "批量情感分析（POST）",
+            "/api/v2/trend": "批量趨勢預測（POST）",
+            "/api/v2/index": "查詢增量情感指數",
+            "/api/v2/history": "從情感匯總查詢長期走勢",
+            "/api/v2/subscribe": "訂閱股票的新文章推送（SSE）",
+            "/api/v2/jobs": "提交後台爬取任務（POST）",
+            "/api/v2/jobs/<job_id>": "查詢任務狀態",
+            "/api/v2/jobs/<job_id>/result": "獲取任務結果",
+            "/metrics": "Prometheus格式的延遲和計數指標"
         },
         "documentation": "請參閱README.md了解更多信息"
     })
 
+def _error(message, status_code, **extra):
+    """返回錯誤響應"""
+    body = {"status": "error", "message": message}
+    body.update(extra)
+    return jsonify(body), status_code
+
+def _overloaded(error, **extra):
+    """爬取請求被准入控制拒絕時的響應（429或503，附帶Retry-After）"""
+    response, status_code = _error(str(error), error.status_code, **extra)
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, status_code
+
+def _parse_news_params(values):
+    """
+    解析新聞查詢參數
+    
+    參數:
+        values: 查詢字符串或JSON請求體
+        
+    返回:
+        dict: keyword、source、limit、hours
+    """
+    keyword = str(values.get('keyword', '')).strip()
+    if not keyword:
+        raise ValueError("缺少關鍵字參數")
+    
+    source = str(values.get('source', 'all')).lower()
+    news_service.resolve_sources(source)
+    
+    try:
+        limit = int(values.get('limit', 10))
+        hours = int(values.get('hours', 24))
+    except (TypeError, ValueError):
+        raise ValueError("limit和hours必須是整數")
+    if limit <= 0 or hours <= 0:
+        raise ValueError("limit和hours必須大於0")
+    
+    return {"keyword": keyword, "source": source, "limit": limit, "hours": hours}
+
+def _parse_deadline(values):
+    """解析deadline參數（秒），未指定時使用服務器默認值，超過上限時取上限"""
+    try:
+        deadline = float(values.get('deadline', NEWS_DEADLINE))
+    except (TypeError, ValueError):
+        raise ValueError("deadline必須是數字")
+    if deadline <= 0:
+        raise ValueError("deadline必須大於0")
+    return min(deadline, NEWS_DEADLINE_MAX)
+
+def _source_status(status):
+    """單個來源的爬取狀態"""
+    return {
+        "status": status["status"],
+        "count": status["count"],
+        "elapsed_time": f"{status['elapsed']:.2f}秒",
+        "error": status["error"]
+    }
+
+def _news_response(result, params, fields=None):
+    """
+    把爬取結果整理為新聞API的響應內容
+    
+    參數:
+        result: NewsService.crawl或read的結果
+        params: 新聞查詢參數
+        fields: 可選，每條新聞只返回這些字段
+    """
+    all_news = result["news"]
+    body = {
+        "status": "success",
+        "message": f"成功獲取{len(all_news)}條新聞",
+        "data": project_fields(all_news, fields),
+        "count": len(all_news),
+        "elapsed_time": f"{result['elapsed']:.2f}秒",
+        "keyword": params["keyword"],
+        "source": params["source"],
+        "limit": params["limit"],
+        "hours": params["hours"],
+        "partial": result.get("partial", False)
+    }
+    if "source_status" in result:
+        body["source_status"] = {name: _source_status(status) for name, status in result["source_status"].items()}
+    if body["partial"]:
+        body["message"] += "（超過時限，只返回已取得的部分結果）"
+    return body
+
+def _cache_key(params):
+    """標準化的緩存鍵：關鍵字去除多餘空白並忽略大小寫"""
+    keyword = NewsStore.normalize_keyword(params["keyword"])
+    return (keyword, params["source"], params["limit"], params["hours"])
+
+def _cache_headers(state, age, max_age, stale_ttl):
+    """緩存相關的響應頭"""
+    return {
+        "Cache-Control": f"public, max-age={max(0, max_age)}, stale-while-revalidate={stale_ttl}",
+        "Age": str(max(0, int(age))),
+        "X-Cache": state.upper()
+    }
+
+def _read_stored(params):
+    """
+    從存儲讀取新聞，數據較舊時提交後台刷新
+    
+    返回:
+        tuple: (結果, 響應頭)，存儲中的數據不夠新鮮時響應頭為None，由調用方同步爬取
+    """
+    result = news_service.read(**params)
+    age = result["age"]
+    if age is None or age > NEWS_STORE_MAX_AGE:
+        return result, None
+    
+    if age > NEWS_STORE_REFRESH_AFTER:
+        try:
+            # 相同參數的刷新任務正在進行時不會重複提交
+            job_manager.submit(params)
+        except JobQueueFullError:
+            pass
+    
+    return result, _cache_headers("store", age, NEWS_STORE_REFRESH_AFTER - int(age),
+                                  NEWS_STORE_MAX_AGE - NEWS_STORE_REFRESH_AFTER)
+
+def _fetch_news(params, mode="live", refresh=False, deadline=None):
+    """
+    按讀取模式取得新聞：store模式優先讀取存儲，否則經響應緩存和准入控制爬取
+    
+    store模式下存儲的數據已超過NEWS_STORE_MAX_AGE但爬取請求被拒絕時，仍返回存儲中的舊數據。
+    
+    參數:
+        params: _parse_news_params返回的參數
+        mode: live 或 store
+        refresh: 是否忽略緩存和存儲強制爬取
+        deadline: 可選，爬取時限秒數
+        
+    返回:
+        tuple: (與NewsService.crawl相同結構的結果, 緩存相關的響應頭)
+        
+    異常:
+        AdmissionRejected: 需要即時爬取但伺服器過載
+    """
+    stored = None
+    if mode == 'store' and not refresh:
+        stored, headers = _read_stored(params)
+        if headers is not None:
+            return stored, headers
+    
+    try:
+        result, state, stored_at = news_cache.get_or_compute(
+            _cache_key(params), lambda: _live_crawl(params, deadline), refresh=refresh)
+    except AdmissionRejected:
+        # 過載時寧可返回較舊的存儲數據，也不讓請求失敗
+        if stored is not None and stored["age"] is not None:
+            return stored, _cache_headers("store-stale", stored["age"], 0, 0)
+        raise
+    age = time.time() - stored_at
+    return result, _cache_headers(state, age, news_cache.ttl - int(age), news_cache.stale_ttl)
+
+# 流式響應格式及其Content-Type
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def _stream_format(args, headers):
+    """從stream參數或Accept請求頭取得流式格式，不需要流式響應時返回None"""
+    fmt = args.get('stream', '').lower()
+    if fmt in ('', '0', 'false'):
+        accept = headers.get('Accept', '')
+        for name, mimetype in STREAM_FORMATS.items():
+            if mimetype in accept:
+                return name
+        return None
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"不支持的流式格式: {fmt}")
+    return fmt
+
+def _stream_news(params, fmt, deadline=None, fields=None, sentiment=False):
+    """
+    流式返回新聞：各來源同時爬取，每條新聞在其來源完成時立即發送
+    
+    事件依次為 article（每條新聞）、source_done（每個來源完成）和 summary（最後的匯總），
+    NDJSON每行一個 {"event": 類型, ...} 對象，SSE以事件類型作為event字段。
+    sentiment為True時，每個來源完成後對它的新聞評分，並在source_done之後發送 sentiment 事件
+    （到目前為止所有來源的累計情感快照）。
+    爬取名額在開始發送前取得（過載時拋出AdmissionRejected），流結束或客戶端斷開時釋放。
+    與 _live_crawl 相同，有時限時排隊時間計入時限，取得名額後只用剩餘的時間爬取。
+    """
+    if deadline:
+        budget = Deadline(deadline)
+        acquired_at = admission.acquire(max_wait=min(admission.max_wait, deadline))
+        deadline = budget.remaining()
+        if deadline <= 0:
+            admission.release(acquired_at)
+            raise AdmissionRejected(f"排隊超過{budget.seconds:g}秒時限，伺服器繁忙", 503, 1)
+    else:
+        acquired_at = admission.acquire()
+    aggregator = StreamingSentimentAggregator(get_analyzer()) if sentiment else None
+
+    def encode(event, body):
+        if fmt == "sse":
+            return f"event: {event}\ndata: {app.json.dumps(body)}\n\n"
+        return app.json.dumps({"event": event, **body}) + "\n"
+    
+    def generate():
+        pending = {}
+        crawl = news_service.iter_crawl(**params, deadline=deadline)
+        try:
+            for event, name, payload in crawl:
+                if event == "article":
+                    if aggregator is not None and not payload.get("is_sample"):
+                        # 分析時會在新聞上緩存標準化文本，使用副本避免改動響應緩存中的新聞
+                        pending.setdefault(name, []).append(dict(payload))
+                    yield encode(event, {"source": name, "data": project_fields([payload], fields)[0]})
+                elif event == "source_done":
+                    yield encode(event, {"source": name, **_source_status(payload)})
+                    if aggregator is not None:
+                        # 每個來源的新聞整批評分一次，示例數據不計入
+                        aggregator.add_many(pending.pop(name, []))
+                        yield encode("sentiment", {"source": name, **aggregator.snapshot()})
+                else:
+                    # 完整結果寫入響應緩存，之後的普通請求可以直接命中
+                    if not payload["partial"]:
+                        news_cache.put(_cache_key(params), payload)
+                    summary = _news_response(payload, params)
+                    del summary["data"]
+                    summary["sources"] = payload["sources"]
+                    yield encode(event, summary)
+        finally:
+            # 客戶端斷開時關閉爬取生成器，使其取消時限並停止仍在運行的爬蟲
+            crawl.close()
+    
+    response = Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[fmt])
+    # WSGI伺服器關閉響應時（包括客戶端斷開）釋放名額
+    response.call_on_close(lambda: admission.release(acquired_at))
+    response.headers["Cache-Control"] = "no-cache"
+    # 避免反向代理緩衝整個響應
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 @app.route('/api/v2/news')
 def get_news():
     """
@@ -39,71 +470,421 @@ def get_news():
         source: 新聞來源 (yahoo, cnyes, moneydj, all)
         limit: 每個來源最多返回的新聞條數
         hours: 搜索多少小時內的新聞
+        refresh: 可選，為true時忽略緩存重新爬取（請求頭 Cache-Control: no-cache 同效）
+        mode: 可選，live（爬取，默認）或 store（從已保存的新聞讀取）
+        stream: 可選，ndjson 或 sse，逐條流式返回新聞（Accept請求頭為對應類型時同效）
+        deadline: 可選，爬取時限秒數，超過時取消未完成的來源並返回已取得的新聞（partial為true）
+        fields: 可選，以逗號分隔的字段名，每條新聞只返回這些字段（例如 title,link,date）
+        sentiment: 可選，流式響應時為true則在每個來源完成後發送累計情感快照
     """
-    # 獲取查詢參數
-    keyword = request.args.get('keyword', '')
-    source = request.args.get('source', 'all').lower()
-    limit = int(request.args.get('limit', 10))
-    hours = int(request.args.get('hours', 24))
+    try:
+        params = _parse_news_params(request.args)
+        stream_format = _stream_format(request.args, request.headers)
+        deadline = _parse_deadline(request.args)
+    except ValueError as e:
+        return _error(str(e), 400, data=[], count=0)
+    fields = parse_fields(request.args.get('fields'))
     
-    if not keyword:
-        return jsonify({
-            "status": "error",
-            "message": "缺少關鍵字參數",
-            "data": [],
-            "count": 0
-        }), 400
+    if stream_format:
+        try:
+            sentiment = request.args.get('sentiment', '').lower() in ('1', 'true', 'yes')
+            return _stream_news(params, stream_format, deadline, fields, sentiment)
+        except AdmissionRejected as e:
+            return _overloaded(e, data=[], count=0)
     
-    all_news = []
-    start_time = time.time()
+    mode = request.args.get('mode', NEWS_READ_MODE).lower()
+    if mode not in ('live', 'store'):
+        return _error(f"不支持的讀取模式: {mode}", 400, data=[], count=0)
+    
+    refresh = (request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+               or 'no-cache' in request.headers.get('Cache-Control', ''))
     
     try:
-        # 根據來源獲取新聞
-        if source in ['all', 'yahoo']:
-            yahoo_news = yahoo_crawler.crawl(keyword, limit=limit, hours=hours)
-            for news in yahoo_news:
-                # 確保每條新聞都有is_sample字段，如果原本沒有則設為False
-                if 'is_sample' not in news:
-                    news['is_sample'] = False
-            all_news.extend(yahoo_news)
-        
-        if source in ['all', 'cnyes']:
-            cnyes_news = cnyes_crawler.crawl(keyword, limit=limit, hours=hours)
-            for news in cnyes_news:
-                # 確保每條新聞都有is_sample字段，如果原本沒有則設為False
-                if 'is_sample' not in news:
-                    news['is_sample'] = False
-            all_news.extend(cnyes_news)
-        
-        if source in ['all', 'moneydj']:
-            moneydj_news = moneydj_crawler.crawl(keyword, limit=limit, hours=hours)
-            # MoneyDJ爬蟲已經實現了is_sample標記
-            all_news.extend(moneydj_news)
-        
-        # 保存數據
-        data_manager.save_news(all_news, keyword)
-        
-        elapsed_time = time.time() - start_time
+        result, headers = _fetch_news(params, mode, refresh, deadline)
+        response = jsonify(_news_response(result, params, fields))
+        response.headers.update(headers)
+        return response
+    
+    except AdmissionRejected as e:
+        return _overloaded(e, data=[], count=0)
+    except Exception as e:
+        return _error(f"獲取新聞時發生錯誤: {str(e)}", 500, data=[], count=0)
+
+def _parse_batch_params(values):
+    """
+    解析批量分析請求
+    
+    參數:
+        values: JSON請求體或查詢字符串，keywords為列表或以逗號分隔的字符串，
+                其他參數（source、limit、hours）對所有關鍵字生效
         
-        return jsonify({
+    返回:
+        tuple: (每個關鍵字的新聞參數列表, 讀取模式, 整個請求的時限秒數)
+    """
+    keywords = values.get('keywords') or values.get('keyword') or []
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    if not isinstance(keywords, list):
+        raise ValueError("keywords必須是列表")
+    keywords = list(dict.fromkeys(str(keyword).strip() for keyword in keywords if str(keyword).strip()))
+    if not keywords:
+        raise ValueError("缺少關鍵字參數")
+    if len(keywords) > MAX_BATCH_KEYWORDS:
+        raise ValueError(f"一次最多分析{MAX_BATCH_KEYWORDS}個關鍵字")
+    
+    mode = str(values.get('mode', ANALYSIS_READ_MODE)).lower()
+    if mode not in ('live', 'store'):
+        raise ValueError(f"不支持的讀取模式: {mode}")
+    
+    shared = {key: values[key] for key in ('source', 'limit', 'hours') if key in values}
+    return [_parse_news_params({**shared, "keyword": keyword}) for keyword in keywords], mode, _parse_deadline(values)
+
+def _analyze_batch(param_list, mode, deadline):
+    """
+    同時取得所有關鍵字的新聞，再對全部新聞做一次情感分析
+    
+    所有關鍵字共用同一個請求級時限：每次讀取或爬取只使用剩餘的時間，時限到達時仍未取得新聞的關鍵字記為錯誤，
+    其餘關鍵字照常分析。每條新聞的情感得分經持久化緩存讀取，已分析過的新聞不會重新評分；分析結果同時寫入情感匯總。
+    
+    參數:
+        param_list、mode、deadline: _parse_batch_params的返回值
+    
+    返回:
+        tuple: ({關鍵字: (新聞列表, 情感分析結果)}, {關鍵字: 錯誤信息})
+    """
+    budget = Deadline(deadline)
+    timeout_message = f"超過{deadline:g}秒時限"
+    
+    def fetch(params):
+        remaining = budget.remaining()
+        if remaining <= 0:
+            raise TimeoutError(timeout_message)
+        result, _ = _fetch_news(params, mode, deadline=remaining)
+        return result
+    
+    news_by_keyword = {}
+    errors = {}
+    executor = ThreadPoolExecutor(max_workers=min(BATCH_FETCH_WORKERS, len(param_list)),
+                                  thread_name_prefix="batch-fetch")
+    try:
+        futures = {executor.submit(fetch, params): params["keyword"] for params in param_list}
+        # 爬取在時限到達時返回部分結果，多等一點時間讓它們交回
+        done, _ = wait(futures, timeout=budget.remaining() + BATCH_DEADLINE_GRACE)
+        for future, keyword in futures.items():
+            if future not in done:
+                future.cancel()
+                errors[keyword] = timeout_message
+            elif future.exception() is not None:
+                errors[keyword] = str(future.exception())
+            else:
+                # 分析時會在新聞上緩存標準化文本，使用副本避免改動響應緩存中的新聞
+                news_by_keyword[keyword] = [dict(news) for news in future.result()["news"]]
+    finally:
+        # 時限到達時不等待仍在進行的爬取，它們會在各自的時限內結束
+        executor.shutdown(wait=False)
+    
+    analyzed = {}
+    if news_by_keyword:
+        # 所有關鍵字的新聞一次分析：一次緩存查詢、一次評分、一個詞-文檔矩陣
+        results = _analyze_many(news_by_keyword)
+        for keyword, news_list in news_by_keyword.items():
+            try:
+                _save_sentiment(keyword, news_list, results[keyword])
+                analyzed[keyword] = (news_list, results[keyword])
+            except Exception as e:
+                errors[keyword] = str(e)
+    return analyzed, errors
+
+def _parse_days(values, default=30):
+    """解析歷史走勢的天數參數"""
+    try:
+        days = int(values.get('days', default))
+    except (TypeError, ValueError):
+        raise ValueError("days必須是整數")
+    if days <= 0:
+        raise ValueError("days必須大於0")
+    return days
+
+def _sentiment_summary(news_list, sentiment_results):
+    """單個關鍵字的情感分析摘要"""
+    labels = [item["label"] for item in sentiment_results["news_sentiments"]]
+    return {
+        "status": "success",
+        "news_count": len(news_list),
+        "overall_sentiment": sentiment_results["overall_sentiment"],
+        "confidence": sentiment_results["confidence"],
+        "positive": labels.count("積極"),
+        "negative": labels.count("消極"),
+        "neutral": labels.count("中性"),
+        "keywords": sentiment_results["keywords"]
+    }
+
+def _batch_response(results, errors, start_time):
+    """批量分析接口的響應，部分關鍵字失敗時仍返回200，失敗的關鍵字帶有錯誤信息"""
+    for keyword, message in errors.items():
+        results[keyword] = {"status": "error", "message": message}
+    return jsonify({
+        "status": "success" if not errors else "partial",
+        "count": len(results),
+        "results": results,
+        "elapsed_time": f"{time.time() - start_time:.2f}秒"
+    })
+
+@app.route('/api/v2/sentiment', methods=['POST'])
+def analyze_sentiment():
+    """
+    批量情感分析
+    
+    參數（JSON請求體）:
+        keywords: 關鍵字或股票代號列表
+        source、limit、hours: 與 /api/v2/news 相同，對所有關鍵字生效
+        mode: 可選，store（默認，優先讀取已保存的新聞）或 live
+        include_news: 可選，為true時返回每條新聞的情感
+        history: 可選，day 或 hour，附帶情感匯總中的歷史走勢
+        days: 可選，歷史走勢的天數，默認30
+    """
+    start_time = time.time()
+    values = request.get_json(silent=True) or request.args
+    # 先驗證所有參數，避免參數錯誤時仍然爬取和分析
+    try:
+        param_list, mode, deadline = _parse_batch_params(values)
+        history = values.get('history')
+        if history and history not in ('day', 'hour'):
+            raise ValueError("history必須是day或hour")
+        days = _parse_days(values)
+    except (TypeError, ValueError) as e:
+        return _error(str(e), 400)
+    
+    analyzed, errors = _analyze_batch(param_list, mode, deadline)
+    include_news = str(values.get('include_news', '')).lower() in ('1', 'true', 'yes')
+    results = {}
+    for keyword, (news_list, sentiment_results) in analyzed.items():
+        summary = _sentiment_summary(news_list, sentiment_results)
+        if include_news:
+            summary["news_sentiments"] = sentiment_results["news_sentiments"]
+        if history:
+            start = datetime.now() - timedelta(days=days)
+            summary["history"] = data_manager.get_sentiment_history(keyword, start=start, granularity=history)
+            summary["history_summary"] = data_manager.get_sentiment_summary(keyword, start=start,
+                                                                            granularity=history)
+        results[keyword] = summary
+    return _batch_response(results, errors, start_time)
+
+@app.route('/api/v2/trend', methods=['POST'])
+def predict_trend():
+    """
+    批量趨勢預測
+    
+    參數（JSON請求體）:
+        keywords: 關鍵字或股票代號列表
+        source、limit、hours、mode: 與 /api/v2/sentiment 相同
+        days: 可選，附帶情感匯總中最近days天的整體情感，作為長期趨勢的參考
+    """
+    start_time = time.time()
+    values = request.get_json(silent=True) or request.args
+    try:
+        param_list, mode, deadline = _parse_batch_params(values)
+        days = _parse_days(values) if values.get('days') is not None else None
+    except (TypeError, ValueError) as e:
+        return _error(str(e), 400)
+    
+    analyzed, errors = _analyze_batch(param_list, mode, deadline)
+    
+    # 所有關鍵字的趨勢在一次向量化計算中完成
+    predictions = trend_predictor.predict_many(analyzed)
+    results = {}
+    for keyword, prediction in predictions.items():
+        news_list, sentiment_results = analyzed[keyword]
+        results[keyword] = {
             "status": "success",
-            "message": f"成功獲取{len(all_news)}條新聞",
-            "data": all_news,
-            "count": len(all_news),
-            "elapsed_time": f"{elapsed_time:.2f}秒",
-            "keyword": keyword,
-            "source": source,
-            "limit": limit,
-            "hours": hours
-        })
+            "news_count": len(news_list),
+            "overall_sentiment": sentiment_results["overall_sentiment"],
+            **prediction
+        }
+        if days is not None:
+            results[keyword]["history_summary"] = data_manager.get_sentiment_summary(
+                keyword, start=datetime.now() - timedelta(days=days))
+    return _batch_response(results, errors, start_time)
+
+@app.route('/api/v2/history')
+def get_history():
+    """
+    從情感匯總查詢長期走勢，不讀取新聞也不重新分析
+    
+    參數:
+        tickers: 以逗號分隔的股票代號或關鍵字
+        granularity: 可選，day（默認）或 hour
+        days: 可選，查詢最近多少天，默認30
+        source: 可選，只查詢指定來源
+    """
+    start_time = time.time()
+    tickers = [ticker.strip() for ticker in request.args.get('tickers', request.args.get('keyword', '')).split(',')]
+    tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+    granularity = request.args.get('granularity', 'day')
+    source = request.args.get('source') or None
+    try:
+        if not tickers:
+            raise ValueError("缺少tickers參數")
+        if len(tickers) > MAX_BATCH_KEYWORDS:
+            raise ValueError(f"一次最多查詢{MAX_BATCH_KEYWORDS}個股票")
+        if granularity not in ('day', 'hour'):
+            raise ValueError("granularity必須是day或hour")
+        days = _parse_days(request.args)
+    except ValueError as e:
+        return _error(str(e), 400)
+    
+    start = datetime.now() - timedelta(days=days)
+    results = {}
+    for ticker in tickers:
+        results[ticker] = {
+            "status": "success",
+            "summary": data_manager.get_sentiment_summary(ticker, start=start, granularity=granularity, source=source),
+            "history": data_manager.get_sentiment_history(ticker, start=start, granularity=granularity, source=source)
+        }
+    return _batch_response(results, {}, start_time)
+
+@app.route('/api/v2/index')
+def get_ticker_index():
+    """
+    查詢增量情感指數，不讀取新聞也不重新分析
+    
+    參數:
+        tickers: 可選，以逗號分隔的股票代號或關鍵字，默認返回全部
+    """
+    tickers = [ticker.strip() for ticker in request.args.get('tickers', '').split(',') if ticker.strip()]
+    if len(tickers) > MAX_BATCH_KEYWORDS:
+        return _error(f"一次最多查詢{MAX_BATCH_KEYWORDS}個股票", 400)
+    
+    if tickers:
+        linker = get_entity_linker()
+        results = {ticker: ticker_index.trend(linker.ticker_key(ticker)) for ticker in tickers}
+    else:
+        results = ticker_index.trends()
+    return jsonify({
+        "status": "success",
+        "count": len(results),
+        "results": results
+    })
+
+@app.route('/api/v2/subscribe')
+def subscribe():
+    """
+    訂閱股票的新文章推送（Server-Sent Events）
+    
+    參數:
+        tickers: 以逗號分隔的股票代號或關鍵字
         
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"獲取新聞時發生錯誤: {str(e)}",
-            "data": [],
-            "count": 0
-        }), 500
+    事件:
+        subscribed: 訂閱成功，列出股票和輪詢週期
+        ready: 某個股票已建立基準，之後只推送新文章
+        news: {"ticker", "count", "articles"}，每篇文章附帶sentiment和label
+        overflow: 客戶端讀取太慢，伺服器斷開連接
+    """
+    tickers = [ticker.strip() for ticker in request.args.get('tickers', request.args.get('keyword', '')).split(',')]
+    tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+    if not tickers:
+        return _error("缺少tickers參數", 400)
+    if len(tickers) > MAX_BATCH_KEYWORDS:
+        return _error(f"一次最多訂閱{MAX_BATCH_KEYWORDS}個股票", 400)
+    
+    try:
+        subscriber = subscription_hub.subscribe(tickers)
+    except SubscriberLimitError as e:
+        response, status_code = _error(str(e), 503)
+        response.headers["Retry-After"] = "60"
+        return response, status_code
+    
+    def encode(event, body):
+        return f"event: {event}\ndata: {app.json.dumps(body)}\n\n"
+    
+    def generate():
+        yield encode("subscribed", {"tickers": tickers, "interval": subscription_hub.interval})
+        while not subscriber.closed:
+            item = subscriber.next_event(timeout=SUBSCRIPTION_HEARTBEAT)
+            if item is None:
+                # 定期發送註釋行，保持連接並及時發現已斷開的客戶端
+                yield ": keepalive\n\n"
+            else:
+                yield encode(*item)
+        if subscriber.overflowed:
+            yield encode("overflow", {"message": "讀取太慢，連接已關閉，請重新訂閱"})
+    
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    response.call_on_close(lambda: subscription_hub.unsubscribe(subscriber))
+    return response
+
+@app.route('/api/v2/jobs', methods=['POST'])
+def create_job():
+    """
+    提交後台爬取任務，立即返回202和任務ID
+    
+    參數（JSON請求體或查詢字符串）:
+        keyword、source、limit、hours，與 /api/v2/news 相同
+    """
+    values = request.get_json(silent=True) or request.args
+    try:
+        params = _parse_news_params(values)
+    except ValueError as e:
+        return _error(str(e), 400)
+    
+    try:
+        job, created = job_manager.submit(params)
+    except JobQueueFullError as e:
+        response = jsonify({"status": "error", "message": str(e)})
+        response.headers["Retry-After"] = "30"
+        return response, 503
+    
+    response = jsonify({
+        "status": "accepted",
+        "message": "任務已提交" if created else "相同的任務正在進行，返回已有任務",
+        "deduplicated": not created,
+        "job": job.to_dict(),
+        "status_url": f"/api/v2/jobs/{job.id}",
+        "result_url": f"/api/v2/jobs/{job.id}/result"
+    })
+    response.headers["Location"] = f"/api/v2/jobs/{job.id}"
+    return response, 202
+
+@app.route('/api/v2/jobs/<job_id>')
+def get_job(job_id):
+    """查詢後台任務狀態"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return _error("任務不存在或結果已過期", 404)
+    
+    return jsonify({
+        "status": "success",
+        "job": job.to_dict()
+    })
+
+@app.route('/api/v2/jobs/<job_id>/result')
+def get_job_result(job_id):
+    """
+    獲取後台任務結果
+    
+    任務未完成時返回202，失敗時返回500，成功時返回與 /api/v2/news 相同格式的內容
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return _error("任務不存在或結果已過期", 404)
+    
+    if not job.done:
+        response = jsonify({
+            "status": job.status,
+            "message": "任務尚未完成",
+            "job": job.to_dict()
+        })
+        response.headers["Retry-After"] = "5"
+        return response, 202
+    
+    if job.status == "failed":
+        return _error(f"獲取新聞時發生錯誤: {job.error}", 500, data=[], count=0, job=job.to_dict())
+    
+    body = _news_response(job.result, job.params, parse_fields(request.args.get('fields')))
+    body["job"] = job.to_dict()
+    return jsonify(body)
 
 @app.route('/api/v2/news_detail')
 def get_news_detail():
@@ -0,0 +1,87 @@
+import atexit
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from crawlers.browser import timed_sleep
+
+_api_server = None
+_workdir = None
+
+
+class FakeCrawler:
+    """不啟動瀏覽器的爬蟲，等待delay秒後返回limit條新聞"""
+
+    def __init__(self, name, delay=0.0, title="公司看好前景", summary="突破成功"):
+        self.name = name
+        self.delay = delay
+        self.title = title
+        self.summary = summary
+        self.calls = 0
+
+    def crawl(self, keyword, limit=10, hours=24):
+        self.calls += 1
+        time.sleep(self.delay)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return [{
+            "title": f"{keyword} {self.name} 新聞{i} {self.title}",
+            "link": f"http://{self.name}/{keyword}/{i}",
+            "published_time": now,
+            "date": now,
+            "summary": self.summary,
+            "source": self.name,
+            "platform": self.name
+        } for i in range(limit)]
+
+
+class SlowCrawler:
+    """每條新聞之間固定等待，被時限取消時與真實爬蟲一樣改用示例數據"""
+
+    def __init__(self, name, interval=0.4):
+        self.name = name
+        self.interval = interval
+        self.finished = 0
+
+    def crawl(self, keyword, limit=10, hours=24):
+        news_list = []
+        for i in range(limit):
+            try:
+                timed_sleep(self.interval, self.name)
+            except Exception:
+                return news_list + [{"title": f"{keyword}示例新聞", "link": "", "is_sample": True,
+                                     "published_time": "", "source": self.name}]
+            news_list.append({"title": f"{keyword} {self.name} 新聞{i}", "link": f"http://{self.name}/{i}",
+                              "published_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                              "source": self.name})
+        self.finished += 1
+        return news_list
+
+
+def load_api_server():
+    """
+    在臨時目錄中導入API伺服器，新聞、緩存和匯總數據庫都不寫入專案的data目錄
+
+    api_server在導入時以當前目錄建立數據管理器，因此整個測試進程只導入一次並保持在臨時目錄中
+    """
+    global _api_server, _workdir
+    if _api_server is None:
+        # 切換目錄後仍能導入專案模塊
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        if project_dir not in sys.path:
+            sys.path.insert(0, project_dir)
+        _workdir = tempfile.TemporaryDirectory()
+        os.chdir(_workdir.name)
+        atexit.register(_workdir.cleanup)
+
+        import api_server
+        _api_server = api_server
+    return _api_server
+
+
+def use_crawlers(api_server, **crawlers):
+    """替換新聞服務的爬蟲並清空響應緩存"""
+    api_server.news_service.crawlers = crawlers
+    api_server.news_cache.invalidate()
+    return crawlers
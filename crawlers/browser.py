@@ -0,0 +1,186 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from analysis.metrics import metrics
+
+
+class DeadlineExceeded(Exception):
+    """爬取超過時限"""
+
+
+class Deadline:
+    """
+    一次爬取的時限
+
+    在爬取線程中以deadline_scope啟用後，頁面載入和固定等待都不會超過剩餘時間；
+    cancel()會關閉該時限下所有仍在運行的瀏覽器，使卡住的頁面載入立即中止。
+    """
+
+    def __init__(self, seconds):
+        """
+        初始化時限
+
+        參數:
+            seconds: 從現在起可用的秒數
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.cancelled = False
+        self._drivers = set()
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        """剩餘秒數，已取消或過期時為0"""
+        if self.cancelled:
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        """已超過時限時拋出DeadlineExceeded"""
+        if self.expired:
+            raise DeadlineExceeded(f"超過{self.seconds:.3g}秒時限")
+
+    def register(self, driver):
+        """登記在此時限下運行的瀏覽器；已取消時直接關閉"""
+        with self._lock:
+            if not self.cancelled:
+                self._drivers.add(driver)
+                return
+        driver.quit()
+
+    def unregister(self, driver):
+        with self._lock:
+            self._drivers.discard(driver)
+
+    def cancel(self):
+        """取消尚未完成的工作，關閉所有登記的瀏覽器"""
+        with self._lock:
+            self.cancelled = True
+            drivers = list(self._drivers)
+            self._drivers.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+_local = threading.local()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """在當前線程中啟用時限，爬蟲的頁面載入和等待會讀取它"""
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = deadline
+    try:
+        yield deadline
+    finally:
+        _local.deadline = previous
+
+
+def current_deadline():
+    """當前線程的時限，沒有時為None"""
+    return getattr(_local, "deadline", None)
+
+
+def timed_sleep(seconds, source):
+    """
+    爬蟲中等待頁面渲染的固定延遲，耗時記為sleep階段
+
+    有時限時最多等待剩餘時間，時限已到則拋出DeadlineExceeded。
+    """
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check()
+        seconds = min(seconds, deadline.remaining())
+    with metrics.timer("crawler_stage_seconds", source=source, stage="sleep"):
+        time.sleep(seconds)
+
+
+class InstrumentedDriver:
+    """
+    WebDriver的包裝，記錄頁面載入和腳本提取的耗時、載入頁數以及運行中的瀏覽器數
+
+    有時限時每次頁面載入的超時不超過剩餘時間。其他屬性和方法直接轉發給原本的driver。
+    """
+
+    def __init__(self, driver, source):
+        self._driver = driver
+        self._source = source
+        self._closed = False
+        self._page_load_timeout = None
+        self._deadline = current_deadline()
+        metrics.inc("browser_sessions_total", source=source)
+        metrics.inc("browsers_active", source=source)
+        if self._deadline is not None:
+            self._deadline.register(self)
+
+    def set_page_load_timeout(self, seconds):
+        self._page_load_timeout = seconds
+        return self._driver.set_page_load_timeout(seconds)
+
+    def get(self, url):
+        deadline = self._deadline
+        if deadline is not None:
+            deadline.check()
+            timeout = deadline.remaining()
+            if self._page_load_timeout is not None:
+                timeout = min(timeout, self._page_load_timeout)
+            self._driver.set_page_load_timeout(max(1, timeout))
+
+        metrics.inc("crawler_pages_fetched_total", source=self._source)
+        try:
+            with metrics.timer("crawler_stage_seconds", source=self._source, stage="page_load"):
+                return self._driver.get(url)
+        except Exception:
+            # 因時限中止的載入統一報告為DeadlineExceeded
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded(f"載入 {url} 時超過時限")
+            raise
+
+    def execute_script(self, script, *args):
+        with metrics.timer("crawler_stage_seconds", source=self._source, stage="extract"):
+            return self._driver.execute_script(script, *args)
+
+    def quit(self):
+        if self._closed:
+            # 時限取消時瀏覽器已被另一個線程關閉，爬蟲的finally再次調用時直接返回
+            return None
+        self._closed = True
+        metrics.inc("browsers_active", -1, source=self._source)
+        if self._deadline is not None:
+            self._deadline.unregister(self)
+        try:
+            return self._driver.quit()
+        except Exception:
+            # 被取消的頁面載入可能讓瀏覽器處於異常狀態，取消時忽略關閉錯誤
+            if self._deadline is None or not self._deadline.cancelled:
+                raise
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+def start_browser(source, create):
+    """
+    啟動瀏覽器並記錄啟動耗時
+
+    參數:
+        source: 來源名稱
+        create: 建立WebDriver的無參數函數
+
+    返回:
+        InstrumentedDriver: 包裝後的driver
+    """
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.check()
+    with metrics.timer("crawler_stage_seconds", source=source, stage="browser_start"):
+        driver = create()
+    return InstrumentedDriver(driver, source)
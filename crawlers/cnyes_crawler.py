@@ -12,6 +12,9 @@ import re
 import json
 import os
 import requests
+from analysis.text_normalizer import clean_display_text
+from analysis.metrics import metrics
+from .browser import start_browser, timed_sleep
 
 class CnyesCrawler:
     """鉅亨網新聞爬蟲"""
@@ -35,7 +38,7 @@ class CnyesCrawler:
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36")
         
         service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver = start_browser("cnyes", lambda: webdriver.Chrome(service=service, options=chrome_options))
         return driver
     
     def _extract_date(self, date_str):
@@ -108,7 +111,7 @@ class CnyesCrawler:
             driver.get(search_url)
             
             # 等待頁面加載
-            time.sleep(5)
+            timed_sleep(5, "cnyes")
             
             # 截圖頁面以便調試
             os.makedirs("debug", exist_ok=True)
@@ -122,7 +125,8 @@ class CnyesCrawler:
                 f.write(page_source)
             
             # 使用 BeautifulSoup 解析頁面
-            soup = BeautifulSoup(page_source, "html.parser")
+            with metrics.timer("crawler_stage_seconds", source="cnyes", stage="parse"):
+                soup = BeautifulSoup(page_source, "html.parser")
             
             # 使用 JavaScript 嘗試尋找搜索結果
             print("嘗試使用 JavaScript 搜索新聞...")
@@ -227,7 +231,7 @@ class CnyesCrawler:
                         print(f"訪問詳情頁獲取摘要: {link}")
                         # 訪問新聞詳情頁
                         driver.get(link)
-                        time.sleep(2)
+                        timed_sleep(2, "cnyes")
                         
                         # 使用 JavaScript 獲取摘要
                         summary = driver.execute_script("""
@@ -274,7 +278,7 @@ class CnyesCrawler:
                         
                         # 獲取標題
                         title_element = link.find("h3") or link
-                        title = title_element.get_text().strip()
+                        title = clean_display_text(title_element.get_text())
                         
                         # 跳過沒有標題的鏈接
                         if not title:
@@ -288,7 +292,7 @@ class CnyesCrawler:
                         
                         # 獲取摘要
                         summary_element = link.find("p")
-                        summary = summary_element.get_text().strip() if summary_element else ""
+                        summary = clean_display_text(summary_element.get_text()) if summary_element else ""
                         
                         # 提取日期
                         news_date = self._extract_date(time_text) if time_text else datetime.now()
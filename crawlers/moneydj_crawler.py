@@ -11,6 +11,9 @@ import time
 import re
 import os
 import json
+from analysis.text_normalizer import clean_display_text
+from analysis.metrics import metrics
+from .browser import start_browser, timed_sleep
 
 class MoneyDJCrawler:
     """MoneyDJ新聞爬蟲，用於獲取台股相關新聞"""
@@ -48,7 +51,7 @@ class MoneyDJCrawler:
             chrome_options.add_argument("--disable-3d-apis")
             
             service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver = start_browser("moneydj", lambda: webdriver.Chrome(service=service, options=chrome_options))
             
             # 設置頁面加載超時時間
             driver.set_page_load_timeout(30)
@@ -171,13 +174,16 @@ class MoneyDJCrawler:
             print(f"開始爬取MoneyDJ關於'{keyword}'的新聞...")
             driver = self._setup_driver()
             
-            # 首先嘗試直接訪問股票頁面（如果關鍵字是股票代碼）
-            if keyword.isdigit() and len(keyword) <= 5:
+            # 首先嘗試直接訪問股票頁面（關鍵字是股票代碼，或可由代號表解析為股票的公司名稱）
+            from analysis.registry import get_entity_linker
+            entity = get_entity_linker().resolve(keyword)
+            stock_code = entity["code"] if entity else keyword
+            if stock_code.isdigit() and len(stock_code) <= 5:
                 try:
-                    stock_page_url = f"{self.stock_url}{keyword}"
+                    stock_page_url = f"{self.stock_url}{stock_code}"
                     print(f"嘗試直接訪問股票頁面: {stock_page_url}")
                     driver.get(stock_page_url)
-                    time.sleep(5)
+                    timed_sleep(5, "moneydj")
                     
                     # 保存截圖和HTML源碼以便調試
                     os.makedirs("debug", exist_ok=True)
@@ -189,13 +195,14 @@ class MoneyDJCrawler:
                         f.write(stock_page_source)
                     
                     # 解析股票頁面，嘗試尋找相關新聞鏈接
-                    soup = BeautifulSoup(stock_page_source, "html.parser")
+                    with metrics.timer("crawler_stage_seconds", source="moneydj", stage="parse"):
+                        soup = BeautifulSoup(stock_page_source, "html.parser")
                     stock_news_links = soup.select('a[href*="NewsContent"], a[href*="Content"], .NewsList a, .news_list a')
                     
                     if stock_news_links:
                         print(f"在股票頁面找到 {len(stock_news_links)} 個新聞鏈接")
                         for link in stock_news_links:
-                            title = link.get_text().strip()
+                            title = clean_display_text(link.get_text())
                             href = link.get('href', '')
                             
                             # 跳過空標題或特定導航鏈接
@@ -237,7 +244,7 @@ class MoneyDJCrawler:
                 try:
                     print("訪問MoneyDJ首頁")
                     driver.get(self.home_url)
-                    time.sleep(8)
+                    timed_sleep(8, "moneydj")
                     
                     # 保存截圖和HTML源碼以便調試
                     driver.save_screenshot(f"debug/moneydj_home_page.png")
@@ -248,7 +255,8 @@ class MoneyDJCrawler:
                         f.write(page_source)
                     
                     # 解析首頁
-                    soup = BeautifulSoup(page_source, "html.parser")
+                    with metrics.timer("crawler_stage_seconds", source="moneydj", stage="parse"):
+                        soup = BeautifulSoup(page_source, "html.parser")
                     
                     # 找到所有可能的新聞鏈接
                     all_links = soup.find_all('a', href=True)
@@ -256,7 +264,7 @@ class MoneyDJCrawler:
                     
                     for link in all_links:
                         href = link.get('href', '')
-                        title = link.get_text().strip()
+                        title = clean_display_text(link.get_text())
                         
                         # 跳過空標題或特定導航鏈接
                         if not title or len(title) < 5 or title in ['登入', '技術學院', '下一頁', '上一頁']:
@@ -304,7 +312,7 @@ class MoneyDJCrawler:
                 try:
                     print("訪問MoneyDJ新聞頁面")
                     driver.get(self.news_url)
-                    time.sleep(5)
+                    timed_sleep(5, "moneydj")
                     
                     # 保存截圖和HTML源碼以便調試
                     driver.save_screenshot(f"debug/moneydj_news_page.png")
@@ -315,7 +323,8 @@ class MoneyDJCrawler:
                         f.write(news_page_source)
                     
                     # 解析新聞頁面
-                    soup = BeautifulSoup(news_page_source, "html.parser")
+                    with metrics.timer("crawler_stage_seconds", source="moneydj", stage="parse"):
+                        soup = BeautifulSoup(news_page_source, "html.parser")
                     
                     # 找到所有新聞列表
                     news_containers = soup.select('.NewsList, .news_list, .main_news, .news_container, [class*="news"]')
@@ -324,7 +333,7 @@ class MoneyDJCrawler:
                     for container in news_containers:
                         links = container.find_all('a', href=True)
                         for link in links:
-                            title = link.get_text().strip()
+                            title = clean_display_text(link.get_text())
                             href = link.get('href', '')
                             
                             # 跳過空標題或特定導航鏈接
@@ -444,10 +453,11 @@ class MoneyDJCrawler:
             driver.get(url)
             
             # 等待頁面加載
-            time.sleep(5)
+            timed_sleep(5, "moneydj")
             
             # 使用BeautifulSoup解析頁面
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+            with metrics.timer("crawler_stage_seconds", source="moneydj", stage="parse"):
+                soup = BeautifulSoup(driver.page_source, "html.parser")
             
             # 嘗試查找內容區域
             content_elems = soup.select('.NewsContent, .news-content, #newsContent, .article-content, .content')
@@ -13,6 +13,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import re
+from analysis.text_normalizer import clean_display_text
+from analysis.metrics import metrics
+from .browser import start_browser, timed_sleep
 
 class YahooFinanceCrawler:
     def __init__(self, headless=True):
@@ -35,7 +38,7 @@ class YahooFinanceCrawler:
         options.add_argument('--charset=UTF-8')
         
         service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = start_browser("yahoo", lambda: webdriver.Chrome(service=service, options=options))
         return driver
     
     def _extract_date(self, date_str):
@@ -105,17 +108,18 @@ class YahooFinanceCrawler:
             driver.get(search_url)
             
             # 等待頁面加載
-            time.sleep(3)
+            timed_sleep(3, "yahoo")
             
             # 滾動頁面以加載更多內容
             for _ in range(3):
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                timed_sleep(2, "yahoo")
             
             # 獲取頁面源碼
             page_source = driver.page_source
             # 使用正確的編碼解析HTML
-            soup = BeautifulSoup(page_source, 'html.parser', from_encoding='utf-8')
+            with metrics.timer("crawler_stage_seconds", source="yahoo", stage="parse"):
+                soup = BeautifulSoup(page_source, 'html.parser', from_encoding='utf-8')
             
             # 尋找新聞項目
             print("開始分析頁面尋找新聞...")
@@ -127,7 +131,7 @@ class YahooFinanceCrawler:
             # 處理新聞連結
             for link in news_links:
                 try:
-                    title = link.text.strip()
+                    title = clean_display_text(link.text)
                     href = link.get_attribute('href')
                     
                     # 忽略空標題或過短的標題
@@ -239,7 +243,7 @@ class YahooFinanceCrawler:
                 # 方法1: 查找帶有新聞URL的連結
                 news_links = soup.find_all('a', href=lambda href: href and '/news/' in href)
                 for link in news_links:
-                    title = link.get_text().strip()
+                    title = clean_display_text(link.get_text())
                     href = link.get('href')
                     
                     # 確保連結是完整的URL
@@ -540,12 +544,17 @@ class YahooFinanceCrawler:
         Returns:
             list: 新聞文章列表
         """
+        # 以股票代號表解析關鍵字（代號、簡稱或別名），得到正確的市場後綴（上市.TW、上櫃.TWO）
+        from analysis.registry import get_entity_linker
+        entity = get_entity_linker().resolve(keyword)
+        if entity:
+            keyword = entity["symbol"]
+        elif re.fullmatch(r'\d{4,6}', keyword):
+            # 代號表中沒有的代號，默認為上市股票 xxxx.TW
+            keyword = f"{keyword}.TW"
+        
         # 檢查是否是股票代碼格式
-        if keyword.isdigit() or '.' in keyword:
-            # 如果是股票代碼，添加股票代碼後綴（如果沒有）
-            if not '.' in keyword:
-                # 台灣股票格式為 xxxx.TW
-                keyword = f"{keyword}.TW"
+        if '.' in keyword:
             # 使用get_stock_news方法
             return self.get_stock_news(
                 stock_code=keyword, 
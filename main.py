@@ -8,8 +8,9 @@ from datetime import datetime
 from crawlers.yahoo_crawler import YahooFinanceCrawler
 from crawlers.moneydj_crawler import MoneyDJCrawler
 from crawlers.cnyes_crawler import CnyesCrawler
-from analysis.sentiment_analyzer import SentimentAnalyzer
+from analysis.registry import get_analyzer, get_entity_linker
 from analysis.trend_predictor import TrendPredictor
+from analysis.ticker_index import TickerSentimentIndex
 from utils.data_manager import DataManager
 
 def main():
@@ -60,8 +61,16 @@ def main():
         print(f"爬取過程中發生錯誤: {str(e)}")
         return
     
+    # 標記每條新聞提到的所有股票
+    entity_linker = get_entity_linker()
+    entity_linker.tag(all_news)
+    
+    # 關鍵字能解析為股票時，以股票代號作為匯總和指數的鍵
+    ticker_key = entity_linker.ticker_key(keyword)
+    
     # 保存新聞數據
     data_manager.save_news(all_news, keyword)
+    data_manager.store_news(keyword, {"yahoo": yahoo_news, "cnyes": cnyes_news, "moneydj": moneydj_news})
     
     # 如果沒有獲取到新聞，則退出
     if not all_news:
@@ -72,7 +81,7 @@ def main():
     
     # 進行情感分析
     print("\n開始進行情感分析...")
-    sentiment_analyzer = SentimentAnalyzer()
+    sentiment_analyzer = get_analyzer()
     sentiment_results = sentiment_analyzer.analyze(all_news)
     
     # 進行趨勢預測
@@ -80,6 +89,21 @@ def main():
     trend_predictor = TrendPredictor()
     trend_prediction = trend_predictor.predict(all_news, sentiment_results)
     
+    # 更新每日/每小時情感匯總
+    data_manager.save_sentiment(ticker_key, all_news, sentiment_results)
+    
+    # 更新增量情感指數，之後可直接查詢而不需重新讀取新聞
+    ticker_index = TickerSentimentIndex()
+    ticker_index.update(ticker_key, sentiment_results, all_news)
+    
+    # 新聞提到的其他股票也一併更新，一次爬取可供多個股票使用
+    for ticker, (ticker_news, ticker_results) in entity_linker.split_by_ticker(all_news, sentiment_results).items():
+        if ticker == ticker_key:
+            continue
+        data_manager.save_sentiment(ticker, ticker_news, ticker_results)
+        ticker_index.update(ticker, ticker_results, ticker_news)
+    ticker_index.save()
+    
     # 輸出結果
     print("\n===== 分析結果 =====")
     print(f"情感分析結果: {sentiment_results['overall_sentiment']}")
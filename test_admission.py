@@ -0,0 +1,136 @@
+import threading
+import time
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.admission import BACKGROUND, AdmissionController, AdmissionRejected
+
+
+def _start_waiter(controller, order, label, priority):
+    """在線程中排隊，取得名額時記錄順序並立即釋放"""
+    def run():
+        acquired_at = controller.acquire(priority=priority)
+        order.append(label)
+        controller.release(acquired_at)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _wait_queued(controller, count):
+    deadline = time.time() + 2
+    while controller.stats()["queued"] < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def _expect_rejection(controller, status_code, max_wait=None):
+    try:
+        controller.acquire(max_wait=max_wait)
+    except AdmissionRejected as e:
+        assert e.status_code == status_code
+    else:
+        raise AssertionError("應該被拒絕")
+
+
+def test_reject_and_timeout():
+    """測試隊列已滿返回429、排隊超時返回503，以及拒絕後名額和隊列狀態正確"""
+    print("===== 測試拒絕和排隊超時 =====")
+
+    controller = AdmissionController(max_active=1, max_queue=1, max_wait=0.2)
+    acquired_at = controller.acquire()
+
+    waiter = threading.Thread(target=lambda: _expect_rejection(controller, 503))
+    waiter.start()
+    _wait_queued(controller, 1)
+    try:
+        controller.acquire()
+    except AdmissionRejected as e:
+        assert e.status_code == 429
+        assert e.retry_after >= 1
+    else:
+        raise AssertionError("隊列已滿時應該拒絕")
+    waiter.join()
+
+    start = time.time()
+    _expect_rejection(controller, 503, max_wait=0.1)
+    assert time.time() - start < 0.5
+
+    controller.release(acquired_at)
+    assert controller.stats() == {"active": 0, "max_active": 1, "queued": 0, "queued_interactive": 0,
+                                  "max_queue": 1}
+    with controller.slot():
+        assert controller.stats()["active"] == 1
+    assert controller.stats()["active"] == 0
+
+
+def test_priority_order():
+    """測試名額空出時前台請求先於後台任務，同優先級按排隊順序"""
+    print("===== 測試優先級 =====")
+
+    controller = AdmissionController(max_active=1, max_queue=8, max_wait=5)
+    acquired_at = controller.acquire()
+    order = []
+    threads = []
+    for label, priority in (("後台1", BACKGROUND), ("前台1", 0), ("後台2", BACKGROUND), ("前台2", 0)):
+        threads.append(_start_waiter(controller, order, label, priority))
+        _wait_queued(controller, len(threads))
+
+    # 後台任務不佔用前台隊列長度
+    assert controller.stats()["queued_interactive"] == 2
+    controller.release(acquired_at)
+    for thread in threads:
+        thread.join()
+    print(f"取得名額順序: {order}")
+    assert order == ["前台1", "前台2", "後台1", "後台2"]
+
+
+def test_admission_api():
+    """測試爬取名額用完時返回429或503並附帶Retry-After，緩存命中不受影響"""
+    print("===== 測試API准入控制 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"))
+    original = api_server.admission
+    try:
+        # 隊列長度為0：名額被佔用時立即拒絕
+        api_server.admission = AdmissionController(max_active=1, max_queue=0, max_wait=0.2)
+        assert client.get("/api/v2/news?keyword=AD0&limit=1").status_code == 200
+        acquired_at = api_server.admission.acquire()
+        response = client.get("/api/v2/news?keyword=AD1&limit=1")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        # 已緩存的查詢不需要爬取名額
+        response = client.get("/api/v2/news?keyword=AD0&limit=1")
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "HIT"
+        api_server.admission.release(acquired_at)
+
+        # 排隊超過等待時間
+        api_server.admission = AdmissionController(max_active=1, max_queue=1, max_wait=0.2)
+        acquired_at = api_server.admission.acquire()
+        response = client.get("/api/v2/news?keyword=AD2&limit=1")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        assert client.get("/api/v2/news?keyword=AD2&limit=1&stream=ndjson").status_code == 503
+        api_server.admission.release(acquired_at)
+
+        # 排隊時間計入請求時限：時限短於max_wait時按時限放棄
+        api_server.admission = AdmissionController(max_active=1, max_queue=1, max_wait=10)
+        acquired_at = api_server.admission.acquire()
+        start = time.time()
+        response = client.get("/api/v2/news?keyword=AD3&limit=1&deadline=0.3")
+        assert response.status_code == 503
+        assert time.time() - start < 2
+        api_server.admission.release(acquired_at)
+        assert api_server.admission.stats()["active"] == 0
+    finally:
+        api_server.admission = original
+
+
+if __name__ == "__main__":
+    test_reject_and_timeout()
+    test_priority_order()
+    test_admission_api()
+    print("\n===== 准入控制測試完成 =====")
@@ -0,0 +1,104 @@
+import gzip
+import json
+from datetime import datetime
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils import api_encoding
+from utils.api_encoding import FastJSONProvider, choose_encoding, compress_response, parse_fields, project_fields
+
+
+def test_json_provider_matches_default():
+    """測試快速JSON編碼的內容與Flask默認編碼器一致"""
+    print("===== 測試JSON編碼一致 =====")
+
+    app = Flask(__name__)
+    fast = FastJSONProvider(app)
+    default = DefaultJSONProvider(app)
+    body = {"title": "台積電營收創新高", "date": datetime(2025, 1, 2, 3, 4, 5), "score": 0.42,
+            "items": [1, None, True]}
+
+    assert json.loads(fast.dumps(body)) == json.loads(default.dumps(body))
+    # 中文不轉義
+    assert "台積電" in fast.dumps(body)
+    assert fast.loads(fast.dumps({"a": [1, 2]})) == {"a": [1, 2]}
+
+    with app.app_context():
+        response = fast.response(body)
+        assert response.mimetype == "application/json"
+        assert json.loads(response.get_data(as_text=True)) == json.loads(default.dumps(body))
+
+
+def test_fields_and_encoding_choice():
+    """測試字段投影和Accept-Encoding的選擇"""
+    print("===== 測試字段投影和壓縮方式選擇 =====")
+
+    news = [{"title": "A", "link": "l", "summary": "s"}]
+    assert parse_fields(" title, link ,,") == ["title", "link"]
+    assert parse_fields("") is None
+    assert project_fields(news, ["title", "missing"]) == [{"title": "A"}]
+    assert project_fields(news, None) is news
+
+    preferred = "br" if api_encoding.brotli is not None else "gzip"
+    assert choose_encoding("gzip, deflate, br") == preferred
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert choose_encoding("*") == preferred
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+
+def test_compress_response():
+    """測試只壓縮足夠大的可壓縮響應"""
+    print("===== 測試響應壓縮 =====")
+
+    app = Flask(__name__)
+    body = json.dumps({"data": ["台積電營收創新高"] * 200}, ensure_ascii=False)
+
+    response = compress_response(app.response_class(body, mimetype="application/json"), "gzip", min_size=100)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()).decode("utf-8") == body
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+    small = compress_response(app.response_class("{}", mimetype="application/json"), "gzip", min_size=100)
+    assert "Content-Encoding" not in small.headers
+    image = compress_response(app.response_class(body, mimetype="image/png"), "gzip", min_size=100)
+    assert "Content-Encoding" not in image.headers
+
+
+def test_api_etag_gzip_fields():
+    """測試API響應的ETag條件請求、gzip壓縮和fields參數"""
+    print("===== 測試API響應編碼 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"))
+
+    url = "/api/v2/news?keyword=EN1&limit=10"
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    # 命中緩存時內容相同，If-None-Match相符時返回304
+    cached = client.get(url, headers={"If-None-Match": etag})
+    print(f"條件請求: {cached.status_code}")
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(compressed.get_data()))["data"] == first.get_json()["data"]
+
+    projected = client.get(url + "&fields=title,link").get_json()
+    assert projected["count"] == 10
+    assert all(set(news) == {"title", "link"} for news in projected["data"])
+
+
+if __name__ == "__main__":
+    test_json_provider_matches_default()
+    test_fields_and_encoding_choice()
+    test_compress_response()
+    test_api_etag_gzip_fields()
+    print("\n===== 響應編碼測試完成 =====")
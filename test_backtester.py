@@ -0,0 +1,85 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from analysis.backtester import Backtester, load_stored_sentiments
+from analysis.registry import configure_jieba
+from analysis.sentiment_analyzer import SentimentAnalyzer
+from utils.data_manager import DataManager
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def _news(prefix, days, title):
+    start = datetime(2024, 5, 1, 9, 0, 0)
+    return [{"title": f"{prefix}{i} {title}", "summary": "", "link": f"http://{prefix}/{i}",
+             "published_time": (start + timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S")}
+            for i in range(days)]
+
+
+def test_alias_files():
+    """測試以簡稱、別名或代號保存的新聞都歸入同一個股票"""
+    print("===== 測試回測讀取別名新聞 =====")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_manager = DataManager(data_dir)
+        data_manager.save_news(_news("a", 3, "公司看好前景"), "台積電")
+        data_manager.save_news(_news("b", 3, "市場悲觀"), "TSMC")
+        data_manager.save_news(_news("c", 2, "突破成功"), "2330")
+        data_manager.save_news(_news("d", 2, "出現危機"), "鴻海")
+        # 重複保存的文章只計算一次
+        data_manager.save_news(_news("a", 3, "公司看好前景"), "tsmc")
+        data_manager.wait_for_corpus_stats(timeout=30)
+
+        analyzer = SentimentAnalyzer()
+        for keyword in ("2330", "台積電", "2330.TW"):
+            sentiments = load_stored_sentiments(keyword, data_dir, analyzer)
+            print(f"{keyword}: {len(sentiments)}條新聞")
+            assert len(sentiments) == 8
+        assert len(load_stored_sentiments("鴻海", data_dir, analyzer)) == 2
+        assert load_stored_sentiments("不存在的關鍵字", data_dir, analyzer) == []
+
+
+def test_from_store_by_name():
+    """測試以簡稱回測時使用代號命名的股價文件和全部別名的新聞"""
+    print("===== 測試以簡稱回測 =====")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        DataManager(data_dir).save_news(_news("a", 20, "公司看好前景，突破成功"), "TSMC")
+
+        price_dir = os.path.join(data_dir, "prices")
+        os.makedirs(price_dir)
+        with open(os.path.join(price_dir, "2330.csv"), "w", encoding="utf-8") as f:
+            f.write("Date,Close\n")
+            for i in range(20):
+                day = datetime(2024, 5, 1) + timedelta(days=i)
+                f.write(f"{day:%Y-%m-%d},{600 + i}\n")
+
+        backtester = Backtester.from_store(["台積電"], data_dir=data_dir, analyzer=SentimentAnalyzer(),
+                                           lookback_hours=48)
+        assert "台積電" in backtester.data
+        result = backtester.run()
+        print(f"合併統計: {result['overall']}")
+        assert result["overall"]["evaluations"] > 0
+        assert result["overall"]["hit_rate"] == 1.0
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_alias_files()
+        test_from_store_by_name()
+        print("\n===== 回測測試完成 =====")
+    finally:
+        teardown_module()
@@ -0,0 +1,93 @@
+import time
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.admission import AdmissionController
+
+
+def test_batch_endpoints():
+    """測試批量情感分析和趨勢預測接口"""
+    print("===== 測試批量分析接口 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    crawlers = use_crawlers(api_server, yahoo=FakeCrawler("yahoo"), cnyes=FakeCrawler("cnyes"))
+
+    response = client.post("/api/v2/sentiment", json={
+        "keywords": ["BA", "2317", "BA"], "limit": 3, "mode": "live", "history": "day", "include_news": True
+    })
+    result = response.get_json()
+    assert response.status_code == 200
+    assert result["status"] == "success"
+    assert list(result["results"]) == ["BA", "2317"]
+    for keyword, item in result["results"].items():
+        assert item["status"] == "success"
+        assert item["news_count"] == 6
+        assert len(item["news_sentiments"]) == 6
+        assert item["overall_sentiment"] == "積極"
+        assert isinstance(item["history"], list)
+    # 重複的關鍵字只爬取一次
+    assert [crawler.calls for crawler in crawlers.values()] == [2, 2]
+
+    # 趨勢接口使用剛寫入的響應緩存，不再爬取
+    response = client.post("/api/v2/trend", json={"keywords": ["BA", "2317"], "limit": 3, "mode": "live"})
+    result = response.get_json()
+    assert response.status_code == 200
+    assert set(result["results"]) == {"BA", "2317"}
+    assert all(item["trend"] in ("看漲", "看跌", "震盪") for item in result["results"].values())
+    assert [crawler.calls for crawler in crawlers.values()] == [2, 2]
+
+    # 參數錯誤在爬取之前返回400
+    for body in ({"keywords": ["BV1"], "days": "x"}, {"keywords": ["BV1"], "history": "week"},
+                 {"keywords": []}, {"keywords": ["BV1"], "source": "x"}):
+        response = client.post("/api/v2/sentiment", json=body)
+        assert response.status_code == 400, body
+    assert client.post("/api/v2/trend", json={"keywords": ["BV1"], "limit": None}).status_code == 400
+    assert [crawler.calls for crawler in crawlers.values()] == [2, 2]
+
+
+def test_batch_deadline():
+    """測試批量接口所有關鍵字共用一個時限，時限到達時仍在排隊的關鍵字記為錯誤"""
+    print("===== 測試批量分析時限 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    crawlers = use_crawlers(api_server, yahoo=FakeCrawler("yahoo"), cnyes=FakeCrawler("cnyes", delay=3))
+    keywords = [f"BD{i}" for i in range(6)]
+    original = api_server.admission
+    try:
+        # 只有2個爬取名額，其餘關鍵字排隊直到時限
+        api_server.admission = AdmissionController(max_active=2, max_queue=8, max_wait=10)
+        start = time.time()
+        response = client.post("/api/v2/sentiment", json={
+            "keywords": keywords, "limit": 1, "mode": "live", "deadline": 1
+        })
+        elapsed = time.time() - start
+    finally:
+        api_server.admission = original
+    result = response.get_json()
+    print(f"耗時: {elapsed:.2f}秒，狀態: {result['status']}")
+
+    assert response.status_code == 200
+    # 時限加上收尾的寬限時間，而不是每個關鍵字各自一個時限
+    assert elapsed < 1 + api_server.BATCH_DEADLINE_GRACE + 0.5
+    assert result["status"] == "partial"
+
+    succeeded = [keyword for keyword in keywords if result["results"][keyword]["status"] == "success"]
+    assert len(succeeded) == 2
+    for keyword in keywords:
+        item = result["results"][keyword]
+        if keyword in succeeded:
+            # cnyes在時限內無法完成，只取得yahoo的新聞
+            assert item["news_count"] == 1
+        else:
+            assert item["message"]
+
+    # 排隊的關鍵字在時限到達後不會再開始爬取
+    time.sleep(1)
+    assert crawlers["yahoo"].calls == len(succeeded)
+
+
+if __name__ == "__main__":
+    test_batch_endpoints()
+    test_batch_deadline()
+    print("\n===== 批量分析接口測試完成 =====")
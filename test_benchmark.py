@@ -0,0 +1,105 @@
+import os
+import tempfile
+
+from analysis.benchmark import STAGES, compare, generate_corpus, run_benchmarks, run_stage, save_report
+from analysis.registry import configure_jieba
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def test_corpus_reproducible():
+    """測試相同參數產生相同的合成語料"""
+    print("===== 測試合成語料可重現 =====")
+
+    first = generate_corpus(50, "mixed", 7)
+    assert first == generate_corpus(50, "mixed", 7)
+    assert first != generate_corpus(50, "mixed", 8)
+    assert len(first) == 50
+    assert set(first[0]) == {"title", "summary", "link", "published_time", "source", "platform"}
+    # mixed語料中英各半
+    assert not first[0]["title"].isascii()
+    assert first[1]["title"].isascii()
+
+
+def test_run_stages():
+    """測試每個階段在小語料上產生完整的結果"""
+    print("===== 測試基準測試階段 =====")
+
+    for stage in STAGES:
+        result = run_stage(stage, engine="automaton", lang="zh", size=60, repeat=1, latency_samples=3)
+        print(f"{stage}: {result['articles_per_sec']:.0f}篇/秒")
+        assert result["stage"] == stage
+        assert result["size"] == 60
+        assert result["articles_per_sec"] > 0
+        assert result["p99_ms"] >= result["p50_ms"] > 0
+        assert result["cold_seconds"] > 0
+
+    try:
+        run_stage("unknown", size=10, repeat=1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("不支持的階段應該報錯")
+
+    try:
+        run_stage("analyze", engine="transformer", size=10, repeat=1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("transformer後端沒有模型目錄時應該報錯")
+
+
+def test_isolated_run_and_compare():
+    """測試子進程運行、保存結果以及與基準的比較"""
+    print("===== 測試子進程運行和基準比較 =====")
+
+    # 子進程在當前目錄建立jieba緩存，切換到臨時目錄運行
+    previous = os.getcwd()
+    os.chdir(_workdir.name)
+    try:
+        report = run_benchmarks(sizes=(20,), langs=("en",), engines=("automaton",), stages=("analyze",),
+                                repeat=1, latency_samples=2)
+    finally:
+        os.chdir(previous)
+
+    assert report["meta"]["isolated"] is True
+    assert len(report["results"]) == 1
+    result = report["results"][0]
+    assert (result["stage"], result["engine"], result["lang"], result["size"]) == ("analyze", "automaton", "en", 20)
+
+    path = os.path.join(_workdir.name, "benchmarks", "report.json")
+    save_report(report, path)
+    assert os.path.exists(path)
+
+    # 基準吞吐量高出一倍、p99相同：本次結果吞吐量下降50%
+    baseline = {"results": [dict(result, articles_per_sec=result["articles_per_sec"] * 2),
+                            dict(result, size=999)]}
+    comparisons = compare(report, baseline, tolerance=0.1)
+    assert len(comparisons) == 1
+    assert abs(comparisons[0]["throughput_change"] + 0.5) < 1e-9
+    assert comparisons[0]["p99_change"] == 0
+    assert comparisons[0]["regression"]
+
+    assert not compare(report, report)[0]["regression"]
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_corpus_reproducible()
+        test_run_stages()
+        test_isolated_run_and_compare()
+        print("\n===== 基準測試工具測試完成 =====")
+    finally:
+        teardown_module()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from analysis.registry import configure_jieba
+from utils.corpus_stats import CorpusStats
+from utils.data_manager import DataManager
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def _news(index, title, days_ago=0):
+    published = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+    return {"title": title, "summary": "", "link": f"https://news.example/{index}",
+            "published_time": published}
+
+
+def test_incremental_counts():
+    """測試增量入庫：重複文章和示例數據不重複計數，多個關鍵字共用的文章只算一篇"""
+    print("===== 測試語料統計增量更新 =====")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stats = CorpusStats(os.path.join(temp_dir, "corpus_stats.db"))
+        news_list = [_news(1, "晶圓代工產能滿載"), _news(2, "晶圓代工價格調漲"), _news(3, "記憶體報價回穩")]
+        sample = dict(_news(4, "示例新聞標題"), is_sample=True)
+
+        assert stats.add_articles(news_list + [sample], "2330") == 3
+        assert stats.add_articles(news_list, "2330") == 0
+        assert stats.total_docs() == 3
+
+        # 同一篇文章屬於另一個關鍵字時計入該關鍵字，但全局文檔總數不變
+        assert stats.add_articles(news_list[:1], "2303") == 1
+        assert stats.total_docs() == 3
+
+        # 出現在更多文章中的詞IDF較低，未出現的詞IDF最高
+        common, rare, unseen = stats.idf_values(["晶圓", "記憶體", "從未出現"])
+        print(f"IDF: 晶圓={common:.3f} 記憶體={rare:.3f} 從未出現={unseen:.3f}")
+        assert common < rare < unseen
+        stats.close()
+
+
+def test_top_keywords_window():
+    """測試關鍵詞只統計時間窗口內的文章"""
+    print("===== 測試語料統計關鍵詞窗口 =====")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stats = CorpusStats(os.path.join(temp_dir, "corpus_stats.db"))
+        stats.add_articles([_news(1, "晶圓代工產能滿載", days_ago=0),
+                            _news(2, "晶圓代工價格調漲", days_ago=1),
+                            _news(3, "記憶體報價回穩", days_ago=60)], "2330")
+
+        recent = [item["keyword"] for item in stats.top_keywords("2330")]
+        print(f"近30天關鍵詞: {recent}")
+        assert recent[:2] == ["晶圓", "代工"] or recent[:2] == ["代工", "晶圓"]
+        assert "記憶體" not in recent
+
+        old_day = datetime.now() - timedelta(days=60)
+        old = [item["keyword"] for item in stats.top_keywords("2330", start=old_day, end=old_day)]
+        assert "記憶體" in old
+        assert "晶圓" not in old
+        assert stats.top_keywords("2317") == []
+        stats.close()
+
+
+def test_keyed_by_ticker():
+    """測試DataManager按股票代號統計，以簡稱或代號查詢得到相同的關鍵詞"""
+    print("===== 測試語料統計按股票代號歸類 =====")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_manager = DataManager(os.path.join(temp_dir, "data"))
+        data_manager.save_news([_news(1, "台積電先進製程訂單滿載")], "台積電")
+        data_manager.save_news([_news(2, "台積電先進封裝擴產")], "2330")
+        data_manager.wait_for_corpus_stats(timeout=30)
+
+        by_name = data_manager.get_keywords("台積電")
+        by_code = data_manager.get_keywords("2330")
+        print(f"關鍵詞: {[item['keyword'] for item in by_code]}")
+        assert by_name == by_code
+        assert "擴產" in [item["keyword"] for item in by_code]
+        assert data_manager.corpus_stats.top_keywords("台積電") == []
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_incremental_counts()
+        test_top_keywords_window()
+        test_keyed_by_ticker()
+        print("\n===== 語料統計測試完成 =====")
+    finally:
+        teardown_module()
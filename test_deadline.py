@@ -0,0 +1,92 @@
+import threading
+import time
+
+from api_test_helpers import FakeCrawler, SlowCrawler, load_api_server, use_crawlers
+from crawlers.browser import Deadline, DeadlineExceeded, current_deadline, deadline_scope, timed_sleep
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+def test_deadline_budget():
+    """測試時限的剩餘時間、取消時關閉瀏覽器，以及線程內的時限範圍"""
+    print("===== 測試爬取時限 =====")
+
+    budget = Deadline(0.3)
+    assert 0 < budget.remaining() <= 0.3
+    assert current_deadline() is None
+    with deadline_scope(budget):
+        assert current_deadline() is budget
+        start = time.time()
+        # 等待不超過剩餘時間
+        timed_sleep(5, "test")
+        assert time.time() - start < 0.5
+        try:
+            timed_sleep(1, "test")
+        except DeadlineExceeded:
+            pass
+        else:
+            raise AssertionError("時限已到時應拋出DeadlineExceeded")
+    assert current_deadline() is None
+
+    # 時限只在啟用它的線程中生效
+    seen = []
+    with deadline_scope(Deadline(1)):
+        thread = threading.Thread(target=lambda: seen.append(current_deadline()))
+        thread.start()
+        thread.join()
+    assert seen == [None]
+
+    budget = Deadline(10)
+    driver = FakeDriver()
+    budget.register(driver)
+    budget.cancel()
+    assert driver.closed
+    assert budget.expired
+    # 取消後登記的瀏覽器立即關閉
+    late = FakeDriver()
+    budget.register(late)
+    assert late.closed
+
+
+def test_deadline_partial():
+    """測試時限到達時返回已完成來源的新聞，並丟棄被取消來源的示例數據"""
+    print("===== 測試部分結果 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"), cnyes=SlowCrawler("cnyes"))
+    cached = len(api_server.news_cache)
+
+    start = time.time()
+    response = client.get("/api/v2/news?keyword=DL&limit=5&deadline=1")
+    elapsed = time.time() - start
+    result = response.get_json()
+    print(f"耗時: {elapsed:.2f}秒，狀態: {result['source_status']}")
+
+    assert response.status_code == 200
+    assert elapsed < 3
+    assert result["partial"] is True
+    assert result["source_status"]["yahoo"]["status"] == "success"
+    assert result["source_status"]["cnyes"]["status"] == "timeout"
+    assert not any(news.get("is_sample") for news in result["data"])
+    assert sum(news["source"] == "yahoo" for news in result["data"]) == 5
+
+    # 部分結果不寫入響應緩存
+    assert len(api_server.news_cache) == cached
+
+    assert client.get("/api/v2/news?keyword=DL&deadline=abc").status_code == 400
+    assert client.get("/api/v2/news?keyword=DL&deadline=0").status_code == 400
+    assert api_server._parse_deadline({"deadline": "100000"}) == api_server.NEWS_DEADLINE_MAX
+    assert api_server._parse_deadline({}) == api_server.NEWS_DEADLINE
+
+
+if __name__ == "__main__":
+    test_deadline_budget()
+    test_deadline_partial()
+    print("\n===== 爬取時限測試完成 =====")
@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+from analysis.entity_linker import EntityLinker
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.data_manager import DataManager
+from utils.news_service import NewsService
+
+
+def test_resolve_and_mentions():
+    """測試代號、簡稱和別名解析為同一個股票，以及提及的邊界規則"""
+    print("===== 測試股票解析和提及 =====")
+
+    linker = EntityLinker()
+    for keyword in ("2330", "2330.TW", "台積電", "TSMC", "tsmc", "台灣積體電路"):
+        assert linker.ticker_key(keyword) == "2330", keyword
+    assert linker.resolve("不存在的公司") is None
+    assert linker.ticker_key("半導體") == "半導體"
+
+    assert linker.link("台積電與聯電同步擴產，TSMC股價上漲") == ["2330", "2303"]
+    assert linker.mentions("台積電法說會，台積電營收創新高") == {"2330": 2}
+    # 數字代號和英文別名不匹配較長的數字或單詞的一部分
+    assert linker.link("訂單編號12330已出貨") == []
+    assert linker.link("FUMC reported results") == []
+    assert linker.link("UMC reported results") == ["2303"]
+
+
+def test_tag_and_split():
+    """測試標記新聞提到的股票，並按股票拆分分析結果"""
+    print("===== 測試標記和拆分 =====")
+
+    linker = EntityLinker()
+    news_list = linker.tag([
+        {"title": "台積電擴產", "summary": "聯電跟進"},
+        {"title": "聯電營收", "summary": ""},
+        {"title": "大盤震盪", "summary": None},
+    ])
+    assert [news["tickers"] for news in news_list] == [["2330", "2303"], ["2303"], []]
+
+    results = {"news_sentiments": [{"label": "積極"}, {"label": "消極"}, {"label": "中性"}], "keywords": ["擴產"]}
+    groups = linker.split_by_ticker(news_list, results)
+    assert set(groups) == {"2330", "2303"}
+    umc_news, umc_results = groups["2303"]
+    assert [news["title"] for news in umc_news] == ["台積電擴產", "聯電營收"]
+    assert [item["label"] for item in umc_results["news_sentiments"]] == ["積極", "消極"]
+    assert umc_results["keywords"] == ["擴產"]
+
+
+def test_news_service_tags():
+    """測試新聞服務爬取時標記股票，存儲讀取的新聞也帶有標記"""
+    print("===== 測試新聞服務標記股票 =====")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_manager = DataManager(data_dir)
+        service = NewsService({"yahoo": FakeCrawler("yahoo", title="台積電與聯電擴產")}, data_manager)
+
+        result = service.crawl("半導體", limit=2)
+        assert [news["tickers"] for news in result["news"]] == [["2330", "2303"]] * 2
+
+        streamed = [payload for event, _, payload in service.iter_crawl("半導體", limit=2, save=False)
+                    if event == "article"]
+        assert all(news["tickers"] == ["2330", "2303"] for news in streamed)
+
+        stored = service.read("半導體", limit=2)
+        assert [news["tickers"] for news in stored["news"]] == [["2330", "2303"]] * 2
+        data_manager.wait_for_corpus_stats(timeout=30)
+
+
+def test_api_fans_out():
+    """測試API分析一個關鍵字時，新聞提到的股票的匯總和指數也一併更新"""
+    print("===== 測試API按提及的股票更新 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo", title="台積電與聯電擴產 公司看好前景"))
+
+    body = client.post("/api/v2/sentiment", json={"keywords": ["晶圓代工"], "limit": 3, "mode": "live"}).get_json()
+    assert body["results"]["晶圓代工"]["news_count"] == 3
+
+    index = client.get("/api/v2/index?tickers=晶圓代工,2330,聯電").get_json()["results"]
+    print(f"指數文章數: { {ticker: value.get('count') for ticker, value in index.items()} }")
+    assert index["晶圓代工"]["count"] == 3
+    assert index["2330"]["count"] >= 3
+    assert index["聯電"]["count"] >= 3
+
+    history = client.get("/api/v2/history?tickers=2303&days=1").get_json()["results"]["2303"]
+    assert history["summary"]["count"] >= 3
+
+
+if __name__ == "__main__":
+    test_resolve_and_mentions()
+    test_tag_and_split()
+    test_news_service_tags()
+    test_api_fans_out()
+    print("\n===== 股票關聯測試完成 =====")
@@ -0,0 +1,139 @@
+import threading
+import time
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.job_manager import CrawlJobManager, JobQueueFullError
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.02)
+    return job.done
+
+
+def test_job_lifecycle():
+    """測試任務執行成功和失敗的狀態"""
+    print("===== 測試任務狀態 =====")
+
+    def run_job(params):
+        if params["keyword"] == "壞":
+            raise RuntimeError("爬取失敗")
+        return [params["keyword"]]
+
+    manager = CrawlJobManager(run_job, max_workers=1)
+    try:
+        job, created = manager.submit({"keyword": "好"})
+        assert created
+        assert _wait(job)
+        assert job.status == "succeeded"
+        assert job.result == ["好"]
+        assert manager.get(job.id) is job
+
+        failed, _ = manager.submit({"keyword": "壞"})
+        assert _wait(failed)
+        assert failed.status == "failed"
+        assert failed.error == "爬取失敗"
+        assert failed.to_dict()["finished_at"] is not None
+        assert manager.stats() == {"queued": 0, "running": 0, "succeeded": 1, "failed": 1}
+        assert manager.get("missing") is None
+    finally:
+        manager.shutdown()
+
+
+def test_deduplicate_and_queue_limit():
+    """測試相同參數的進行中任務不重複提交，以及等待中任務數的上限"""
+    print("===== 測試任務去重和隊列上限 =====")
+
+    release = threading.Event()
+    calls = []
+
+    def run_job(params):
+        calls.append(params)
+        release.wait(5)
+        return []
+
+    manager = CrawlJobManager(run_job, max_workers=1, max_pending=2)
+    try:
+        first, created = manager.submit({"keyword": "2330", "limit": 5})
+        # 參數順序不影響去重
+        same, created_again = manager.submit({"limit": 5, "keyword": "2330"})
+        assert created and not created_again
+        assert same is first
+
+        manager.submit({"keyword": "2454", "limit": 5})
+        try:
+            manager.submit({"keyword": "2317", "limit": 5})
+        except JobQueueFullError:
+            pass
+        else:
+            raise AssertionError("超過等待中任務上限時應該拒絕")
+
+        release.set()
+        assert _wait(first)
+        # 完成後相同參數會建立新任務
+        again, created = manager.submit({"keyword": "2330", "limit": 5})
+        assert created and again is not first
+        assert _wait(again)
+        assert len(calls) == 3
+    finally:
+        release.set()
+        manager.shutdown()
+
+
+def test_result_ttl():
+    """測試完成的任務過期後被清除"""
+    print("===== 測試任務結果過期 =====")
+
+    manager = CrawlJobManager(lambda params: [], result_ttl=0.1)
+    try:
+        job, _ = manager.submit({"keyword": "2330"})
+        assert _wait(job)
+        assert manager.get(job.id) is job
+        time.sleep(0.2)
+        assert manager.get(job.id) is None
+    finally:
+        manager.shutdown()
+
+
+def test_jobs_api():
+    """測試任務API：提交、去重、查詢和獲取結果"""
+    print("===== 測試任務API =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    crawler = FakeCrawler("yahoo", delay=0.3)
+    use_crawlers(api_server, yahoo=crawler)
+
+    first = client.post("/api/v2/jobs", json={"keyword": "JOB1", "limit": 2})
+    second = client.post("/api/v2/jobs?keyword=JOB1&limit=2")
+    assert first.status_code == 202
+    assert second.json["deduplicated"]
+    job_id = first.json["job"]["job_id"]
+    assert second.json["job"]["job_id"] == job_id
+    assert first.headers["Location"] == f"/api/v2/jobs/{job_id}"
+
+    pending = client.get(f"/api/v2/jobs/{job_id}/result")
+    assert pending.status_code == 202
+    assert pending.headers["Retry-After"] == "5"
+
+    assert _wait(api_server.job_manager.get(job_id))
+    assert client.get(f"/api/v2/jobs/{job_id}").json["job"]["status"] == "succeeded"
+    result = client.get(f"/api/v2/jobs/{job_id}/result")
+    print(f"任務結果: {result.status_code} {result.json['count']}條")
+    assert result.status_code == 200
+    assert result.json["count"] == 2
+    assert result.json["job"]["job_id"] == job_id
+    assert crawler.calls == 1
+
+    assert client.get("/api/v2/jobs/missing").status_code == 404
+    assert client.get("/api/v2/jobs/missing/result").status_code == 404
+    assert client.post("/api/v2/jobs", json={"keyword": "JOB1", "limit": "x"}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    test_deduplicate_and_queue_limit()
+    test_result_ttl()
+    test_jobs_api()
+    print("\n===== 後台任務測試完成 =====")
@@ -0,0 +1,92 @@
+import time
+
+from analysis.metrics import MetricsRegistry
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+
+
+def test_registry_render():
+    """測試計數器、量表和直方圖的Prometheus文本輸出"""
+    print("===== 測試指標輸出 =====")
+
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    registry.describe("requests_total", "counter", "請求數")
+    registry.inc("requests_total", source="yahoo")
+    registry.inc("requests_total", 2, source="yahoo")
+    registry.set("active", 3)
+    registry.observe("latency_seconds", 0.05, stage="load")
+    registry.observe("latency_seconds", 0.5, stage="load")
+    registry.observe("latency_seconds", 5, stage="load")
+    registry.inc("quoted_total", path='a"b\\c')
+
+    assert registry.get("requests_total", source="yahoo") == 3
+    assert registry.get("requests_total", source="cnyes") == 0
+    assert registry.get("active") == 3
+    assert registry.get("latency_seconds", stage="load") == (3, 5.55)
+
+    lines = registry.render().splitlines()
+    print("\n".join(lines))
+    assert "# HELP requests_total 請求數" in lines
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{source="yahoo"} 3' in lines
+    assert "# TYPE active gauge" in lines
+    assert "active 3" in lines
+    # 直方圖分桶為累計值
+    assert 'latency_seconds_bucket{stage="load",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="load",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="load",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{stage="load"} 3' in lines
+    assert 'quoted_total{path="a\\"b\\\\c"} 1' in lines
+
+
+def test_timer():
+    """測試計時區塊在拋出異常時仍記錄耗時"""
+    print("===== 測試計時器 =====")
+
+    registry = MetricsRegistry()
+
+    @registry.timed("work_seconds", stage="test")
+    def work():
+        time.sleep(0.01)
+        return 1
+
+    assert work() == 1
+    try:
+        with registry.timer("work_seconds", stage="test"):
+            raise RuntimeError("失敗")
+    except RuntimeError:
+        pass
+    count, total = registry.get("work_seconds", stage="test")
+    assert count == 2
+    assert total >= 0.01
+
+
+def test_metrics_endpoint():
+    """測試/metrics接口包含請求延遲、分析階段、緩存和准入控制的指標"""
+    print("===== 測試/metrics接口 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"))
+
+    assert client.post("/api/v2/sentiment", json={"keywords": ["MT1"], "limit": 2, "mode": "live"}).status_code == 200
+    client.get("/api/v2/news?keyword=MT1&limit=2")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    for line in ('http_request_seconds_count{endpoint="/api/v2/sentiment",method="POST",status="200"}',
+                 'analysis_stage_seconds_count{stage="analyze"}',
+                 'cache_requests_total{cache="news",result="hit"}',
+                 'storage_operation_seconds_count{operation="save_news"}',
+                 'crawl_jobs{status="queued"}',
+                 'admission_max_active ',
+                 'response_cache_entries{cache="news"}'):
+        assert line in body, line
+
+
+if __name__ == "__main__":
+    test_registry_render()
+    test_timer()
+    test_metrics_endpoint()
+    print("\n===== 指標測試完成 =====")
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.news_store import NewsStore
+
+_workdir = None
+
+
+def setup_module(module=None):
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def _news(i, hours_ago=0, **extra):
+    published = (datetime.now() - timedelta(hours=hours_ago)).strftime("%Y-%m-%d %H:%M:%S")
+    return {"title": f"新聞{i}", "link": f"http://example.com/{i}", "published_time": published, **extra}
+
+
+def test_store_and_query():
+    """測試按關鍵字和來源保存、去重、時間窗口和條數限制"""
+    print("===== 測試新聞存儲 =====")
+
+    store = NewsStore(os.path.join(_workdir.name, "store", "news_store.db"))
+    try:
+        crawled_at = time.time() - 60
+        added = store.add(" TSMC ", "yahoo", [
+            _news(1, hours_ago=1), _news(2, hours_ago=2), _news(3, hours_ago=30),
+            {"title": "示例新聞", "link": "", "is_sample": True}, _news(4, hours_ago=3, _normalized=("x",))
+        ], crawled_at=crawled_at)
+        assert added == 4
+
+        # 相同連結再次保存時覆蓋，不產生重複
+        store.add("tsmc", "yahoo", [_news(1, hours_ago=1)])
+        news = store.query("Tsmc", ["yahoo", "cnyes"], hours=24, limit=10)
+        assert [item["title"] for item in news["yahoo"]] == ["新聞1", "新聞2", "新聞4"]
+        assert news["cnyes"] == []
+        assert isinstance(news["yahoo"][0]["date"], datetime)
+        assert "_normalized" not in news["yahoo"][2]
+
+        assert len(store.query("tsmc", ["yahoo"], hours=24, limit=2)["yahoo"]) == 2
+        assert len(store.query("tsmc", ["yahoo"], hours=48)["yahoo"]) == 4
+
+        times = store.crawl_times("TSMC", ["yahoo", "cnyes"])
+        assert times["cnyes"] is None
+        assert times["yahoo"] > crawled_at
+
+        # 只有示例數據時仍記錄爬取時間
+        assert store.add("tsmc", "cnyes", [{"title": "示例新聞", "is_sample": True}]) == 0
+        assert store.crawl_times("tsmc", ["cnyes"])["cnyes"] is not None
+    finally:
+        store.close()
+
+
+def test_store_mode_api():
+    """測試store模式：沒有存儲時同步爬取，新鮮時直接讀取，較舊時提交後台刷新"""
+    print("===== 測試存儲讀取模式 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    crawler = FakeCrawler("yahoo")
+    use_crawlers(api_server, yahoo=crawler)
+
+    response = client.get("/api/v2/news?keyword=ST43&limit=2&mode=store")
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+    assert crawler.calls == 1
+
+    api_server.news_cache.invalidate()
+    response = client.get("/api/v2/news?keyword=st43&limit=2&mode=store")
+    print(f"存儲讀取: {response.headers['X-Cache']} {response.json['count']}條")
+    assert response.headers["X-Cache"] == "STORE"
+    assert response.json["count"] == 2
+    assert crawler.calls == 1
+
+    original = api_server.NEWS_STORE_REFRESH_AFTER
+    api_server.NEWS_STORE_REFRESH_AFTER = -1
+    try:
+        response = client.get("/api/v2/news?keyword=ST43&limit=2&mode=store")
+        assert response.headers["X-Cache"] == "STORE"
+        # 後台任務刷新存儲
+        deadline = time.time() + 5
+        while crawler.calls < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        assert crawler.calls == 2
+    finally:
+        api_server.NEWS_STORE_REFRESH_AFTER = original
+
+    # 超過最大年齡時同步爬取
+    original = api_server.NEWS_STORE_MAX_AGE
+    api_server.NEWS_STORE_MAX_AGE = -1
+    try:
+        api_server.news_cache.invalidate()
+        response = client.get("/api/v2/news?keyword=ST43&limit=2&mode=store")
+        assert response.headers["X-Cache"] == "MISS"
+        assert crawler.calls == 3
+    finally:
+        api_server.NEWS_STORE_MAX_AGE = original
+
+    assert client.get("/api/v2/news?keyword=ST43&mode=foo").status_code == 400
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_store_and_query()
+        test_store_mode_api()
+        print("\n===== 新聞存儲測試完成 =====")
+    finally:
+        teardown_module()
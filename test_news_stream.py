@@ -0,0 +1,107 @@
+import json
+import time
+
+from api_test_helpers import FakeCrawler, SlowCrawler, load_api_server, use_crawlers
+from utils.admission import AdmissionController
+
+
+def _events(response):
+    """讀取NDJSON事件並關閉響應（WSGI伺服器在響應結束時關閉，關閉時才釋放爬取名額）"""
+    with response:
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_events():
+    """測試NDJSON和SSE流式響應的事件順序"""
+    print("===== 測試流式新聞事件 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"), cnyes=FakeCrawler("cnyes", delay=0.2))
+
+    response = client.get("/api/v2/news?keyword=SN1&limit=2&stream=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    events = _events(response)
+    assert api_server.admission.stats()["active"] == 0
+    print(f"事件: {[event['event'] for event in events]}")
+    assert [event["event"] for event in events] == ["article", "article", "source_done"] * 2 + ["summary"]
+    assert [event["source"] for event in events if event["event"] == "source_done"] == ["yahoo", "cnyes"]
+    assert events[-1]["count"] == 4
+
+    # 完整結果寫入響應緩存
+    assert client.get("/api/v2/news?keyword=SN1&limit=2").headers["X-Cache"] == "HIT"
+
+    with client.get("/api/v2/news?keyword=SN2&limit=1", headers={"Accept": "text/event-stream"}) as response:
+        assert response.mimetype == "text/event-stream"
+        assert response.get_data(as_text=True).count("event: article") == 2
+
+    assert client.get("/api/v2/news?keyword=SN3&stream=xml").status_code == 400
+
+
+def test_stream_deadline():
+    """測試流式響應的時限：超時的來源記為timeout，排隊時間計入時限"""
+    print("===== 測試流式響應時限 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"), cnyes=SlowCrawler("cnyes"))
+
+    start = time.time()
+    events = _events(client.get("/api/v2/news?keyword=SD1&limit=5&stream=ndjson&deadline=1"))
+    elapsed = time.time() - start
+    status = {event["source"]: event["status"] for event in events if event["event"] == "source_done"}
+    print(f"耗時: {elapsed:.2f}秒，狀態: {status}")
+    assert elapsed < 3
+    assert status == {"yahoo": "success", "cnyes": "timeout"}
+    assert events[-1]["partial"] is True
+    assert not any(event["data"].get("is_sample") for event in events if event["event"] == "article")
+
+    original = api_server.admission
+    try:
+        api_server.admission = AdmissionController(max_active=1, max_queue=1, max_wait=10)
+        acquired_at = api_server.admission.acquire()
+        start = time.time()
+        response = client.get("/api/v2/news?keyword=SD2&limit=1&stream=ndjson&deadline=0.5")
+        elapsed = time.time() - start
+        api_server.admission.release(acquired_at)
+        # 排隊最多等到時限，而不是准入控制的max_wait
+        assert response.status_code == 503
+        assert elapsed < 2
+        assert api_server.admission.stats()["active"] == 0
+    finally:
+        api_server.admission = original
+
+
+def test_stream_disconnect():
+    """測試客戶端中途斷開時取消仍在運行的爬蟲並釋放名額"""
+    print("===== 測試流式響應斷開 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    slow = SlowCrawler("cnyes", interval=0.3)
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"), cnyes=slow)
+
+    original = api_server.admission
+    try:
+        api_server.admission = AdmissionController(max_active=2, max_queue=0, max_wait=1)
+        response = client.get("/api/v2/news?keyword=SC1&limit=5&stream=ndjson&deadline=30", buffered=False)
+        for line in response.response:
+            if json.loads(line)["event"] == "source_done":
+                break
+        assert api_server.admission.stats()["active"] == 1
+        response.close()
+        assert api_server.admission.stats()["active"] == 0
+
+        # 慢速爬蟲需要1.5秒才能完成，斷開後在下一次等待時被取消
+        time.sleep(2)
+        print(f"慢速爬蟲完成次數: {slow.finished}")
+        assert slow.finished == 0
+    finally:
+        api_server.admission = original
+
+
+if __name__ == "__main__":
+    test_stream_events()
+    test_stream_deadline()
+    test_stream_disconnect()
+    print("\n===== 流式新聞測試完成 =====")
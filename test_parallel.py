@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+from analysis.benchmark import generate_corpus
+from analysis.parallel import create_pool
+from analysis.registry import configure_jieba
+from analysis.sentiment_analyzer import SentimentAnalyzer
+
+_workdir = None
+_cwd = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄；工作進程在當前目錄建立緩存，因此切換到臨時目錄"""
+    global _workdir, _cwd
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "data", "cache"))
+    _cwd = os.getcwd()
+    os.chdir(_workdir.name)
+
+
+def teardown_module(module=None):
+    os.chdir(_cwd)
+    _workdir.cleanup()
+
+
+def _fresh(corpus):
+    return [dict(news) for news in corpus]
+
+
+def _assert_same(expected, actual):
+    assert actual["overall_sentiment"] == expected["overall_sentiment"]
+    assert abs(actual["avg_compound"] - expected["avg_compound"]) < 1e-9
+    assert [item["label"] for item in actual["news_sentiments"]] == \
+        [item["label"] for item in expected["news_sentiments"]]
+    assert actual["keywords"] == expected["keywords"]
+
+
+def test_batch_matches_single_process():
+    """測試進程池分析與單進程分析的結果一致，包括父進程中擴充的詞"""
+    print("===== 測試進程池分析一致性 =====")
+
+    corpus = generate_corpus(400, "mixed", 7)
+    for engine in ("jieba", "automaton"):
+        analyzer = SentimentAnalyzer(engine=engine, extra_positive_words=["量子躍遷題材"])
+        corpus[0] = {"title": "市場熱議量子躍遷題材", "summary": ""}
+
+        expected = analyzer.analyze(_fresh(corpus))
+        actual = analyzer.analyze_batch(_fresh(corpus), workers=2, chunk_size=100)
+        print(f"{engine}: {actual['overall_sentiment']} {actual['avg_compound']:.4f}")
+        _assert_same(expected, actual)
+        assert actual["news_sentiments"][0]["label"] == "積極"
+
+
+def test_pool_reuse():
+    """測試進程池可在多次分析之間重用，少量文章直接在當前進程分析"""
+    print("===== 測試進程池重用 =====")
+
+    analyzer = SentimentAnalyzer(engine="jieba")
+    first = generate_corpus(300, "zh", 8)
+    second = generate_corpus(300, "zh", 9)
+
+    with create_pool(analyzer, workers=2) as executor:
+        for corpus in (first, second):
+            _assert_same(analyzer.analyze(_fresh(corpus)),
+                         analyzer.analyze(_fresh(corpus), executor, chunk_size=100))
+
+    small = generate_corpus(20, "zh", 10)
+    _assert_same(analyzer.analyze(_fresh(small)), analyzer.analyze_batch(_fresh(small), workers=2))
+
+
+def test_backend_rejected():
+    """測試可插拔後端不能在工作進程中共用"""
+    print("===== 測試後端不使用進程池 =====")
+
+    class FakeBackend:
+        version = "fake"
+
+    try:
+        create_pool(SentimentAnalyzer(backend=FakeBackend()), workers=2)
+    except ValueError as e:
+        print(f"預期的錯誤: {e}")
+    else:
+        raise AssertionError("可插拔後端應該拒絕建立進程池")
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_batch_matches_single_process()
+        test_pool_reuse()
+        test_backend_rejected()
+        print("\n===== 進程池分析測試完成 =====")
+    finally:
+        teardown_module()
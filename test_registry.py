@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from analysis.registry import configure_jieba, get_analyzer, warm_up
+from analysis.sentiment_analyzer import load_vader
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def test_lazy_imports():
+    """測試導入分析模組時不導入nltk、sklearn和pandas"""
+    print("===== 測試延遲導入 =====")
+
+    code = ("import sys\n"
+            "import analysis.registry, analysis.sentiment_analyzer, analysis.trend_predictor\n"
+            "print(','.join(m for m in ('nltk', 'sklearn', 'pandas') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True,
+                            text=True, check=True).stdout.strip()
+    print(f"導入後已載入: {output or '無'}")
+    assert output == ""
+
+
+def test_shared_analyzers():
+    """測試相同配置的分析器只構建一次"""
+    print("===== 測試分析器共用 =====")
+
+    assert get_analyzer("jieba", use_cache=False) is get_analyzer("jieba", use_cache=False)
+    assert get_analyzer("automaton", use_cache=False) is not get_analyzer("jieba", use_cache=False)
+
+
+def test_offline_vader():
+    """測試VADER從附帶的詞典載入，不觸發下載"""
+    print("===== 測試離線VADER詞典 =====")
+
+    import nltk
+
+    def no_download(*args, **kwargs):
+        raise AssertionError("不應下載nltk資料")
+
+    download = nltk.download
+    nltk.download = no_download
+    try:
+        sia = load_vader()
+    finally:
+        nltk.download = download
+
+    assert sia is load_vader()
+    assert sia.polarity_scores("This stock looks great")["compound"] > 0
+    assert sia.polarity_scores("Shares plunge on terrible losses")["compound"] < 0
+
+
+def test_warm_up():
+    """測試預熱後詞典已載入，jieba前綴詞典寫入持久緩存"""
+    print("===== 測試預熱 =====")
+
+    # 共用的情感緩存建立在當前目錄的data/cache下
+    cwd = os.getcwd()
+    os.chdir(_workdir.name)
+    try:
+        timings = warm_up(engines=("jieba", "automaton"))
+    finally:
+        os.chdir(cwd)
+    print(f"預熱耗時: {timings}")
+
+    assert set(timings) == {"jieba_dictionary", "analyzer_jieba", "analyzer_automaton"}
+    import jieba
+    assert jieba.dt.initialized
+    # 詞典緩存位於設置的持久目錄，而不是系統臨時目錄
+    assert jieba.dt.cache_file == "jieba.cache"
+    assert os.path.abspath(jieba.dt.tmp_dir) != os.path.abspath(tempfile.gettempdir())
+    assert get_analyzer("jieba")._sia is not None
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_lazy_imports()
+        test_shared_analyzers()
+        test_offline_vader()
+        test_warm_up()
+        print("\n===== 分析器註冊表測試完成 =====")
+    finally:
+        teardown_module()
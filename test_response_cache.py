@@ -0,0 +1,143 @@
+import threading
+import time
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.response_cache import ResponseCache
+
+
+def test_response_cache_coalescing():
+    """測試同一個鍵同時未命中時只計算一次"""
+    print("===== 測試請求合併 =====")
+
+    cache = ResponseCache(ttl=60, stale_ttl=60, name="test")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": len(calls)}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    states = sorted(state for _, state, _ in results)
+    print(f"計算次數: {len(calls)}，狀態: {states}")
+    assert len(calls) == 1
+    assert states == ["coalesced"] * 4 + ["miss"]
+    assert all(value == {"value": 1} for value, _, _ in results)
+    assert cache.get_or_compute("k", compute)[1] == "hit"
+
+
+def test_response_cache_stale_while_revalidate():
+    """測試過期後先返回舊值並在後台刷新，部分結果不寫入緩存"""
+    print("===== 測試stale-while-revalidate =====")
+
+    cache = ResponseCache(ttl=0.3, stale_ttl=5, name="test", cacheable=lambda value: not value.get("partial"))
+    version = {"n": 0}
+
+    def compute():
+        version["n"] += 1
+        return {"version": version["n"], "partial": False}
+
+    assert cache.get_or_compute("k", compute)[:2] == ({"version": 1, "partial": False}, "miss")
+    time.sleep(0.35)
+
+    value, state, _ = cache.get_or_compute("k", compute)
+    assert (value["version"], state) == (1, "stale")
+
+    # 後台刷新完成後返回新值
+    deadline = time.time() + 2
+    while time.time() < deadline:
+        value, state, _ = cache.get_or_compute("k", compute)
+        if state == "hit":
+            break
+        time.sleep(0.02)
+    assert (value["version"], state) == (2, "hit")
+
+    value, state, _ = cache.get_or_compute("p", lambda: {"partial": True})
+    assert state == "miss"
+    assert cache.get_or_compute("p", lambda: {"partial": True})[1] == "miss"
+
+
+def test_response_cache_errors_and_eviction():
+    """測試計算失敗時等待者收到同一個異常且不寫入緩存，以及超過上限時淘汰最久未使用的鍵"""
+    print("===== 測試錯誤傳遞和淘汰 =====")
+
+    cache = ResponseCache(ttl=60, stale_ttl=0, max_entries=2, name="test")
+
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("爬取失敗")
+
+    errors = []
+
+    def request():
+        try:
+            cache.get_or_compute("bad", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["爬取失敗"] * 3
+    assert len(cache) == 0
+
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("c", lambda: 3)
+    assert cache.get_or_compute("a", lambda: 0)[1] == "hit"
+    assert cache.get_or_compute("b", lambda: 0)[:2] == (0, "miss")
+
+    assert cache.get_or_compute("a", lambda: 9, refresh=True)[:2] == (9, "miss")
+    cache.invalidate("a")
+    assert cache.get_or_compute("a", lambda: 5)[:2] == (5, "miss")
+
+
+def test_news_api_cache():
+    """測試新聞接口的緩存響應頭、鍵標準化、強制刷新和併發請求合併"""
+    print("===== 測試新聞接口緩存 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    crawler = FakeCrawler("yahoo", delay=0.3)
+    use_crawlers(api_server, yahoo=crawler)
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(
+        api_server.app.test_client().get("/api/v2/news?keyword=RC1&limit=2"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    states = sorted(response.headers["X-Cache"] for response in responses)
+    print(f"併發請求: {states}，爬取次數: {crawler.calls}")
+    assert crawler.calls == 1
+    assert states == ["COALESCED"] * 3 + ["MISS"]
+
+    # 關鍵字大小寫和空白不同也命中同一個緩存
+    response = client.get("/api/v2/news?keyword=%20rc1%20&limit=2")
+    assert response.headers["X-Cache"] == "HIT"
+    assert "stale-while-revalidate" in response.headers["Cache-Control"]
+    assert crawler.calls == 1
+
+    response = client.get("/api/v2/news?keyword=RC1&limit=2&refresh=true")
+    assert response.headers["X-Cache"] == "MISS"
+    assert crawler.calls == 2
+
+
+if __name__ == "__main__":
+    test_response_cache_coalescing()
+    test_response_cache_stale_while_revalidate()
+    test_response_cache_errors_and_eviction()
+    test_news_api_cache()
+    print("\n===== 響應緩存測試完成 =====")
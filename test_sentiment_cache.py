@@ -0,0 +1,106 @@
+import os
+import tempfile
+
+from analysis.benchmark import generate_corpus
+from analysis.registry import configure_jieba
+from analysis.sentiment_analyzer import SentimentAnalyzer
+from analysis.sentiment_cache import SentimentCache
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def _fresh(corpus):
+    return [dict(news) for news in corpus]
+
+
+def test_cache_keys():
+    """測試情感緩存鍵隨引擎和詞典版本變化，相同文本命中緩存"""
+    print("===== 測試情感緩存鍵 =====")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = SentimentCache(os.path.join(temp_dir, "sentiment_cache.db"))
+
+        assert SentimentCache.make_key("文本", "v1") == SentimentCache.make_key("文本", "v1")
+        assert SentimentCache.make_key("文本", "v1") != SentimentCache.make_key("文本", "v2")
+
+        jieba_analyzer = SentimentAnalyzer(engine="jieba", cache=cache)
+        automaton_analyzer = SentimentAnalyzer(engine="automaton", cache=cache)
+
+        # 中文評分依引擎區分，英文文本都走VADER，共用同一個版本
+        assert jieba_analyzer._cache_version(True) != automaton_analyzer._cache_version(True)
+        assert jieba_analyzer._cache_version(False) == automaton_analyzer._cache_version(False)
+
+        # 擴充詞典後版本改變，舊條目不再命中
+        version = jieba_analyzer._cache_version(True)
+        jieba_analyzer.add_lexicon_words(positive_words=["量子躍遷題材"])
+        assert jieba_analyzer._cache_version(True) != version
+
+        corpus = generate_corpus(100, "mixed", 2)
+        first = jieba_analyzer.analyze(_fresh(corpus))
+        misses = cache.misses
+        hits = cache.hits
+        second = jieba_analyzer.analyze(_fresh(corpus))
+        print(f"第一次未命中: {misses}，第二次命中: {cache.hits - hits}")
+
+        assert cache.misses == misses
+        assert cache.hits - hits == len(corpus)
+        assert [item["sentiment"] for item in first["news_sentiments"]] == \
+            [item["sentiment"] for item in second["news_sentiments"]]
+        assert first["keywords"] == second["keywords"]
+        cache.close()
+
+
+def test_cache_persists():
+    """測試緩存寫入磁碟，新進程（新的緩存實例）直接命中，中英文路徑都適用"""
+    print("===== 測試情感緩存持久化 =====")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "sentiment_cache.db")
+        corpus = generate_corpus(40, "mixed", 6)
+
+        cache = SentimentCache(db_path)
+        first = SentimentAnalyzer(engine="jieba", cache=cache).analyze(_fresh(corpus), extract_keywords=False)
+        cache.close()
+
+        cache = SentimentCache(db_path)
+        analyzer = SentimentAnalyzer(engine="jieba", cache=cache)
+
+        def score_nothing(texts, *args, **kwargs):
+            assert not texts, "緩存命中時不應重新評分"
+            return []
+
+        analyzer._score_texts = score_nothing
+        second = analyzer.analyze(_fresh(corpus), extract_keywords=False)
+        print(f"重新打開後命中: {cache.hits}，未命中: {cache.misses}")
+
+        assert cache.hits == len(corpus)
+        assert cache.misses == 0
+        assert [item["sentiment"] for item in first["news_sentiments"]] == \
+            [item["sentiment"] for item in second["news_sentiments"]]
+
+        # 清理過期條目和清空緩存後不再命中
+        assert cache.prune(max_age_days=30) == 0
+        cache.clear()
+        assert cache.get_many([SentimentCache.make_key("文本", "v1")]) == {}
+        cache.close()
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_cache_keys()
+        test_cache_persists()
+        print("\n===== 情感緩存測試完成 =====")
+    finally:
+        teardown_module()
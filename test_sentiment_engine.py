@@ -0,0 +1,159 @@
+import os
+import tempfile
+from collections import Counter
+
+import jieba
+
+from analysis import registry
+from analysis.benchmark import generate_corpus
+from analysis.registry import configure_jieba, get_analyzer
+from analysis.sentiment_analyzer import SentimentAnalyzer
+from analysis.text_normalizer import prepare_articles
+
+# 兩種引擎分詞結果一致、應得到相同標籤的句子
+PARITY_SAMPLES = [
+    ("公司看好明年前景，突破成功", "積極"),
+    ("公司成功突破，前景樂觀", "積極"),
+    ("市場悲觀，出現危機", "消極"),
+    ("景氣下滑，虧損擴大，風險增加", "消極"),
+    ("財報平淡無奇", "中性"),
+    ("This stock looks great", "積極"),
+]
+
+# 已知的差異：jieba按上下文切詞時沒有切出詞典詞，自動機仍會匹配
+DIVERGENCE_SAMPLES = [
+    ("季報創新高", "創新"),      # 重疊詞：jieba切為「創/新高」
+    ("維持獲利強勁", "強勁"),    # 跨詞邊界：jieba切為「獲利強/勁」
+    ("營收上漲", "上漲"),        # 跨詞邊界：jieba切為「收上/漲」
+]
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def _news(text):
+    return {"title": text, "summary": ""}
+
+
+def _lexicon_hits(analyzer, text):
+    """兩條路徑各自命中的詞典詞"""
+    lexicon = analyzer.cn_positive_words | analyzer.cn_negative_words
+    jieba_hits = Counter(word for word in analyzer.tokenize(text) if word in lexicon)
+    automaton_hits = Counter(match[2] for match in analyzer._lexicon_scorer.automaton.find_all(text))
+    return jieba_hits, automaton_hits
+
+
+def test_automaton_parity():
+    """測試自動機引擎與jieba路徑的評分一致性"""
+    print("===== 測試自動機引擎一致性 =====")
+
+    jieba_analyzer = SentimentAnalyzer(engine="jieba")
+    automaton_analyzer = SentimentAnalyzer(engine="automaton")
+
+    for text, expected in PARITY_SAMPLES:
+        jieba_label = jieba_analyzer.analyze([_news(text)], extract_keywords=False)["news_sentiments"][0]["label"]
+        automaton_label = automaton_analyzer.analyze([_news(text)], extract_keywords=False)["news_sentiments"][0]["label"]
+        print(f"{text}: jieba={jieba_label} automaton={automaton_label}")
+        assert jieba_label == expected
+        assert automaton_label == expected
+
+
+def test_automaton_divergence():
+    """測試兩條路徑的差異只來自jieba沒有切出的詞典詞"""
+    print("===== 測試自動機引擎差異 =====")
+
+    analyzer = SentimentAnalyzer(engine="automaton")
+
+    for text, word in DIVERGENCE_SAMPLES:
+        jieba_hits, automaton_hits = _lexicon_hits(analyzer, text)
+        print(f"{text}: jieba={dict(jieba_hits)} automaton={dict(automaton_hits)}")
+        assert word in automaton_hits
+        assert word not in jieba_hits
+
+    texts, _ = prepare_articles(generate_corpus(300, "zh", 0))
+    identical = 0
+    for text in texts:
+        jieba_hits, automaton_hits = _lexicon_hits(analyzer, text)
+        # jieba命中的詞自動機一定命中，差異只能是自動機多匹配
+        assert not jieba_hits - automaton_hits, text
+        if jieba_hits != automaton_hits:
+            continue
+
+        # 命中相同時只有分母（估算詞數）不同，標籤必須一致且得分接近
+        identical += 1
+        jieba_compound = analyzer._analyze_chinese_sentiment_jieba(text)["compound"]
+        automaton_compound = analyzer._lexicon_scorer.score(text)["compound"]
+        assert analyzer._label(jieba_compound) == analyzer._label(automaton_compound), text
+        assert abs(jieba_compound - automaton_compound) < 0.05, text
+
+    print(f"命中相同的文章: {identical}/{len(texts)}")
+    assert identical > 0
+
+
+def test_automaton_skips_segmentation():
+    """測試自動機引擎不提取關鍵詞時完全不分詞"""
+    print("===== 測試自動機引擎不分詞 =====")
+
+    analyzer = SentimentAnalyzer(engine="automaton")
+    assert not analyzer.tokenizes_for_scoring
+    assert SentimentAnalyzer(engine="jieba").tokenizes_for_scoring
+
+    def fail(text):
+        raise AssertionError("自動機引擎不應調用分詞")
+
+    analyzer.tokenize = fail
+    result = analyzer.analyze(generate_corpus(50, "mixed", 1), extract_keywords=False)
+    assert len(result["news_sentiments"]) == 50
+    assert result["keywords"] == []
+
+
+def test_engine_setting():
+    """測試get_analyzer默認使用SENTIMENT_ENGINE設置的引擎"""
+    print("===== 測試引擎設置 =====")
+
+    default_engine = registry.SENTIMENT_ENGINE
+    try:
+        registry.SENTIMENT_ENGINE = "automaton"
+        assert get_analyzer(use_cache=False).engine == "automaton"
+        assert get_analyzer("jieba", use_cache=False).engine == "jieba"
+        registry.SENTIMENT_ENGINE = "jieba"
+        assert get_analyzer(use_cache=False).engine == "jieba"
+    finally:
+        registry.SENTIMENT_ENGINE = default_engine
+
+
+def test_user_words_stay_private():
+    """測試自定義情感詞只加入分析器自己的分詞器，不修改jieba的全局詞典"""
+    print("===== 測試自定義詞不影響全局分詞 =====")
+
+    word = "量子躍遷題材"
+    analyzer = SentimentAnalyzer(engine="jieba", extra_positive_words=[word])
+    text = f"市場熱議{word}"
+
+    assert word in analyzer.tokenize(text)
+    assert word not in jieba.lcut(text)
+    assert word not in jieba.dt.FREQ
+    assert analyzer.analyze([_news(text)], extract_keywords=False)["news_sentiments"][0]["label"] == "積極"
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_automaton_parity()
+        test_automaton_divergence()
+        test_automaton_skips_segmentation()
+        test_engine_setting()
+        test_user_words_stay_private()
+        print("\n===== 引擎測試完成 =====")
+    finally:
+        teardown_module()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.sentiment_rollup import SentimentRollupStore
+
+NOW = datetime(2024, 6, 1, 12, 30, 0)
+
+
+def _batch(items):
+    """items: [(文章編號, 幾小時前, 標籤, 複合得分, 來源)]"""
+    news_list = []
+    news_sentiments = []
+    for index, hours, label, compound, source in items:
+        date = (NOW - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+        news_list.append({"title": f"新聞{index} 晶圓代工", "link": f"http://news/{index}",
+                          "published_time": date, "platform": source})
+        news_sentiments.append({"title": f"新聞{index}", "sentiment": {"compound": compound},
+                                "label": label, "date": date})
+    return news_list, {"news_sentiments": news_sentiments, "keywords": ["晶圓", "代工", "記憶體"]}
+
+
+def test_rollup_buckets():
+    """測試按日和按小時匯總、重複文章不重複計數，以及按來源篩選"""
+    print("===== 測試情感匯總時間桶 =====")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rollups = SentimentRollupStore(os.path.join(temp_dir, "sentiment_rollups.db"))
+        news_list, results = _batch([(1, 0, "積極", 0.8, "Yahoo"), (2, 1, "消極", -0.4, "Yahoo"),
+                                     (3, 1, "中性", 0.0, "鉅亨網"), (4, 30, "積極", 0.6, "Yahoo")])
+        assert rollups.add("2330", news_list, results) == 4
+        assert rollups.add("2330", news_list, results) == 0
+
+        start, end = NOW - timedelta(days=3), NOW
+        days = rollups.query("2330", start, end, granularity="day")
+        print(f"每日匯總: {days}")
+        assert [item["bucket"] for item in days] == ["2024-05-31", "2024-06-01"]
+        assert (days[1]["positive"], days[1]["negative"], days[1]["neutral"]) == (1, 1, 1)
+        assert abs(days[1]["avg_compound"] - 0.4 / 3) < 1e-9
+        assert days[1]["keywords"][:2] == ["晶圓", "代工"]
+
+        hours = rollups.query("2330", start, end, granularity="hour")
+        assert [item["count"] for item in hours] == [1, 2, 1]
+        assert [item["count"] for item in rollups.query("2330", start, end, source="鉅亨網")] == [1]
+
+        summary = rollups.summary("2330", start, end)
+        assert summary["count"] == 4
+        assert (summary["positive"], summary["negative"], summary["neutral"]) == (2, 1, 1)
+        assert abs(summary["avg_compound"] - 0.25) < 1e-9
+        assert summary["overall_sentiment"] == "積極"
+        assert rollups.summary("2317", start, end)["count"] == 0
+        rollups.close()
+
+
+def test_history_endpoints():
+    """測試API從情感匯總返回歷史走勢和整體情感，股票簡稱和代號共用匯總"""
+    print("===== 測試歷史走勢接口 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"))
+
+    body = client.post("/api/v2/sentiment", json={"keywords": ["鴻海"], "limit": 3, "mode": "live",
+                                                  "history": "day", "days": 7}).get_json()
+    result = body["results"]["鴻海"]
+    assert result["history_summary"]["count"] == sum(item["count"] for item in result["history"]) >= 3
+
+    # 長期走勢直接讀取匯總，不爬取新聞
+    crawler = use_crawlers(api_server, yahoo=FakeCrawler("yahoo"))["yahoo"]
+    body = client.get("/api/v2/history?tickers=2317,鴻海&days=7").get_json()
+    print(f"匯總: {body['results']['2317']['summary']}")
+    assert crawler.calls == 0
+    assert body["results"]["2317"] == body["results"]["鴻海"]
+    assert body["results"]["2317"]["summary"]["count"] == result["history_summary"]["count"]
+    assert body["results"]["2317"]["summary"]["overall_sentiment"] == "積極"
+
+    trend = client.post("/api/v2/trend", json={"keywords": ["2317"], "limit": 3, "days": 7}).get_json()
+    assert trend["results"]["2317"]["history_summary"]["count"] >= 3
+
+    assert client.get("/api/v2/history").status_code == 400
+    assert client.get("/api/v2/history?tickers=2317&granularity=week").status_code == 400
+    assert client.get("/api/v2/history?tickers=2317&days=0").status_code == 400
+
+
+if __name__ == "__main__":
+    test_rollup_buckets()
+    test_history_endpoints()
+    print("\n===== 情感匯總測試完成 =====")
@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+
+from analysis.benchmark import generate_corpus
+from analysis.registry import configure_jieba
+from analysis.sentiment_analyzer import SentimentAnalyzer
+from analysis.sentiment_stream import StreamingSentimentAggregator, TopKeywordSketch
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def _fresh(corpus):
+    return [dict(news) for news in corpus]
+
+
+def test_matches_batch_analysis():
+    """測試分批加入的累計結果與一次分析全部新聞一致"""
+    print("===== 測試增量匯總與整批分析一致 =====")
+
+    analyzer = SentimentAnalyzer(engine="jieba")
+    corpus = generate_corpus(120, "mixed", 11)
+    expected = analyzer.analyze(_fresh(corpus))
+
+    aggregator = StreamingSentimentAggregator(analyzer, keep_items=True)
+    snapshots = [snapshot for _, snapshot in aggregator.consume(_fresh(corpus), batch_size=25)]
+    result = aggregator.result()
+    print(f"整批: {expected['overall_sentiment']} {expected['avg_compound']:.4f}，"
+          f"增量: {result['overall_sentiment']} {result['avg_compound']:.4f}")
+
+    # 快照在每批評分後更新，同一批的新聞共享同一個快照
+    assert len(snapshots) == len(corpus)
+    assert sorted(set(snapshot["count"] for snapshot in snapshots)) == [25, 50, 75, 100, 120]
+    assert result["overall_sentiment"] == expected["overall_sentiment"]
+    assert abs(result["avg_compound"] - expected["avg_compound"]) < 1e-9
+    assert [item["label"] for item in result["news_sentiments"]] == \
+        [item["label"] for item in expected["news_sentiments"]]
+    labels = [item["label"] for item in expected["news_sentiments"]]
+    assert (result["positive"], result["negative"], result["neutral"]) == \
+        (labels.count("積極"), labels.count("消極"), labels.count("中性"))
+    # 跨批次累加的TF-IDF權重與整批計算選出同一組關鍵詞（權重相近的詞順序可能不同）
+    assert set(result["keywords"]) == set(expected["keywords"])
+
+    try:
+        StreamingSentimentAggregator(analyzer).result()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("沒有保留每條新聞時result()應該報錯")
+
+
+def test_keyword_sketch():
+    """測試關鍵詞計數器有界，高頻詞不會被淘汰"""
+    print("===== 測試有界關鍵詞計數器 =====")
+
+    sketch = TopKeywordSketch(capacity=5)
+    for i in range(200):
+        sketch.update({"晶圓": 3.0, "代工": 2.0, f"雜訊{i}": 0.5})
+        assert len(sketch) <= 10
+
+    assert [term for term, _ in sketch.top(2)] == ["晶圓", "代工"]
+
+
+def test_stream_sentiment_events():
+    """測試流式響應在每個來源完成後發送累計情感快照"""
+    print("===== 測試流式情感事件 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"), cnyes=FakeCrawler("cnyes", delay=0.2, title="市場悲觀",
+                                                                            summary="出現危機"))
+
+    # 關閉響應才會釋放爬取名額（WSGI伺服器在響應結束時關閉）
+    with client.get("/api/v2/news?keyword=ST1&limit=3&stream=ndjson&sentiment=true") as response:
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    names = [event["event"] for event in events]
+    print(f"事件: {names}")
+
+    sentiments = [event for event in events if event["event"] == "sentiment"]
+    assert [event["source"] for event in sentiments] == ["yahoo", "cnyes"]
+    assert [event["count"] for event in sentiments] == [3, 6]
+    assert sentiments[0]["positive"] == 3
+    assert sentiments[1]["negative"] == 3
+    # 每個sentiment事件緊跟在對應來源的source_done之後
+    for event in sentiments:
+        index = events.index(event)
+        assert events[index - 1]["event"] == "source_done"
+        assert events[index - 1]["source"] == event["source"]
+    assert names[-1] == "summary"
+
+    # 不要求情感時不發送sentiment事件
+    with client.get("/api/v2/news?keyword=ST2&limit=1&stream=sse") as response:
+        assert "event: sentiment" not in response.get_data(as_text=True)
+    assert api_server.admission.stats()["active"] == 0
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_matches_batch_analysis()
+        test_keyword_sketch()
+        test_stream_sentiment_events()
+        print("\n===== 增量情感匯總測試完成 =====")
+    finally:
+        teardown_module()
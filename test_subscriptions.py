@@ -0,0 +1,134 @@
+import json
+import time
+
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+from utils.subscriptions import SubscriberLimitError, SubscriptionHub
+
+
+def _next(subscriber, event, timeout=5):
+    """取出指定類型的下一個事件"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        item = subscriber.next_event(timeout=0.1)
+        if item is not None and item[0] == event:
+            return item[1]
+    raise AssertionError(f"沒有收到{event}事件")
+
+
+def _article(i):
+    return {"title": f"新聞{i}", "link": f"http://example.com/{i}"}
+
+
+def test_hub_pushes_only_new_articles():
+    """測試第一次爬取只建立基準，之後只分析和推送新文章，多個訂閱者共用一次爬取"""
+    print("===== 測試新文章推送 =====")
+
+    articles = [_article(1), _article(2)]
+    crawls = []
+    analyzed = []
+
+    def crawl(keyword):
+        crawls.append(keyword)
+        return list(articles)
+
+    def analyze(keyword, news_list):
+        analyzed.append([news["title"] for news in news_list])
+        return [{"sentiment": {"pos": 0.5, "neg": 0.0, "neu": 0.5, "compound": 0.6}, "label": "積極"}
+                for _ in news_list]
+
+    # 週期很長：輪詢線程只做第一次爬取，之後由測試手動輪詢
+    hub = SubscriptionHub(crawl, analyze, interval=3600)
+    first = hub.subscribe(["TSMC"])
+    assert _next(first, "ready") == {"ticker": "TSMC", "known_articles": 2}
+    # 已有基準的股票立即通知新的訂閱者
+    second = hub.subscribe([" tsmc "])
+    assert _next(second, "ready")["known_articles"] == 2
+    assert analyzed == []
+
+    articles.extend([_article(3), {"title": "示例新聞", "is_sample": True}])
+    assert hub.poll("tsmc") == 1
+    for subscriber in (first, second):
+        payload = _next(subscriber, "news")
+        assert payload["count"] == 1
+        assert payload["articles"][0]["title"] == "新聞3"
+        assert payload["articles"][0]["sentiment"]["compound"] == 0.6
+        assert payload["articles"][0]["label"] == "積極"
+    assert analyzed == [["新聞3"]]
+    assert crawls == ["TSMC", "TSMC"]
+
+    # 沒有新文章時不分析也不推送
+    assert hub.poll("tsmc") == 0
+    assert analyzed == [["新聞3"]]
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(second)
+    assert hub.poll("tsmc") == 0
+    assert len(crawls) == 3
+
+
+def test_limits_and_overflow():
+    """測試客戶端數上限和讀取太慢時的溢出"""
+    print("===== 測試訂閱上限和溢出 =====")
+
+    hub = SubscriptionHub(lambda keyword: [], lambda keyword, news_list: [], interval=3600, max_clients=1,
+                          max_queue=2)
+    subscriber = hub.subscribe(["2330"])
+    try:
+        hub.subscribe(["2317"])
+    except SubscriberLimitError:
+        pass
+    else:
+        raise AssertionError("超過客戶端數上限時應該拒絕")
+
+    # 等輪詢線程推送ready後再塞滿隊列
+    _next(subscriber, "ready")
+    assert subscriber.push("news", {}) and subscriber.push("news", {})
+    assert not subscriber.push("news", {})
+    assert subscriber.overflowed and subscriber.closed
+    hub.unsubscribe(subscriber)
+
+
+def test_subscribe_api():
+    """測試訂閱接口的SSE事件，以及推送文章的情感為完整的得分字典"""
+    print("===== 測試訂閱接口 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"))
+
+    assert client.get("/api/v2/subscribe").status_code == 400
+
+    response = client.get("/api/v2/subscribe?tickers=SUB1", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    events = iter(response.response)
+
+    def next_event(name):
+        for chunk in events:
+            text = chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+            if text.startswith(f"event: {name}\n"):
+                return json.loads(text.split("data: ", 1)[1])
+        raise AssertionError(f"沒有收到{name}事件")
+
+    try:
+        assert next_event("subscribed")["tickers"] == ["SUB1"]
+        assert next_event("ready")["known_articles"] == api_server.SUBSCRIPTION_LIMIT
+
+        # 換一個來源名稱使連結不同，下一次輪詢得到新文章
+        use_crawlers(api_server, yahoo=FakeCrawler("yahoo-new"))
+        assert api_server.subscription_hub.poll("sub1") == api_server.SUBSCRIPTION_LIMIT
+        payload = next_event("news")
+        print(f"推送: {payload['count']}篇，情感: {payload['articles'][0]['sentiment']}")
+        assert payload["ticker"] == "SUB1"
+        sentiment = payload["articles"][0]["sentiment"]
+        assert set(sentiment) == {"pos", "neg", "neu", "compound"}
+        assert payload["articles"][0]["label"] == "積極"
+    finally:
+        response.close()
+    assert api_server.metrics.get("subscription_clients") == 0
+
+
+if __name__ == "__main__":
+    test_hub_pushes_only_new_articles()
+    test_limits_and_overflow()
+    test_subscribe_api()
+    print("\n===== 新文章推送測試完成 =====")
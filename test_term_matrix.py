@@ -0,0 +1,101 @@
+import os
+import tempfile
+
+import jieba.analyse
+import numpy as np
+
+from analysis.benchmark import generate_corpus
+from analysis.registry import configure_jieba
+from analysis.sentiment_analyzer import SentimentAnalyzer
+from analysis.term_matrix import TermDocumentMatrix
+from analysis.text_normalizer import prepare_articles
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+def test_lexicon_scores():
+    """測試矩陣評分與逐篇分詞計數的結果一致"""
+    print("===== 測試矩陣情感評分 =====")
+
+    analyzer = SentimentAnalyzer(engine="jieba")
+    texts, _ = prepare_articles(generate_corpus(100, "zh", 4))
+    texts.append("")
+    matrix = TermDocumentMatrix([analyzer.tokenize(text) for text in texts])
+
+    scores = matrix.lexicon_scores(analyzer.cn_positive_words, analyzer.cn_negative_words)
+    expected = [analyzer._analyze_chinese_sentiment_jieba(text) for text in texts]
+    for key in ("pos", "neg", "neu", "compound"):
+        assert np.allclose(scores[key], [item[key] for item in expected])
+
+    # 只計算部分行時與全部計算的對應行相同
+    rows = [3, 0, 7]
+    subset = matrix.lexicon_scores(analyzer.cn_positive_words, analyzer.cn_negative_words, rows=rows)
+    assert np.allclose(subset["compound"], scores["compound"][rows])
+    print(f"{len(texts)}篇文章的矩陣評分與逐篇評分一致")
+
+
+def test_top_keywords():
+    """測試向量化關鍵詞權重與jieba.analyse.extract_tags一致"""
+    print("===== 測試矩陣關鍵詞提取 =====")
+
+    texts, _ = prepare_articles(generate_corpus(50, "zh", 3))
+    matrix = TermDocumentMatrix.from_texts(texts)
+
+    keywords = matrix.top_keywords(10)
+    reference = dict(jieba.analyse.extract_tags(" ".join(texts), topK=30, withWeight=True))
+    print(f"關鍵詞: {[word for word, _ in keywords]}")
+
+    assert len(keywords) == 10
+    weights = [weight for _, weight in keywords]
+    assert weights == sorted(weights, reverse=True)
+    for word, weight in keywords:
+        assert abs(weight - reference[word]) < 1e-9
+
+    # 空文檔不建立矩陣，也不返回關鍵詞
+    empty = TermDocumentMatrix([[], []])
+    assert empty.top_keywords(10) == []
+    assert list(empty.lexicon_scores({"上漲"}, {"下跌"})["compound"]) == [0, 0]
+
+
+def test_tokenize_once():
+    """測試分析時每篇文章只分詞一次，評分和關鍵詞共用同一個矩陣"""
+    print("===== 測試每篇文章只分詞一次 =====")
+
+    analyzer = SentimentAnalyzer(engine="jieba")
+    calls = []
+    tokenize = analyzer.tokenize
+
+    def counting_tokenize(text):
+        calls.append(text)
+        return tokenize(text)
+
+    analyzer.tokenize = counting_tokenize
+    corpus = generate_corpus(80, "zh", 5)
+    result = analyzer.analyze(corpus)
+    print(f"{len(corpus)}篇文章，分詞{len(calls)}次")
+
+    assert len(calls) == len(corpus)
+    assert len(result["news_sentiments"]) == len(corpus)
+    assert result["keywords"]
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_lexicon_scores()
+        test_top_keywords()
+        test_tokenize_once()
+        print("\n===== 詞-文檔矩陣測試完成 =====")
+    finally:
+        teardown_module()
@@ -0,0 +1,87 @@
+import re
+
+from analysis.text_normalizer import (CACHE_FIELD, clean_display_text, is_chinese, normalize_text, prepare_article,
+                                      prepare_articles, strip_cache_fields)
+
+SAMPLES = [
+    "<p>台積電營收創新高</p> https://news.example.com/1",
+    "  多行\n文本\t\t中的   空白  ",
+    "<b>Apple</b> shares <i>surge</i> http://a.b/c?d=1 after earnings",
+    "沒有標籤也沒有網址",
+    "",
+]
+
+
+def _legacy_clean(text):
+    """改寫前分析器使用的清理規則"""
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'http\S+', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def test_normalize_matches_legacy():
+    """測試不含全形字符時標準化結果與原來的正則清理相同"""
+    print("===== 測試文本標準化與原規則一致 =====")
+
+    for text in SAMPLES:
+        print(repr(normalize_text(text)))
+        assert normalize_text(text) == _legacy_clean(text)
+    assert normalize_text(None) == ""
+
+
+def test_width_folding():
+    """測試全形英數字轉半形，中文標點保持不變"""
+    print("===== 測試全形轉半形 =====")
+
+    assert normalize_text("ＡＩ伺服器營收成長２５．５％") == "AI伺服器營收成長25.5%"
+    assert normalize_text("股價：１０００元，漲幅！") == "股價：1000元，漲幅！"
+    assert normalize_text("全形　空格") == "全形 空格"
+    assert normalize_text("ＡＩ", fold_width=False) == "ＡＩ"
+
+
+def test_is_chinese():
+    """測試中文判斷"""
+    print("===== 測試中文判斷 =====")
+
+    assert is_chinese("TSMC 台積電")
+    assert not is_chinese("TSMC shares rally")
+    assert not is_chinese("")
+
+
+def test_prepare_article_cache():
+    """測試標準化結果緩存在新聞上，標題或概要修改後重新計算"""
+    print("===== 測試新聞文本緩存 =====")
+
+    news = {"title": "<b>聯發科</b>", "summary": None, "link": "https://example.com/1"}
+    assert prepare_article(news) == ("聯發科", True)
+    assert CACHE_FIELD in news
+    assert prepare_article(news) == ("聯發科", True)
+
+    news["summary"] = "Ｑ３ results beat"
+    assert prepare_article(news) == ("聯發科 Q3 results beat", True)
+
+    texts, flags = prepare_articles([news, {"title": "Apple rallies", "summary": "https://x.y"}])
+    assert texts == ["聯發科 Q3 results beat", "Apple rallies"]
+    assert flags == [True, False]
+
+    stripped = strip_cache_fields(news)
+    assert CACHE_FIELD not in stripped
+    assert stripped["link"] == news["link"]
+    assert CACHE_FIELD in news
+
+
+def test_clean_display_text():
+    """測試爬蟲顯示文本只合併空白，不改變全形字符"""
+    print("===== 測試顯示文本清理 =====")
+
+    assert clean_display_text("  台積電\n  ＡＩ 訂單\t強勁 ") == "台積電 ＡＩ 訂單 強勁"
+    assert clean_display_text(None) == ""
+
+
+if __name__ == "__main__":
+    test_normalize_matches_legacy()
+    test_width_folding()
+    test_is_chinese()
+    test_prepare_article_cache()
+    test_clean_display_text()
+    print("\n===== 文本標準化測試完成 =====")
@@ -0,0 +1,119 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from analysis.ticker_index import TickerSentimentIndex, TickerSentimentState
+from analysis.trend_predictor import TrendPredictor
+from api_test_helpers import FakeCrawler, load_api_server, use_crawlers
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def _results(compounds, hours_ago):
+    """依發布時間（幾小時前）建立情感分析結果和對應的新聞"""
+    news_list = []
+    news_sentiments = []
+    for i, (compound, hours) in enumerate(zip(compounds, hours_ago)):
+        date = (NOW - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+        news_list.append({"title": f"新聞{hours}", "link": f"http://news/{hours}", "published_time": date})
+        news_sentiments.append({"title": f"新聞{hours}", "sentiment": {"compound": compound}, "date": date})
+    return {"news_sentiments": news_sentiments, "overall_sentiment": "中性", "keywords": []}, news_list
+
+
+def test_matches_trend_predictor():
+    """測試指數的趨勢得分與TrendPredictor對同一批新聞的結果一致"""
+    print("===== 測試指數與趨勢預測一致 =====")
+
+    results, news_list = _results([0.6, -0.2, 0.4, -0.8, 0.1], [5, 4, 3, 2, 1])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = TickerSentimentIndex(os.path.join(temp_dir, "ticker_index.json"))
+        assert index.update("2330", results, news_list) == 5
+        # 重複的文章不再加入
+        assert index.update("2330", results, news_list) == 0
+
+        snapshot = index.trend("2330", now=NOW.timestamp())
+        expected = TrendPredictor().predict_many({"2330": (news_list, results)}, now=NOW)["2330"]
+        print(f"指數: {snapshot['trend_score']:.5f}，趨勢預測: {expected['trend_score']:.5f}")
+        assert abs(snapshot["trend_score"] - expected["trend_score"]) < 1e-9
+        assert abs(snapshot["momentum"] - expected["momentum"]) < 1e-9
+        assert snapshot["trend"] == expected["trend"]
+
+
+def test_out_of_order_batches():
+    """測試較舊的文章晚到時，動量仍按發布時間計算"""
+    print("===== 測試亂序批次的動量 =====")
+
+    newer, newer_news = _results([0.9, 0.8, 0.7], [3, 2, 1])
+    older, older_news = _results([-0.9, -0.8, -0.7], [30, 20, 10])
+    combined, combined_news = _results([-0.9, -0.8, -0.7, 0.9, 0.8, 0.7], [30, 20, 10, 3, 2, 1])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = TickerSentimentIndex(os.path.join(temp_dir, "ticker_index.json"))
+        index.update("2330", newer, newer_news)
+        index.update("2330", older, older_news)
+        snapshot = index.trend("2330", now=NOW.timestamp())
+
+    expected = TrendPredictor().predict_many({"2330": (combined_news, combined)}, now=NOW)["2330"]
+    print(f"動量: {snapshot['momentum']:.3f}，按時間排序的動量: {expected['momentum']:.3f}")
+    assert abs(snapshot["momentum"] - expected["momentum"]) < 1e-9
+    assert snapshot["momentum"] > 0
+
+    # 窗口只保留最新的文章，窗口滿時晚到的舊文章不影響動量
+    state = TickerSentimentState("2330", window=3)
+    for compound, timestamp in ((0.1, 100), (0.2, 200), (0.9, 300)):
+        state.add(compound, timestamp)
+    state.add(-1.0, 50)
+    assert [item[1] for item in state.recent_items] == [0.1, 0.2, 0.9]
+
+
+def test_persistence():
+    """測試狀態保存後重新載入，以及舊格式狀態文件的相容"""
+    print("===== 測試指數持久化 =====")
+
+    results, news_list = _results([0.6, -0.2, 0.4, -0.8], [4, 3, 2, 1])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "state", "ticker_index.json")
+        index = TickerSentimentIndex(path)
+        index.update("2330", results, news_list)
+        index.save()
+
+        reloaded = TickerSentimentIndex(path)
+        assert reloaded.trend("2330", now=NOW.timestamp()) == index.trend("2330", now=NOW.timestamp())
+        assert reloaded.update("2330", results, news_list) == 0
+
+    # 舊格式以early/recent兩個列表保存動量窗口
+    data = TickerSentimentState("2330").to_dict()
+    data.pop("recent_items")
+    data.update(ref_time=NOW.timestamp(), count=4, early=[0.6, -0.2], recent=[0.4, -0.8])
+    state = TickerSentimentState.from_dict(data)
+    assert abs(state.momentum() - ((0.4 - 0.8) / 2 - (0.6 - 0.2) / 2)) < 1e-9
+
+
+def test_index_endpoint():
+    """測試API分析後更新進程內的指數，並可按股票代號或簡稱查詢"""
+    print("===== 測試指數接口 =====")
+
+    api_server = load_api_server()
+    client = api_server.app.test_client()
+    use_crawlers(api_server, yahoo=FakeCrawler("yahoo"))
+
+    response = client.post("/api/v2/sentiment", json={"keywords": ["台積電"], "limit": 4, "mode": "live"})
+    assert response.status_code == 200
+
+    body = client.get("/api/v2/index?tickers=2330,台積電,9999").get_json()
+    print(f"指數: {body['results']['2330']}")
+    assert body["status"] == "success"
+    assert body["results"]["2330"]["count"] >= 4
+    assert body["results"]["台積電"]["count"] == body["results"]["2330"]["count"]
+    assert body["results"]["台積電"]["trend"] == body["results"]["2330"]["trend"]
+    assert body["results"]["9999"]["trend"] == "不確定"
+    assert "2330" in client.get("/api/v2/index").get_json()["results"]
+    assert os.path.exists(api_server.ticker_index.path)
+
+
+if __name__ == "__main__":
+    test_matches_trend_predictor()
+    test_out_of_order_batches()
+    test_persistence()
+    test_index_endpoint()
+    print("\n===== 增量情感指數測試完成 =====")
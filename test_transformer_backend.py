@@ -0,0 +1,133 @@
+import os
+import tempfile
+
+from analysis import registry
+from analysis.registry import configure_jieba, get_analyzer
+from analysis.transformer_backend import TransformerSentimentBackend
+
+_workdir = None
+
+
+def setup_module(module=None):
+    """jieba詞典緩存寫入臨時目錄，不留在專案的data目錄"""
+    global _workdir
+    _workdir = tempfile.TemporaryDirectory()
+    configure_jieba(os.path.join(_workdir.name, "cache"))
+
+
+def teardown_module(module=None):
+    _workdir.cleanup()
+
+
+class FakeBackend:
+    """代替Transformer模型的評分後端，所有中文文本都評為積極"""
+
+    version = "fake-backend"
+
+    def score_batch(self, texts):
+        return [{"pos": 1.0, "neg": 0.0, "neu": 0.0, "compound": 1.0} for _ in texts]
+
+
+def _backend(**attrs):
+    """不載入模型，只建立測試批次和標籤邏輯所需的屬性"""
+    backend = object.__new__(TransformerSentimentBackend)
+    backend.__dict__.update(attrs)
+    return backend
+
+
+def test_batches():
+    """測試動態批次按長度分組，不超過文章數和詞元總數上限"""
+    print("===== 測試動態批次 =====")
+
+    backend = _backend(batch_size=3, max_batch_tokens=100)
+    lengths = [10, 50, 12, 11, 40, 9, 30]
+    batches = list(backend._batches(lengths))
+    print(f"批次: {batches}")
+
+    assert sorted(index for batch in batches for index in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert max(lengths[i] for i in batch) * len(batch) <= 100
+    # 長度相近的文章分在同一批
+    assert batches[0] == [5, 0, 3]
+
+
+def test_label_mapping():
+    """測試模型標籤名稱映射為 pos/neg/neu"""
+    print("===== 測試標籤映射 =====")
+
+    backend = _backend()
+    assert backend._map_labels({0: "negative", 1: "neutral", 2: "positive"}) == \
+        {"pos": [2], "neg": [0], "neu": [1]}
+    assert backend._map_labels({0: "利空", 1: "利多"}) == {"pos": [1], "neg": [0], "neu": []}
+    # 沒有可識別名稱的二分類模型按慣例 0 為消極、1 為積極
+    assert backend._map_labels({0: "LABEL_0", 1: "LABEL_1"}) == {"pos": [1], "neg": [0], "neu": []}
+
+
+def test_fingerprint():
+    """測試模型文件內容改變時版本哈希改變，無關文件不影響"""
+    print("===== 測試模型版本哈希 =====")
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        with open(os.path.join(model_dir, "config.json"), "w") as f:
+            f.write('{"id2label": {"0": "negative", "1": "positive"}}')
+        with open(os.path.join(model_dir, "model.safetensors"), "wb") as f:
+            f.write(b"weights-v1")
+
+        backend = _backend(model_dir=model_dir)
+        first = backend._fingerprint()
+
+        with open(os.path.join(model_dir, "README.md"), "w") as f:
+            f.write("說明文件")
+        assert backend._fingerprint() == first
+
+        with open(os.path.join(model_dir, "model.safetensors"), "wb") as f:
+            f.write(b"weights-v2")
+        assert backend._fingerprint() != first
+
+
+def test_backend_setting():
+    """測試SENTIMENT_MODEL_DIR設置後get_analyzer默認使用Transformer後端"""
+    print("===== 測試後端設置 =====")
+
+    model_dir, backend = registry.SENTIMENT_MODEL_DIR, registry._backend
+    try:
+        registry.SENTIMENT_MODEL_DIR, registry._backend = None, None
+        assert registry.get_backend() is None
+        assert get_analyzer(use_cache=False).backend is None
+
+        # 已載入的後端在進程內共用
+        fake = FakeBackend()
+        registry.SENTIMENT_MODEL_DIR, registry._backend = "models/finance-sentiment", fake
+        analyzer = get_analyzer(use_cache=False)
+        assert analyzer.backend is fake
+        result = analyzer.analyze([{"title": "市場悲觀，出現危機", "summary": ""}], extract_keywords=False)
+        assert result["news_sentiments"][0]["label"] == "積極"
+    finally:
+        registry.SENTIMENT_MODEL_DIR, registry._backend = model_dir, backend
+
+
+def test_missing_model_dir():
+    """測試模型目錄不存在或缺少依賴時在啟動時報錯，而不是默默退回詞典"""
+    print("===== 測試模型目錄檢查 =====")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        try:
+            TransformerSentimentBackend(os.path.join(temp_dir, "missing"))
+        except (ImportError, FileNotFoundError) as e:
+            print(f"預期的錯誤: {e}")
+        else:
+            raise AssertionError("模型目錄不存在時應該報錯")
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_batches()
+        test_label_mapping()
+        test_fingerprint()
+        test_backend_setting()
+        test_missing_model_dir()
+        print("\n===== Transformer後端測試完成 =====")
+    finally:
+        teardown_module()
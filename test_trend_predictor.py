@@ -0,0 +1,109 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from analysis.trend_predictor import TrendPredictor
+
+
+def _reference_score(news_sentiments, now):
+    """逐條計算的參考實現：時間衰減加權平均加上分半動量的一半"""
+    weighted = []
+    for item in news_sentiments:
+        date = item["date"]
+        if isinstance(date, str):
+            try:
+                date = datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                date = now
+        hours = max(0, (now - date).total_seconds() / 3600)
+        compound = item["sentiment"]["compound"]
+        weight = 1.5 if compound > 0 else 1.0
+        weighted.append(compound * weight * 0.9 ** hours)
+
+    momentum = 0
+    if len(news_sentiments) >= 3:
+        ordered = sorted(news_sentiments, key=lambda x: x["date"])
+        mid = len(ordered) // 2
+        early = sum(item["sentiment"]["compound"] for item in ordered[:mid]) / mid
+        recent = sum(item["sentiment"]["compound"] for item in ordered[mid:]) / (len(ordered) - mid)
+        momentum = recent - early
+    return sum(weighted) / len(weighted) + momentum * 0.5, momentum
+
+
+def _results(count, now, rng):
+    news_sentiments = []
+    for i in range(count):
+        published = now - timedelta(minutes=rng.randint(0, 48 * 60), seconds=i)
+        news_sentiments.append({
+            "title": f"新聞{i}",
+            "sentiment": {"compound": rng.uniform(-1, 1)},
+            "label": "中性",
+            "date": published.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    return {"news_sentiments": news_sentiments, "overall_sentiment": "中性", "keywords": ["晶圓", "代工"]}
+
+
+def test_matches_reference():
+    """測試向量化預測與逐條計算的結果一致"""
+    print("===== 測試趨勢預測與參考實現一致 =====")
+
+    now = datetime(2024, 6, 1, 12, 0, 0)
+    rng = random.Random(0)
+    predictor = TrendPredictor()
+    items = {f"T{i}": (None, _results(rng.randint(2, 40), now, rng)) for i in range(50)}
+
+    predictions = predictor.predict_many(items, now=now)
+    for ticker, (_, results) in items.items():
+        score, momentum = _reference_score(results["news_sentiments"], now)
+        assert abs(predictions[ticker]["trend_score"] - score) < 1e-9
+        assert abs(predictions[ticker]["momentum"] - momentum) < 1e-9
+        expected = "看漲" if score > 0.1 else "看跌" if score < -0.1 else "震盪"
+        assert predictions[ticker]["trend"] == expected
+    print(f"{len(items)}個股票的趨勢得分與參考實現一致")
+
+
+def test_dates_and_edge_cases():
+    """測試無法解析的日期、datetime對象和新聞不足的情況"""
+    print("===== 測試日期格式和邊界情況 =====")
+
+    now = datetime(2024, 6, 1, 12, 0, 0)
+    predictor = TrendPredictor()
+    news_sentiments = [
+        {"sentiment": {"compound": 0.8}, "date": now - timedelta(hours=2)},
+        {"sentiment": {"compound": -0.4}, "date": "未知日期"},
+        {"sentiment": {"compound": 0.2}, "date": "2024-05-31"},
+        {"sentiment": {"compound": 0.6}, "date": "2024-06-01 10:00:00"},
+    ]
+    timestamps = predictor._to_timestamps([item["date"] for item in news_sentiments], now)
+    # 無法解析的日期（包括只有日期的字符串）視為當前時間
+    now_ts = int((now - datetime(1970, 1, 1)).total_seconds())
+    assert list(timestamps) == [now_ts - 7200, now_ts, now_ts, now_ts - 7200]
+
+    results = {"news_sentiments": news_sentiments[:1], "overall_sentiment": "積極"}
+    assert predictor.predict_many({"2330": (None, results)}, now=now)["2330"]["trend"] == "不確定"
+
+
+def test_watchlist_speed():
+    """測試整個自選股清單的趨勢計算在毫秒級完成"""
+    print("===== 測試批量趨勢計算速度 =====")
+
+    now = datetime.now()
+    rng = random.Random(1)
+    predictor = TrendPredictor()
+    items = {f"T{i}": (None, _results(30, now, rng)) for i in range(200)}
+
+    predictor.predict_many(items, now=now)
+    start = time.perf_counter()
+    predictions = predictor.predict_many(items, now=now)
+    elapsed = time.perf_counter() - start
+    print(f"200個股票、6000條新聞耗時: {elapsed * 1000:.1f}毫秒")
+
+    assert len(predictions) == 200
+    assert elapsed < 1.0
+
+
+if __name__ == "__main__":
+    test_matches_reference()
+    test_dates_and_edge_cases()
+    test_watchlist_speed()
+    print("\n===== 趨勢預測測試完成 =====")
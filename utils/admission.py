@@ -0,0 +1,158 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from analysis.metrics import metrics
+
+# 優先級：數字越小越先取得名額
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class AdmissionRejected(Exception):
+    """爬取請求因過載被拒絕"""
+
+    def __init__(self, message, status_code, retry_after):
+        """
+        參數:
+            message: 錯誤信息
+            status_code: 429（等待隊列已滿）或 503（排隊超時）
+            retry_after: 建議客戶端等待的秒數
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    即時爬取的准入控制
+
+    同時進行的爬取數不超過max_active（每個爬取最多啟動三個Chrome）；其餘請求進入有界的等待隊列，
+    隊列已滿時立即拒絕（429），排隊超過max_wait秒時放棄（503），兩者都附帶建議的重試時間。
+    後台任務以較低優先級排隊，不受隊列長度限制，名額空出時先分配給前台請求。
+    """
+
+    def __init__(self, max_active=2, max_queue=8, max_wait=10):
+        """
+        初始化准入控制
+
+        參數:
+            max_active: 同時進行的爬取數上限
+            max_queue: 前台請求等待隊列的長度上限
+            max_wait: 前台請求最長的排隊秒數
+        """
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters = []
+        self._queued_interactive = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        # 最近爬取耗時的指數移動平均，用於估計Retry-After
+        self._avg_duration = 30.0
+
+    def _retry_after(self):
+        """按排隊數和平均爬取耗時估計客戶端應等待的秒數（需持有鎖）"""
+        rounds = (len(self._waiters) + 1) / self.max_active
+        return max(1, math.ceil(rounds * self._avg_duration))
+
+    def _publish(self):
+        """更新量表（需持有鎖）"""
+        metrics.set("admission_active", self.active)
+        metrics.set("admission_queued", len(self._waiters))
+
+    def acquire(self, priority=INTERACTIVE, max_wait=None):
+        """
+        取得一個爬取名額，必要時排隊等待
+
+        參數:
+            priority: INTERACTIVE 或 BACKGROUND
+            max_wait: 最長排隊秒數，默認前台為self.max_wait，後台不限
+
+        返回:
+            float: 取得名額的時間，釋放時傳給release
+
+        異常:
+            AdmissionRejected: 隊列已滿或排隊超時
+        """
+        if max_wait is None and priority == INTERACTIVE:
+            max_wait = self.max_wait
+        start = time.monotonic()
+
+        with self._condition:
+            if self.active < self.max_active and not self._waiters:
+                self.active += 1
+                self._publish()
+                return start
+
+            if priority == INTERACTIVE and self._queued_interactive >= self.max_queue:
+                metrics.inc("admission_rejected_total", reason="queue_full")
+                raise AdmissionRejected("爬取請求過多，請稍後再試", 429, self._retry_after())
+
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            if priority == INTERACTIVE:
+                self._queued_interactive += 1
+            self._publish()
+
+            try:
+                while not (self._waiters[0] == entry and self.active < self.max_active):
+                    remaining = None if max_wait is None else max_wait - (time.monotonic() - start)
+                    if remaining is not None and remaining <= 0:
+                        self._waiters.remove(entry)
+                        heapq.heapify(self._waiters)
+                        # 隊首離開後，下一個等待者可能已可取得名額
+                        self._condition.notify_all()
+                        metrics.inc("admission_rejected_total", reason="queue_timeout")
+                        raise AdmissionRejected(f"排隊超過{max_wait:.3g}秒，伺服器繁忙", 503, self._retry_after())
+                    self._condition.wait(remaining)
+
+                heapq.heappop(self._waiters)
+                self.active += 1
+                self._condition.notify_all()
+            finally:
+                if priority == INTERACTIVE:
+                    self._queued_interactive -= 1
+                self._publish()
+
+        metrics.observe("admission_wait_seconds", time.monotonic() - start, priority=priority)
+        return time.monotonic()
+
+    def release(self, acquired_at):
+        """
+        釋放名額
+
+        參數:
+            acquired_at: acquire返回的時間
+        """
+        duration = time.monotonic() - acquired_at
+        with self._condition:
+            self.active -= 1
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            self._publish()
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority=INTERACTIVE, max_wait=None):
+        """以with語句取得和釋放名額"""
+        acquired_at = self.acquire(priority, max_wait)
+        try:
+            yield
+        finally:
+            self.release(acquired_at)
+
+    def stats(self):
+        """當前的名額和隊列狀態"""
+        with self._condition:
+            return {
+                "active": self.active,
+                "max_active": self.max_active,
+                "queued": len(self._waiters),
+                "queued_interactive": self._queued_interactive,
+                "max_queue": self.max_queue
+            }
@@ -0,0 +1,140 @@
+import gzip
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+# 可選依賴：安裝後分別用於更快的JSON序列化和brotli壓縮
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 可以壓縮的響應類型
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/plain", "text/html")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    安裝了orjson時用它序列化響應，否則與Flask默認行為相同
+
+    日期仍按Flask默認格式輸出（HTTP日期），響應內容與標準庫編碼器一致，只是中文不再轉義且沒有排序鍵。
+    """
+
+    def _orjson_dumps(self, obj):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        return orjson.dumps(obj, default=self._orjson_default, option=options)
+
+    @staticmethod
+    def _orjson_default(value):
+        if isinstance(value, date):
+            return http_date(value)
+        return DefaultJSONProvider.default(value)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # 直接使用orjson的bytes輸出，省去一次解碼和編碼
+        return self._app.response_class(self._orjson_dumps(obj), mimetype=self.mimetype)
+
+
+def project_fields(news_list, fields):
+    """
+    只保留每條新聞的指定字段
+
+    參數:
+        news_list: 新聞列表
+        fields: 字段名列表，None或空列表表示不投影
+
+    返回:
+        list: 投影後的新聞列表
+    """
+    if not fields:
+        return news_list
+    return [{field: news[field] for field in fields if field in news} for news in news_list]
+
+
+def parse_fields(value):
+    """把 fields=title,link 解析為字段名列表"""
+    if not value:
+        return None
+    return [field.strip() for field in str(value).split(",") if field.strip()]
+
+
+def choose_encoding(accept_encoding):
+    """
+    根據Accept-Encoding選擇壓縮方式
+
+    返回:
+        str: "br"、"gzip" 或 None
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    for name in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepted.get(name, accepted.get("*", 0)) > 0:
+            return name
+    return None
+
+
+def compress_response(response, accept_encoding, min_size=1024, gzip_level=5, brotli_quality=4):
+    """
+    按客戶端支持的方式壓縮響應體
+
+    流式響應、已壓縮的響應、太小或不適合壓縮的內容保持不變。
+
+    參數:
+        response: Flask響應
+        accept_encoding: 請求的Accept-Encoding頭
+        min_size: 小於此字節數的響應不壓縮
+        gzip_level: gzip壓縮等級
+        brotli_quality: brotli壓縮質量
+
+    返回:
+        Response: 同一個響應對象
+    """
+    response.vary.add("Accept-Encoding")
+    if (response.is_streamed or response.direct_passthrough or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES or response.status_code in (204, 304)):
+        return response
+
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    encoding = choose_encoding(accept_encoding or "")
+    if encoding == "br":
+        body = brotli.compress(body, quality=brotli_quality)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
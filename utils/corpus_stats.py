@@ -0,0 +1,234 @@
+import hashlib
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import jieba
+
+
+class CorpusStats:
+    """語料統計服務，在新聞入庫時增量維護詞頻與文檔頻率，按(關鍵字, 時間窗口)提供關鍵詞查詢"""
+
+    def __init__(self, db_path=os.path.join("data", "corpus_stats.db")):
+        """
+        初始化語料統計
+
+        參數:
+            db_path: SQLite數據庫文件路徑
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    id TEXT NOT NULL, ticker TEXT NOT NULL, day TEXT NOT NULL,
+                    PRIMARY KEY (id, ticker)) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS term_counts (
+                    ticker TEXT NOT NULL, day TEXT NOT NULL, term TEXT NOT NULL,
+                    tf INTEGER NOT NULL, df INTEGER NOT NULL,
+                    PRIMARY KEY (ticker, day, term)) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS doc_counts (
+                    ticker TEXT NOT NULL, day TEXT NOT NULL, n_docs INTEGER NOT NULL,
+                    PRIMARY KEY (ticker, day)) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS term_df (
+                    term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS corpus_meta (
+                    key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+            """)
+            if self._conn.execute("SELECT 1 FROM corpus_meta WHERE key = 'n_docs'").fetchone() is None:
+                # 舊版數據庫沒有維護文檔總數，只在第一次打開時統計一次
+                self._conn.execute("INSERT INTO corpus_meta (key, value) "
+                                   "SELECT 'n_docs', COUNT(DISTINCT id) FROM articles")
+            self._conn.commit()
+
+    @staticmethod
+    def _article_id(news):
+        """以連結（沒有連結時用標題）的雜湊值作為文章ID，避免重複計數"""
+        identity = news.get("link") or news.get("title", "")
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _article_day(news):
+        """取得文章的發布日期 (YYYY-MM-DD)"""
+        date = news.get("date")
+        if isinstance(date, datetime):
+            return date.strftime("%Y-%m-%d")
+        published = news.get("published_time") or date
+        if isinstance(published, str) and re.match(r"\d{4}-\d{2}-\d{2}", published):
+            return published[:10]
+        return datetime.now().strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _terms(text):
+        """分詞並過濾掉單字與停用詞（與jieba.analyse.extract_tags的規則一致）"""
+        import jieba.analyse
+        stop_words = jieba.analyse.default_tfidf.stop_words
+        return [word for word in jieba.lcut(text)
+                if len(word.strip()) >= 2 and word.lower() not in stop_words]
+
+    def _count_terms(self, news):
+        """一篇文章的詞頻：{詞: 次數}"""
+        counts = {}
+        for term in self._terms(news.get("title", "") + " " + (news.get("summary") or "")):
+            counts[term] = counts.get(term, 0) + 1
+        return counts
+
+    def _seen_tickers(self, id_list):
+        """查詢文章ID已歸屬的關鍵字：{文章ID: {關鍵字, ...}}（需持有鎖）"""
+        seen = {}
+        for start in range(0, len(id_list), 500):
+            chunk = id_list[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for article_id, seen_ticker in self._conn.execute(
+                    f"SELECT id, ticker FROM articles WHERE id IN ({placeholders})", chunk):
+                seen.setdefault(article_id, set()).add(seen_ticker)
+        return seen
+
+    def add_articles(self, news_list, ticker):
+        """
+        增量加入新聞，已統計過的文章和示例數據會被跳過，不會重新分詞
+
+        分詞在鎖外進行，不會阻塞同時進行的關鍵詞查詢。DataManager在後台線程中調用此方法。
+
+        參數:
+            news_list: 新聞列表
+            ticker: 新聞所屬的關鍵字或股票代號
+
+        返回:
+            int: 新加入的文章數量
+        """
+        # 爬取失敗時生成的示例數據不計入語料
+        news_list = [news for news in news_list or [] if not news.get("is_sample")]
+        if not news_list:
+            return 0
+
+        ids = {self._article_id(news): news for news in news_list}
+        with self._lock:
+            seen = self._seen_tickers(list(ids))
+        candidates = [(article_id, news) for article_id, news in ids.items()
+                      if ticker not in seen.get(article_id, ())]
+        if not candidates:
+            return 0
+
+        term_counts = {article_id: self._count_terms(news) for article_id, news in candidates}
+
+        with self._lock:
+            # 分詞期間其他線程可能已加入相同的文章，寫入前重新確認
+            seen = self._seen_tickers([article_id for article_id, _ in candidates])
+            new_articles = [(article_id, news) for article_id, news in candidates
+                            if ticker not in seen.get(article_id, ())]
+            if not new_articles:
+                return 0
+
+            term_rows = {}
+            doc_rows = {}
+            df_rows = {}
+            new_docs = 0
+            for article_id, news in new_articles:
+                day = self._article_day(news)
+                doc_rows[day] = doc_rows.get(day, 0) + 1
+                # 同一篇文章屬於多個關鍵字時，全局文檔頻率和文檔總數只計算一次
+                first_seen = article_id not in seen
+                new_docs += first_seen
+
+                for term, count in term_counts[article_id].items():
+                    tf, df = term_rows.get((day, term), (0, 0))
+                    term_rows[(day, term)] = (tf + count, df + 1)
+                    if first_seen:
+                        df_rows[term] = df_rows.get(term, 0) + 1
+
+            self._conn.executemany("INSERT INTO articles (id, ticker, day) VALUES (?, ?, ?)",
+                                   [(article_id, ticker, self._article_day(news)) for article_id, news in new_articles])
+            self._conn.executemany(
+                "INSERT INTO term_counts (ticker, day, term, tf, df) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(ticker, day, term) DO UPDATE SET tf = tf + excluded.tf, df = df + excluded.df",
+                [(ticker, day, term, tf, df) for (day, term), (tf, df) in term_rows.items()])
+            self._conn.executemany(
+                "INSERT INTO doc_counts (ticker, day, n_docs) VALUES (?, ?, ?) "
+                "ON CONFLICT(ticker, day) DO UPDATE SET n_docs = n_docs + excluded.n_docs",
+                [(ticker, day, n_docs) for day, n_docs in doc_rows.items()])
+            self._conn.executemany(
+                "INSERT INTO term_df (term, df) VALUES (?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                list(df_rows.items()))
+            if new_docs:
+                self._conn.execute("UPDATE corpus_meta SET value = value + ? WHERE key = 'n_docs'", (new_docs,))
+            self._conn.commit()
+
+        return len(new_articles)
+
+    def total_docs(self):
+        """語料中不重複的文章總數（入庫時維護的計數，不需要掃描文章表）"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM corpus_meta WHERE key = 'n_docs'").fetchone()
+        return row[0]
+
+    def idf_values(self, terms):
+        """
+        根據語料文檔頻率計算平滑IDF：log((N + 1) / (df + 1)) + 1
+
+        參數:
+            terms: 詞列表
+
+        返回:
+            list: 與terms逐一對應的IDF值
+        """
+        terms = list(terms)
+        n_docs = self.total_docs()
+        df = {}
+        with self._lock:
+            for start in range(0, len(terms), 500):
+                chunk = terms[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                df.update(self._conn.execute(
+                    f"SELECT term, df FROM term_df WHERE term IN ({placeholders})", chunk).fetchall())
+        return [math.log((n_docs + 1) / (df.get(term, 0) + 1)) + 1 for term in terms]
+
+    def top_keywords(self, ticker, start=None, end=None, top_n=10):
+        """
+        查詢指定關鍵字在時間窗口內的TF-IDF關鍵詞，只讀取已存儲的詞頻
+
+        參數:
+            ticker: 關鍵字或股票代號
+            start: 起始日期（datetime或YYYY-MM-DD），默認為30天前
+            end: 結束日期（datetime或YYYY-MM-DD），默認為今天
+            top_n: 返回的關鍵詞數量
+
+        返回:
+            list: [{"keyword": 詞, "weight": 權重}, ...]
+        """
+        if end is None:
+            end = datetime.now()
+        if start is None:
+            start = (end if isinstance(end, datetime) else datetime.strptime(end, "%Y-%m-%d")) - timedelta(days=30)
+        if isinstance(start, datetime):
+            start = start.strftime("%Y-%m-%d")
+        if isinstance(end, datetime):
+            end = end.strftime("%Y-%m-%d")
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT term, SUM(tf) FROM term_counts WHERE ticker = ? AND day BETWEEN ? AND ? GROUP BY term",
+                (ticker, start, end)).fetchall()
+        if not rows:
+            return []
+
+        total_tf = sum(tf for _, tf in rows)
+        idf = self.idf_values(term for term, _ in rows)
+        scored = ((tf / total_tf * term_idf, term) for (term, tf), term_idf in zip(rows, idf))
+        return [{"keyword": term, "weight": weight} for weight, term in heapq.nlargest(top_n, scored)]
+
+    def close(self):
+        """關閉數據庫連接"""
+        with self._lock:
+            self._conn.close()
@@ -6,10 +6,19 @@ import webbrowser
 import sys
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib
 
+from analysis.metrics import metrics
+from analysis.registry import get_entity_linker
+from analysis.text_normalizer import strip_cache_fields
+
+from .corpus_stats import CorpusStats
+from .news_store import NewsStore
+from .sentiment_rollup import SentimentRollupStore
+
 # 確保中文字體顯示正常
 # 添加更多字體選項，按優先順序排列
 matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft JhengHei', 'DFKai-SB', 'PMingLiU', 'Arial Unicode MS', 'Heiti TC', 'LiHei Pro', 'Hiragino Sans GB', 'STHeiti']
@@ -29,6 +38,32 @@ try:
 except:
     pass
 
+def load_news_file(json_path):
+    """
+    從save_news保存的JSON文件讀取新聞（只讀，不需要建立DataManager的目錄和數據庫）
+    
+    參數:
+        json_path: 新聞JSON文件路徑
+        
+    返回:
+        list: 新聞列表，date字段轉換為datetime對象；文件不存在時返回空列表
+    """
+    if not os.path.exists(json_path):
+        return []
+    
+    with open(json_path, "r", encoding="utf-8") as f:
+        news_list = json.load(f)
+    
+    # 轉換日期字符串為datetime對象
+    for news in news_list:
+        if isinstance(news.get("date"), str):
+            try:
+                news["date"] = datetime.strptime(news["date"], "%Y-%m-%d %H:%M:%S")
+            except:
+                pass
+    
+    return news_list
+
 class DataManager:
     """數據管理器，負責數據的存儲和加載"""
     
@@ -41,6 +76,17 @@ class DataManager:
         """
         self.data_dir = data_dir
         self._ensure_dirs()
+        
+        # 語料統計隨新聞入庫增量更新，關鍵詞查詢不需要重新分詞歷史新聞；
+        # 更新需要分詞，由後台的單一線程依次進行，不佔用保存新聞的調用方（例如API請求）的時間
+        self.corpus_stats = CorpusStats(os.path.join(data_dir, "corpus_stats.db"))
+        self._corpus_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="corpus-ingest")
+        
+        # 每日/每小時情感匯總，長週期趨勢查詢不需要重新分析歷史新聞
+        self.rollups = SentimentRollupStore(os.path.join(data_dir, "sentiment_rollups.db"))
+        
+        # 按(關鍵字, 來源)保存的新聞和爬取時間，API可以直接讀取而不必重新爬取
+        self.news_store = NewsStore(os.path.join(data_dir, "news_store.db"))
     
     def _ensure_dirs(self):
         """確保目錄存在"""
@@ -59,6 +105,7 @@ class DataManager:
         if not os.path.exists(chart_dir):
             os.makedirs(chart_dir)
     
+    @metrics.timed("storage_operation_seconds", operation="save_news")
     def save_news(self, news_list, keyword):
         """
         保存新聞列表為JSON和CSV格式
@@ -83,7 +130,8 @@ class DataManager:
             # 轉換datetime對象為字符串
             serializable_news = []
             for news in news_list:
-                news_copy = news.copy()
+                # 分析階段緩存在新聞上的標準化文本不需要保存
+                news_copy = strip_cache_fields(news)
                 if isinstance(news_copy.get("date"), datetime):
                     news_copy["date"] = news_copy["date"].strftime("%Y-%m-%d %H:%M:%S")
                 serializable_news.append(news_copy)
@@ -99,20 +147,123 @@ class DataManager:
             # 獲取所有字段
             fields = set()
             for news in news_list:
-                fields.update(news.keys())
+                fields.update(strip_cache_fields(news).keys())
             
             writer = csv.DictWriter(f, fieldnames=sorted(fields))
             writer.writeheader()
             
             # 寫入數據（確保datetime被轉換為字符串）
             for news in news_list:
-                news_copy = news.copy()
+                news_copy = strip_cache_fields(news)
                 if isinstance(news_copy.get("date"), datetime):
                     news_copy["date"] = news_copy["date"].strftime("%Y-%m-%d %H:%M:%S")
                 writer.writerow(news_copy)
         
+        # 在後台增量更新語料統計；使用副本，之後分析階段對新聞的改動不影響統計。
+        # 與情感匯總相同，股票簡稱和代號計入同一份統計
+        self._corpus_executor.submit(self._ingest_corpus, [dict(news) for news in news_list],
+                                     get_entity_linker().ticker_key(keyword))
+        
         return json_path, csv_path
     
+    @metrics.timed("storage_operation_seconds", operation="corpus_ingest")
+    def _ingest_corpus(self, news_list, keyword):
+        """後台線程：把新聞加入語料統計"""
+        try:
+            return self.corpus_stats.add_articles(news_list, keyword)
+        except Exception as e:
+            print(f"更新語料統計時發生錯誤: {str(e)}")
+            return 0
+    
+    def wait_for_corpus_stats(self, timeout=None):
+        """
+        等待已提交的語料統計更新完成（例如回補歷史後立即查詢關鍵詞）
+        
+        參數:
+            timeout: 最長等待秒數，None表示一直等待
+        """
+        # 單一線程按提交順序執行，空任務完成時之前的更新都已完成
+        self._corpus_executor.submit(lambda: None).result(timeout)
+    
+    @metrics.timed("storage_operation_seconds", operation="store_news")
+    def store_news(self, keyword, news_by_source):
+        """
+        按來源保存爬取結果並記錄爬取時間，供之後直接讀取
+        
+        參數:
+            keyword: 關鍵字或股票代號
+            news_by_source: {來源名稱: 新聞列表}
+            
+        返回:
+            int: 入庫的文章數
+        """
+        return sum(self.news_store.add(keyword, source, news_list)
+                   for source, news_list in news_by_source.items())
+    
+    @metrics.timed("storage_operation_seconds", operation="get_stored_news")
+    def get_stored_news(self, keyword, sources, hours=24, limit=10):
+        """
+        讀取已保存的新聞
+        
+        參數:
+            keyword: 關鍵字或股票代號
+            sources: 來源名稱列表
+            hours: 只返回多少小時內發布的新聞
+            limit: 每個來源最多返回的條數
+            
+        返回:
+            tuple: ({來源: 新聞列表}, {來源: 最近爬取時間戳或None})
+        """
+        return (self.news_store.query(keyword, sources, hours=hours, limit=limit),
+                self.news_store.crawl_times(keyword, sources))
+    
+    @metrics.timed("storage_operation_seconds", operation="save_sentiment")
+    def save_sentiment(self, keyword, news_list, sentiment_results):
+        """
+        把情感分析結果增量寫入每日和每小時匯總
+        
+        參數:
+            keyword: 關鍵字或股票代號
+            news_list: 新聞列表
+            sentiment_results: 情感分析結果，news_sentiments與news_list逐一對應
+            
+        返回:
+            int: 新加入匯總的文章數
+        """
+        # 股票簡稱和代號寫入同一份匯總
+        return self.rollups.add(get_entity_linker().ticker_key(keyword), news_list, sentiment_results)
+    
+    def get_sentiment_history(self, keyword, start=None, end=None, granularity="day", source=None):
+        """
+        從匯總查詢關鍵字在時間範圍內的情感走勢
+        
+        參數:
+            keyword: 關鍵字或股票代號
+            start: 起始時間，默認為30天前
+            end: 結束時間，默認為現在
+            granularity: "day" 或 "hour"
+            source: 可選，只查詢指定來源
+            
+        返回:
+            list: 按時間排序的每個時間桶的情感匯總
+        """
+        return self.rollups.query(get_entity_linker().ticker_key(keyword), start=start, end=end,
+                                  granularity=granularity, source=source)
+    
+    def get_sentiment_summary(self, keyword, start=None, end=None, granularity="day", source=None):
+        """
+        從匯總查詢關鍵字在整個時間範圍內的整體情感，不需要重新分析歷史新聞
+        
+        參數:
+            keyword、start、end、granularity、source: 與get_sentiment_history相同
+            
+        返回:
+            dict: 整體情感、信心指數、平均複合得分、各標籤數量和關鍵詞
+        """
+        return self.rollups.summary(get_entity_linker().ticker_key(keyword), start=start, end=end,
+                                    granularity=granularity, source=source)
+    
+    @metrics.timed("storage_operation_seconds", operation="save_report")
     def save_report(self, keyword, news_list, sentiment_results, trend_prediction):
         """
         保存分析報告
@@ -134,8 +285,12 @@ class DataManager:
         # 創建情感分布圖表
         chart_path = self._create_sentiment_chart(keyword, sentiment_results)
         
+        # 從匯總創建近30天情感走勢圖表
+        history_chart_path = self._create_history_chart(keyword, self.get_sentiment_history(keyword))
+        
         # 生成HTML報告
-        html_content = self._generate_html_report(keyword, news_list, sentiment_results, trend_prediction, chart_path)
+        html_content = self._generate_html_report(keyword, news_list, sentiment_results, trend_prediction, chart_path,
+                                                  history_chart_path)
         
         # 保存報告
         with open(report_path, "w", encoding="utf-8") as f:
@@ -196,7 +351,53 @@ class DataManager:
         
         return chart_path
     
-    def _generate_html_report(self, keyword, news_list, sentiment_results, trend_prediction, chart_path=None):
+    def _create_history_chart(self, keyword, history):
+        """根據每日情感匯總創建情感走勢圖表"""
+        # 少於兩天的數據無法顯示走勢
+        if len(history) < 2:
+            return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        chart_filename = f"{timestamp}_{keyword}_history.png"
+        chart_path = os.path.join(self.data_dir, "charts", chart_filename)
+        
+        buckets = [item["bucket"] for item in history]
+        avg_compounds = [item["avg_compound"] for item in history]
+        counts = [item["count"] for item in history]
+        
+        fig, ax1 = plt.subplots(figsize=(12, 6))
+        
+        # 新聞數量柱狀圖
+        ax2 = ax1.twinx()
+        ax2.bar(buckets, counts, color='#dddddd', label='新聞數量')
+        ax2.set_ylabel('新聞數量', fontsize=12)
+        
+        # 平均情感得分折線圖（紅色-積極，綠色-消極）
+        ax1.set_zorder(ax2.get_zorder() + 1)
+        ax1.patch.set_visible(False)
+        ax1.plot(buckets, avg_compounds, color='#333333', marker='o', label='平均情感得分')
+        ax1.axhline(0, color='#999999', linewidth=0.8)
+        ax1.fill_between(range(len(buckets)), avg_compounds, 0, where=[v >= 0 for v in avg_compounds],
+                         color='#cc0000', alpha=0.2, interpolate=True)
+        ax1.fill_between(range(len(buckets)), avg_compounds, 0, where=[v < 0 for v in avg_compounds],
+                         color='#009900', alpha=0.2, interpolate=True)
+        ax1.set_ylabel('平均情感得分', fontsize=12)
+        ax1.set_ylim(-1, 1)
+        
+        # 日期過多時只顯示部分標籤
+        step = max(1, len(buckets) // 10)
+        ax1.set_xticks(range(0, len(buckets), step))
+        ax1.set_xticklabels(buckets[::step], rotation=45, ha='right')
+        
+        plt.title(f'"{keyword}" 近期情感走勢', fontsize=16, pad=20)
+        fig.tight_layout()
+        plt.savefig(chart_path, bbox_inches='tight')
+        plt.close(fig)
+        
+        return chart_path
+    
+    def _generate_html_report(self, keyword, news_list, sentiment_results, trend_prediction, chart_path=None,
+                              history_chart_path=None):
         """生成HTML報告"""
         # 報告標題
         title = f"{keyword} 股票趨勢分析報告"
@@ -277,6 +478,20 @@ class DataManager:
                 </div>
             """
         
+        # 添加情感走勢圖表（如果有）
+        if history_chart_path:
+            html += f"""
+                <div class="chart-container">
+                    <h2>情感走勢圖</h2>
+                    <img src="../charts/{os.path.basename(history_chart_path)}" alt="情感走勢圖" style="max-width: 100%; display: block; margin: 0 auto;">
+                    <p class="chart-explanation">
+                        此圖顯示近30天每日新聞的平均情感得分與新聞數量，
+                        <span class="positive">紅色區域表示積極</span>、
+                        <span class="negative">綠色區域表示消極</span>。
+                    </p>
+                </div>
+            """
+        
         # 添加新聞列表
         html += """
                 <h2>新聞列表</h2>
@@ -329,23 +544,25 @@ class DataManager:
         
         return html
     
+    def get_keywords(self, keyword, start=None, end=None, top_n=10):
+        """
+        從語料統計查詢關鍵字在時間窗口內的熱門關鍵詞
+        
+        參數:
+            keyword: 關鍵字或股票代號
+            start: 起始日期，默認為30天前
+            end: 結束日期，默認為今天
+            top_n: 返回的關鍵詞數量
+            
+        返回:
+            list: [{"keyword": 詞, "weight": 權重}, ...]
+        """
+        return self.corpus_stats.top_keywords(get_entity_linker().ticker_key(keyword),
+                                              start=start, end=end, top_n=top_n)
+    
     def load_news(self, json_path):
         """從JSON文件加載新聞數據"""
-        if not os.path.exists(json_path):
-            return []
-        
-        with open(json_path, "r", encoding="utf-8") as f:
-            news_list = json.load(f)
-        
-        # 轉換日期字符串為datetime對象
-        for news in news_list:
-            if isinstance(news.get("date"), str):
-                try:
-                    news["date"] = datetime.strptime(news["date"], "%Y-%m-%d %H:%M:%S")
-                except:
-                    pass
-        
-        return news_list
+        return load_news_file(json_path)
     
     def open_report(self, report_file):
         """
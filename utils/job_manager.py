@@ -0,0 +1,141 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFullError(Exception):
+    """等待中的任務數已達上限"""
+
+
+class CrawlJob:
+    """一個後台爬取任務"""
+
+    def __init__(self, key, params):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    @property
+    def done(self):
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self):
+        """任務狀態（不含結果）"""
+        def format_time(value):
+            return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value)) if value else None
+
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "created_at": format_time(self.created_at),
+            "started_at": format_time(self.started_at),
+            "finished_at": format_time(self.finished_at),
+            "error": self.error
+        }
+
+
+class CrawlJobManager:
+    """
+    後台爬取任務管理器
+
+    任務在有界的線程池中執行；參數相同的任務正在排隊或執行時直接返回該任務，不重複爬取；
+    完成的任務結果保留result_ttl秒後清除。
+    """
+
+    def __init__(self, run_job, max_workers=2, max_pending=50, result_ttl=600):
+        """
+        初始化任務管理器
+
+        參數:
+            run_job: 執行任務的函數，接收任務參數字典，返回結果
+            max_workers: 同時執行的任務數（每個爬取任務最多會啟動三個Chrome）
+            max_pending: 排隊和執行中的任務數上限
+            result_ttl: 完成的任務保留秒數
+        """
+        self.run_job = run_job
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl-job")
+
+    @staticmethod
+    def make_key(params):
+        """以排序後的參數作為去重鍵"""
+        return tuple(sorted(params.items()))
+
+    def _prune(self, now):
+        """清除過期的已完成任務"""
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.done and now - job.finished_at > self.result_ttl]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def submit(self, params):
+        """
+        提交任務
+
+        參數:
+            params: 任務參數字典（keyword、source、limit、hours）
+
+        返回:
+            tuple: (任務, 是否新建)，相同參數的任務正在進行時返回該任務和False
+        """
+        key = self.make_key(params)
+        with self._lock:
+            self._prune(time.time())
+            job = self._active.get(key)
+            if job is not None:
+                return job, False
+            if len(self._active) >= self.max_pending:
+                raise JobQueueFullError(f"等待中的任務已達上限({self.max_pending})")
+
+            job = CrawlJob(key, params)
+            self.jobs[job.id] = job
+            self._active[key] = job
+
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def _run(self, job):
+        """在工作線程中執行任務"""
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = self.run_job(job.params)
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    def get(self, job_id):
+        """查詢任務，不存在或已過期時返回None"""
+        with self._lock:
+            self._prune(time.time())
+            return self.jobs.get(job_id)
+
+    def stats(self):
+        """任務數量統計"""
+        with self._lock:
+            counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+            for job in self.jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self, wait=False):
+        """停止接受新任務"""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,238 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from analysis.metrics import metrics
+from analysis.registry import get_entity_linker
+from crawlers.browser import Deadline, deadline_scope
+from crawlers.cnyes_crawler import CnyesCrawler
+from crawlers.moneydj_crawler import MoneyDJCrawler
+from crawlers.yahoo_crawler import YahooFinanceCrawler
+
+# 支持的新聞來源，按爬取順序排列
+SOURCES = ("yahoo", "cnyes", "moneydj")
+
+
+class NewsService:
+    """新聞抓取服務，統一多個來源的爬取和保存，供API的同步請求和後台任務共用"""
+
+    def __init__(self, crawlers=None, data_manager=None, cancel_grace=0.5):
+        """
+        初始化新聞服務
+
+        參數:
+            crawlers: 可選，{來源名稱: 爬蟲}，默認為三個內建爬蟲
+            data_manager: 可選，DataManager實例，提供時爬取結果會被保存
+            cancel_grace: 時限到達並取消後，等待爬蟲交回已取得新聞的秒數
+        """
+        self.crawlers = crawlers or {
+            "yahoo": YahooFinanceCrawler(),
+            "cnyes": CnyesCrawler(),
+            "moneydj": MoneyDJCrawler()
+        }
+        self.data_manager = data_manager
+        self.cancel_grace = cancel_grace
+
+    def resolve_sources(self, source):
+        """
+        把source參數解析為來源列表
+
+        參數:
+            source: 來源名稱或 "all"
+
+        返回:
+            list: 來源名稱列表
+        """
+        source = (source or "all").lower()
+        if source == "all":
+            return [name for name in SOURCES if name in self.crawlers]
+        if source not in self.crawlers:
+            raise ValueError(f"不支持的新聞來源: {source}")
+        return [source]
+
+    def crawl_source(self, name, keyword, limit=10, hours=24):
+        """
+        從單一來源爬取新聞
+
+        返回:
+            list: 新聞列表，每條新聞都有is_sample字段，以及提到的股票代號tickers字段
+        """
+        try:
+            with metrics.timer("crawler_stage_seconds", source=name, stage="total"):
+                news_list = self.crawlers[name].crawl(keyword, limit=limit, hours=hours)
+        except Exception:
+            metrics.inc("crawler_errors_total", source=name)
+            raise
+        
+        samples = 0
+        for news in news_list:
+            # 確保每條新聞都有is_sample字段，如果原本沒有則設為False
+            if "is_sample" not in news:
+                news["is_sample"] = False
+            samples += bool(news["is_sample"])
+        metrics.inc("crawler_articles_total", len(news_list), source=name)
+        if samples:
+            metrics.inc("crawler_sample_fallbacks_total", samples, source=name)
+        
+        # 在保存和返回之前標記每條新聞提到的股票，所有爬取路徑的新聞都以相同方式關聯股票
+        return get_entity_linker().tag(news_list)
+
+    def crawl(self, keyword, source="all", limit=10, hours=24, save=True, deadline=None):
+        """
+        同時從各來源爬取新聞並保存
+
+        參數:
+            keyword: 關鍵字或股票代號
+            source: 新聞來源 (yahoo, cnyes, moneydj, all)
+            limit: 每個來源最多返回的新聞條數
+            hours: 搜索多少小時內的新聞
+            save: 是否通過DataManager保存
+            deadline: 可選，時限秒數，超過時返回已取得的新聞
+
+        返回:
+            dict: news（新聞列表）、sources（各來源的新聞數）、elapsed（秒）、
+                  partial（是否因時限只取得部分結果）和source_status（各來源的狀態）
+        """
+        for event, _, payload in self.iter_crawl(keyword, source, limit, hours, save, deadline):
+            if event == "summary":
+                return payload
+
+    def iter_crawl(self, keyword, source="all", limit=10, hours=24, save=True, deadline=None):
+        """
+        同時從各來源爬取，每個來源完成時立即產生它的新聞
+
+        有時限時，各來源的頁面載入和等待不會超過剩餘時間；時限到達時仍未完成的來源被取消
+        （關閉其瀏覽器），狀態記為timeout，已取得的新聞照常返回和保存。
+        調用方中途關閉生成器（例如客戶端斷開）時同樣取消時限，不再等待仍在爬取的來源。
+
+        參數:
+            與crawl相同
+
+        返回:
+            generator: 依次產生事件 (類型, 來源, 內容)：
+                ("article", 來源, 新聞)
+                ("source_done", 來源, {"status", "count", "elapsed", "error"})，status為success、error或timeout
+                ("summary", None, 與crawl相同的結果字典)
+        """
+        start_time = time.time()
+        names = self.resolve_sources(source)
+        budget = Deadline(deadline) if deadline else None
+
+        def run(name):
+            source_start = time.time()
+            with deadline_scope(budget):
+                try:
+                    news_list, error = self.crawl_source(name, keyword, limit, hours), None
+                except Exception as e:
+                    news_list, error = [], str(e)
+            if budget is not None and budget.expired:
+                # 爬蟲因時限提前結束，返回的可能只是部分新聞；被取消的爬蟲可能改用示例數據，
+                # 這些不是真實新聞，不返回也不保存
+                status = "timeout"
+                error = error or f"超過{deadline:.3g}秒時限"
+                news_list = [news for news in news_list if not news.get("is_sample")]
+            else:
+                status = "error" if error else "success"
+            return news_list, status, error, time.time() - source_start
+
+        sources = {}
+        source_status = {}
+        news_by_source = {}
+
+        def finish(future):
+            name = futures[future]
+            news_list, status, error, elapsed = future.result()
+            sources[name] = len(news_list)
+            news_by_source[name] = news_list
+            source_status[name] = {"status": status, "count": len(news_list), "elapsed": elapsed, "error": error}
+            return name, news_list
+
+        executor = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="crawl-source")
+        try:
+            futures = {executor.submit(run, name): name for name in names}
+            try:
+                for future in as_completed(futures, timeout=budget.remaining() if budget else None):
+                    name, news_list = finish(future)
+                    for news in news_list:
+                        yield "article", name, news
+                    yield "source_done", name, source_status[name]
+            except FuturesTimeoutError:
+                # 時限已到：關閉仍在運行的瀏覽器，並短暫等待爬蟲交回已取得的新聞
+                budget.cancel()
+                pending = [future for future in futures if futures[future] not in source_status]
+                try:
+                    for future in as_completed(pending, timeout=self.cancel_grace):
+                        name, news_list = finish(future)
+                        for news in news_list:
+                            yield "article", name, news
+                        yield "source_done", name, source_status[name]
+                except FuturesTimeoutError:
+                    pass
+
+                for name in names:
+                    if name not in source_status:
+                        metrics.inc("crawler_deadline_cancellations_total", source=name)
+                        sources[name] = 0
+                        source_status[name] = {"status": "timeout", "count": 0,
+                                               "elapsed": time.time() - start_time,
+                                               "error": f"超過{deadline:.3g}秒時限，已取消"}
+                        yield "source_done", name, source_status[name]
+        except GeneratorExit:
+            # 客戶端中途斷開：取消時限，關閉仍在運行的瀏覽器
+            if budget is not None:
+                budget.cancel()
+            raise
+        finally:
+            # 客戶端中途斷開或時限已到時不等待剩餘的來源
+            executor.shutdown(wait=False)
+
+        # 按來源的固定順序排列
+        all_news = [news for name in names if name in news_by_source for news in news_by_source[name]]
+        if save and self.data_manager is not None:
+            self.data_manager.save_news(all_news, keyword)
+            # 超時的來源不記錄爬取時間，之後的存儲讀取會重新爬取它
+            self.data_manager.store_news(keyword, {name: news_list for name, news_list in news_by_source.items()
+                                                   if source_status[name]["status"] != "timeout"})
+
+        yield "summary", None, {
+            "news": all_news,
+            "sources": {name: sources[name] for name in names},
+            "elapsed": time.time() - start_time,
+            "partial": any(status["status"] == "timeout" for status in source_status.values()),
+            "source_status": {name: source_status[name] for name in names}
+        }
+
+    def read(self, keyword, source="all", limit=10, hours=24):
+        """
+        從存儲讀取新聞，不進行爬取
+
+        參數:
+            keyword: 關鍵字或股票代號
+            source: 新聞來源 (yahoo, cnyes, moneydj, all)
+            limit: 每個來源最多返回的新聞條數
+            hours: 只返回多少小時內發布的新聞
+
+        返回:
+            dict: 與crawl相同的字段，另有crawled_at（各來源最近爬取時間）和
+                  age（最舊來源的數據年齡秒數，有來源從未爬取過時為None）
+        """
+        if self.data_manager is None:
+            raise ValueError("沒有配置DataManager，無法從存儲讀取")
+
+        start_time = time.time()
+        names = self.resolve_sources(source)
+        news_by_source, crawled_at = self.data_manager.get_stored_news(keyword, names, hours=hours, limit=limit)
+
+        all_news = []
+        for name in names:
+            all_news.extend(news_by_source[name])
+
+        times = list(crawled_at.values())
+        age = None if None in times else max(start_time - value for value in times)
+        return {
+            "news": all_news,
+            "sources": {name: len(news_by_source[name]) for name in names},
+            "elapsed": time.time() - start_time,
+            "crawled_at": crawled_at,
+            "age": age
+        }
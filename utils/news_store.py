@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from analysis.text_normalizer import strip_cache_fields
+
+
+class NewsStore:
+    """按(關鍵字, 來源)持久化爬取到的新聞和最近爬取時間，供API直接從存儲讀取"""
+
+    def __init__(self, db_path=os.path.join("data", "news_store.db")):
+        """
+        初始化新聞存儲
+
+        參數:
+            db_path: SQLite數據庫文件路徑
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS stored_news (
+                    keyword TEXT NOT NULL, source TEXT NOT NULL, id TEXT NOT NULL,
+                    published TEXT NOT NULL, data TEXT NOT NULL,
+                    PRIMARY KEY (keyword, source, id)) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS stored_news_published ON stored_news (keyword, source, published);
+                CREATE TABLE IF NOT EXISTS crawl_log (
+                    keyword TEXT NOT NULL, source TEXT NOT NULL, crawled_at REAL NOT NULL, count INTEGER NOT NULL,
+                    PRIMARY KEY (keyword, source)) WITHOUT ROWID;
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def normalize_keyword(keyword):
+        """標準化關鍵字：去除多餘空白並忽略大小寫"""
+        return " ".join(str(keyword).split()).casefold()
+
+    @staticmethod
+    def _article_id(news):
+        """以連結（沒有連結時用標題）的雜湊值作為文章ID"""
+        identity = news.get("link") or news.get("title", "")
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _published(news, default):
+        """文章發布時間字符串 (YYYY-MM-DD HH:MM:SS)，無法解析時使用default"""
+        date = news.get("date")
+        if isinstance(date, datetime):
+            return date.strftime("%Y-%m-%d %H:%M:%S")
+        for value in (news.get("published_time"), date):
+            if isinstance(value, str):
+                try:
+                    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    continue
+        return default
+
+    def add(self, keyword, source, news_list, crawled_at=None):
+        """
+        保存一次爬取的結果並記錄爬取時間
+
+        示例數據（is_sample為True）不會入庫，但仍記錄爬取時間，避免來源故障時每次讀取都觸發爬取。
+
+        參數:
+            keyword: 關鍵字或股票代號
+            source: 爬蟲來源名稱 (yahoo, cnyes, moneydj)
+            news_list: 該來源爬取到的新聞列表
+            crawled_at: 爬取時間戳，默認為現在
+
+        返回:
+            int: 入庫的文章數
+        """
+        keyword = self.normalize_keyword(keyword)
+        crawled_at = crawled_at or time.time()
+        default_time = datetime.fromtimestamp(crawled_at).strftime("%Y-%m-%d %H:%M:%S")
+
+        rows = []
+        for news in news_list:
+            if news.get("is_sample"):
+                continue
+            news_copy = strip_cache_fields(news)
+            published = self._published(news_copy, default_time)
+            news_copy["date"] = published
+            rows.append((keyword, source, self._article_id(news_copy), published,
+                         json.dumps(news_copy, ensure_ascii=False, default=str)))
+
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO stored_news VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO crawl_log VALUES (?, ?, ?, ?)",
+                               (keyword, source, crawled_at, len(rows)))
+            self._conn.commit()
+        return len(rows)
+
+    def crawl_times(self, keyword, sources):
+        """
+        查詢各來源最近一次爬取的時間
+
+        參數:
+            keyword: 關鍵字或股票代號
+            sources: 來源名稱列表
+
+        返回:
+            dict: {來源: 時間戳}，從未爬取過的來源為None
+        """
+        keyword = self.normalize_keyword(keyword)
+        times = dict.fromkeys(sources)
+        with self._lock:
+            for source, crawled_at in self._conn.execute(
+                    f"SELECT source, crawled_at FROM crawl_log WHERE keyword = ? AND source IN ({','.join('?' * len(sources))})",
+                    [keyword, *sources]):
+                times[source] = crawled_at
+        return times
+
+    def query(self, keyword, sources, hours=24, limit=10):
+        """
+        讀取已保存的新聞
+
+        參數:
+            keyword: 關鍵字或股票代號
+            sources: 來源名稱列表
+            hours: 只返回多少小時內發布的新聞
+            limit: 每個來源最多返回的條數
+
+        返回:
+            dict: {來源: 按發布時間從新到舊排列的新聞列表}，date字段為datetime
+        """
+        keyword = self.normalize_keyword(keyword)
+        since = (datetime.now() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+        results = {}
+        with self._lock:
+            for source in sources:
+                rows = self._conn.execute(
+                    "SELECT data FROM stored_news WHERE keyword = ? AND source = ? AND published >= ? "
+                    "ORDER BY published DESC LIMIT ?", (keyword, source, since, limit)).fetchall()
+                results[source] = [json.loads(data) for (data,) in rows]
+
+        for news_list in results.values():
+            for news in news_list:
+                news["date"] = datetime.strptime(news["date"], "%Y-%m-%d %H:%M:%S")
+        return results
+
+    def close(self):
+        """關閉數據庫連接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+from analysis.metrics import metrics
+
+
+class _InFlight:
+    """正在計算中的鍵，等待者共用同一次計算的結果"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    帶請求合併的響應緩存
+
+    - 新鮮期（ttl）內直接返回緩存
+    - 過期但在stale_ttl內時先返回舊值，並在後台刷新（stale-while-revalidate）
+    - 同一個鍵同時未命中時只計算一次，其餘請求等待並共用結果
+    """
+
+    def __init__(self, ttl=60, stale_ttl=300, max_entries=256, name="response", cacheable=None):
+        """
+        初始化響應緩存
+
+        參數:
+            name: 緩存名稱，用作指標的cache標籤
+            cacheable: 可選，判斷計算結果是否寫入緩存的函數（例如不緩存部分結果），等待者仍會收到該結果
+            ttl: 新鮮期秒數
+            stale_ttl: 過期後仍可返回舊值並後台刷新的秒數
+            max_entries: 最多緩存的鍵數，超過時淘汰最久未使用的
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.name = name
+        self.cacheable = cacheable
+        self.stats = {"hit": 0, "stale": 0, "miss": 0, "coalesced": 0}
+
+    def _store(self, key, value):
+        """保存計算結果（需持有鎖）"""
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _count(self, state):
+        """記錄一次查詢結果"""
+        self.stats[state] += 1
+        metrics.inc("cache_requests_total", cache=self.name, result=state)
+
+    def _compute(self, key, compute, in_flight):
+        """執行計算並通知等待者"""
+        try:
+            in_flight.value = compute()
+        except Exception as e:
+            in_flight.error = e
+        with self._lock:
+            if in_flight.error is None and (self.cacheable is None or self.cacheable(in_flight.value)):
+                self._store(key, in_flight.value)
+            del self._in_flight[key]
+        in_flight.event.set()
+
+    def get_or_compute(self, key, compute, refresh=False):
+        """
+        取得緩存值，必要時計算
+
+        參數:
+            key: 可哈希的緩存鍵（例如標準化後的查詢參數）
+            compute: 無參數的計算函數
+            refresh: 是否忽略緩存強制重新計算（仍與同時進行的計算合併）
+
+        返回:
+            tuple: (值, 狀態, 緩存時間戳)，狀態為 hit、stale、miss 或 coalesced
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry is not None and not refresh:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._count("hit")
+                    return value, "hit", stored_at
+                if age < self.ttl + self.stale_ttl:
+                    self._count("stale")
+                    # 同一個鍵只啟動一次後台刷新
+                    if key not in self._in_flight:
+                        in_flight = self._in_flight[key] = _InFlight()
+                        threading.Thread(target=self._compute, args=(key, compute, in_flight), daemon=True).start()
+                    return value, "stale", stored_at
+
+            in_flight = self._in_flight.get(key)
+            owner = in_flight is None
+            if owner:
+                in_flight = self._in_flight[key] = _InFlight()
+                self._count("miss")
+            else:
+                self._count("coalesced")
+
+        if owner:
+            self._compute(key, compute, in_flight)
+        else:
+            in_flight.event.wait()
+
+        if in_flight.error is not None:
+            raise in_flight.error
+        return in_flight.value, "miss" if owner else "coalesced", time.time()
+
+    def put(self, key, value):
+        """直接寫入緩存（例如流式響應結束後保存完整結果）"""
+        with self._lock:
+            self._store(key, value)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def invalidate(self, key=None):
+        """刪除指定鍵的緩存，不指定時清空全部"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -0,0 +1,255 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+
+class SentimentRollupStore:
+    """按股票和來源維護每日/每小時的情感匯總，入庫時增量更新，支持時間範圍查詢"""
+
+    # 匯總粒度及對應的時間桶格式
+    GRANULARITIES = {"day": "%Y-%m-%d", "hour": "%Y-%m-%d %H:00"}
+
+    def __init__(self, db_path=os.path.join("data", "sentiment_rollups.db")):
+        """
+        初始化匯總存儲
+
+        參數:
+            db_path: SQLite數據庫文件路徑
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rollup_articles (
+                    id TEXT NOT NULL, ticker TEXT NOT NULL,
+                    PRIMARY KEY (id, ticker)) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS rollups (
+                    granularity TEXT NOT NULL, ticker TEXT NOT NULL, source TEXT NOT NULL, bucket TEXT NOT NULL,
+                    n_positive INTEGER NOT NULL, n_negative INTEGER NOT NULL, n_neutral INTEGER NOT NULL,
+                    sum_compound REAL NOT NULL,
+                    PRIMARY KEY (granularity, ticker, bucket, source)) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS rollup_keywords (
+                    granularity TEXT NOT NULL, ticker TEXT NOT NULL, source TEXT NOT NULL, bucket TEXT NOT NULL,
+                    keyword TEXT NOT NULL, count INTEGER NOT NULL,
+                    PRIMARY KEY (granularity, ticker, bucket, source, keyword)) WITHOUT ROWID;
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def _article_id(news):
+        """以連結（沒有連結時用標題）的雜湊值作為文章ID"""
+        identity = news.get("link") or news.get("title", "")
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _article_time(news, sentiment_item):
+        """取得文章發布時間，無法解析時使用當前時間"""
+        date = news.get("date")
+        if isinstance(date, datetime):
+            return date
+        for value in (news.get("published_time"), sentiment_item.get("date"), date):
+            if isinstance(value, str):
+                try:
+                    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    continue
+        return datetime.now()
+
+    @staticmethod
+    def _article_source(news):
+        """文章來源平台，Yahoo爬蟲沒有platform字段時使用發布媒體"""
+        return news.get("platform") or news.get("source") or "未知"
+
+    def add(self, ticker, news_list, sentiment_results):
+        """
+        把一次情感分析的結果加入每日和每小時匯總，已匯總過的文章和示例數據會被跳過
+
+        參數:
+            ticker: 股票代號或關鍵字
+            news_list: 新聞列表
+            sentiment_results: SentimentAnalyzer.analyze的結果，news_sentiments與news_list逐一對應
+
+        返回:
+            int: 新加入匯總的文章數
+        """
+        news_sentiments = sentiment_results.get("news_sentiments", [])
+        keywords = sentiment_results.get("keywords", [])
+        if not news_list or not news_sentiments:
+            return 0
+
+        with self._lock:
+            pairs = {}
+            for news, item in zip(news_list, news_sentiments):
+                # 爬取失敗時生成的示例數據不計入匯總
+                if news.get("is_sample"):
+                    continue
+                pairs.setdefault(self._article_id(news), (news, item))
+            id_list = list(pairs)
+            existing = set()
+            for start in range(0, len(id_list), 500):
+                chunk = id_list[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                existing.update(row[0] for row in self._conn.execute(
+                    f"SELECT id FROM rollup_articles WHERE ticker = ? AND id IN ({placeholders})", [ticker] + chunk))
+            new_pairs = [(article_id, pair) for article_id, pair in pairs.items() if article_id not in existing]
+            if not new_pairs:
+                return 0
+
+            rollup_rows = {}
+            keyword_rows = {}
+            for _, (news, item) in new_pairs:
+                published = self._article_time(news, item)
+                source = self._article_source(news)
+                compound = item["sentiment"]["compound"]
+                label = item.get("label")
+                text = news.get("title", "") + " " + (news.get("summary") or "")
+                # 本批分析的關鍵詞中，該文章提到的詞計入匯總
+                mentioned = [keyword for keyword in keywords if keyword in text]
+
+                for granularity, bucket_format in self.GRANULARITIES.items():
+                    key = (granularity, published.strftime(bucket_format), source)
+                    n_pos, n_neg, n_neu, total = rollup_rows.get(key, (0, 0, 0, 0.0))
+                    rollup_rows[key] = (
+                        n_pos + (label == "積極"),
+                        n_neg + (label == "消極"),
+                        n_neu + (label not in ("積極", "消極")),
+                        total + compound
+                    )
+                    for keyword in mentioned:
+                        keyword_rows[key + (keyword,)] = keyword_rows.get(key + (keyword,), 0) + 1
+
+            self._conn.executemany("INSERT INTO rollup_articles (id, ticker) VALUES (?, ?)",
+                                   [(article_id, ticker) for article_id, _ in new_pairs])
+            self._conn.executemany(
+                "INSERT INTO rollups (granularity, ticker, bucket, source, n_positive, n_negative, n_neutral, sum_compound) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(granularity, ticker, bucket, source) DO UPDATE SET "
+                "n_positive = n_positive + excluded.n_positive, n_negative = n_negative + excluded.n_negative, "
+                "n_neutral = n_neutral + excluded.n_neutral, sum_compound = sum_compound + excluded.sum_compound",
+                [(granularity, ticker, bucket, source) + values
+                 for (granularity, bucket, source), values in rollup_rows.items()])
+            self._conn.executemany(
+                "INSERT INTO rollup_keywords (granularity, ticker, bucket, source, keyword, count) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(granularity, ticker, bucket, source, keyword) DO UPDATE SET count = count + excluded.count",
+                [(granularity, ticker, bucket, source, keyword, count)
+                 for (granularity, bucket, source, keyword), count in keyword_rows.items()])
+            self._conn.commit()
+
+        return len(new_pairs)
+
+    def _bucket_range(self, granularity, start, end):
+        """把起止時間轉換為時間桶字符串，默認為最近30天"""
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"不支持的匯總粒度: {granularity}")
+        bucket_format = self.GRANULARITIES[granularity]
+        end = end or datetime.now()
+        if start is None:
+            end_time = end if isinstance(end, datetime) else datetime.strptime(end, bucket_format)
+            start = end_time - timedelta(days=30)
+        start = start.strftime(bucket_format) if isinstance(start, datetime) else start
+        end = end.strftime(bucket_format) if isinstance(end, datetime) else end
+        return start, end
+
+    def query(self, ticker, start=None, end=None, granularity="day", source=None, top_keywords=5):
+        """
+        查詢時間範圍內每個時間桶的情感匯總
+
+        參數:
+            ticker: 股票代號或關鍵字
+            start: 起始時間（datetime或時間桶字符串），默認為30天前
+            end: 結束時間（datetime或時間桶字符串），默認為現在
+            granularity: "day" 或 "hour"
+            source: 可選，只查詢指定來源，默認合併所有來源
+            top_keywords: 每個時間桶返回的關鍵詞數量
+
+        返回:
+            list: 按時間排序的匯總，每項包含各標籤數量、平均複合得分和關鍵詞
+        """
+        start, end = self._bucket_range(granularity, start, end)
+        source_filter = " AND source = ?" if source else ""
+        params = [granularity, ticker, start, end] + ([source] if source else [])
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT bucket, SUM(n_positive), SUM(n_negative), SUM(n_neutral), SUM(sum_compound) FROM rollups "
+                f"WHERE granularity = ? AND ticker = ? AND bucket BETWEEN ? AND ?{source_filter} "
+                "GROUP BY bucket ORDER BY bucket", params).fetchall()
+            keyword_rows = self._conn.execute(
+                "SELECT bucket, keyword, SUM(count) AS total FROM rollup_keywords "
+                f"WHERE granularity = ? AND ticker = ? AND bucket BETWEEN ? AND ?{source_filter} "
+                "GROUP BY bucket, keyword ORDER BY bucket, total DESC", params).fetchall()
+
+        bucket_keywords = {}
+        for bucket, keyword, _ in keyword_rows:
+            keywords = bucket_keywords.setdefault(bucket, [])
+            if len(keywords) < top_keywords:
+                keywords.append(keyword)
+
+        history = []
+        for bucket, n_pos, n_neg, n_neu, total in rows:
+            count = n_pos + n_neg + n_neu
+            history.append({
+                "bucket": bucket,
+                "count": count,
+                "positive": n_pos,
+                "negative": n_neg,
+                "neutral": n_neu,
+                "avg_compound": total / count if count else 0,
+                "keywords": bucket_keywords.get(bucket, [])
+            })
+        return history
+
+    def summary(self, ticker, start=None, end=None, granularity="day", source=None, top_keywords=10):
+        """
+        匯總整個時間範圍的情感，結構與SentimentAnalyzer.analyze的整體結果相近
+
+        返回:
+            dict: 整體情感、信心指數、平均複合得分、各標籤數量和關鍵詞
+        """
+        start, end = self._bucket_range(granularity, start, end)
+        source_filter = " AND source = ?" if source else ""
+        params = [granularity, ticker, start, end] + ([source] if source else [])
+
+        with self._lock:
+            n_pos, n_neg, n_neu, total = self._conn.execute(
+                "SELECT COALESCE(SUM(n_positive), 0), COALESCE(SUM(n_negative), 0), COALESCE(SUM(n_neutral), 0), "
+                "COALESCE(SUM(sum_compound), 0) FROM rollups "
+                f"WHERE granularity = ? AND ticker = ? AND bucket BETWEEN ? AND ?{source_filter}", params).fetchone()
+            keywords = [row[0] for row in self._conn.execute(
+                "SELECT keyword, SUM(count) AS total FROM rollup_keywords "
+                f"WHERE granularity = ? AND ticker = ? AND bucket BETWEEN ? AND ?{source_filter} "
+                "GROUP BY keyword ORDER BY total DESC LIMIT ?", params + [top_keywords])]
+
+        count = n_pos + n_neg + n_neu
+        avg_compound = total / count if count else 0
+        if avg_compound >= 0.05:
+            overall_sentiment = "積極"
+        elif avg_compound <= -0.05:
+            overall_sentiment = "消極"
+        else:
+            overall_sentiment = "中性"
+
+        return {
+            "overall_sentiment": overall_sentiment,
+            "confidence": abs(avg_compound),
+            "avg_compound": avg_compound,
+            "count": count,
+            "positive": n_pos,
+            "negative": n_neg,
+            "neutral": n_neu,
+            "keywords": keywords
+        }
+
+    def close(self):
+        """關閉數據庫連接"""
+        with self._lock:
+            self._conn.close()
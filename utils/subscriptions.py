@@ -0,0 +1,217 @@
+import hashlib
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from analysis.metrics import metrics
+
+from .news_store import NewsStore
+
+
+class SubscriberLimitError(Exception):
+    """訂閱的客戶端數已達上限"""
+
+
+class Subscriber:
+    """一個訂閱客戶端，推送的事件放在有界隊列中，由SSE響應逐個取出"""
+
+    def __init__(self, tickers, max_queue=100):
+        self.tickers = tickers
+        self.events = queue.Queue(maxsize=max_queue)
+        self.closed = False
+        self.overflowed = False
+
+    def push(self, event, data):
+        """
+        放入一個事件；客戶端讀取太慢導致隊列已滿時標記為溢出並停止推送
+
+        返回:
+            bool: 是否成功放入
+        """
+        if self.closed:
+            return False
+        try:
+            self.events.put_nowait((event, data))
+            return True
+        except queue.Full:
+            self.overflowed = True
+            self.closed = True
+            return False
+
+    def next_event(self, timeout):
+        """取出下一個事件，超時返回None"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class SubscriptionHub:
+    """
+    新文章推送中心
+
+    所有客戶端訂閱的股票合併為一個集合，由一個後台線程按固定週期輪詢：每個股票每週期只爬取一次，
+    與訂閱它的客戶端數量無關。每個股票記住已推送過的文章，只有新文章會經過情感分析並推送給訂閱者。
+    第一次爬取只建立基準，不推送已有文章。
+    """
+
+    def __init__(self, crawl, analyze, interval=300, max_clients=200, max_queue=100, seen_limit=2000):
+        """
+        初始化推送中心
+
+        參數:
+            crawl: 爬取函數，接收股票代號，返回新聞列表
+            analyze: 情感分析函數，接收(股票代號, 新聞列表)，返回與news_list逐一對應的news_sentiments
+            interval: 每個股票的輪詢週期（秒）
+            max_clients: 同時訂閱的客戶端數上限
+            max_queue: 每個客戶端未讀取事件的上限，超過時斷開該客戶端
+            seen_limit: 每個股票記住的已推送文章數
+        """
+        self.crawl = crawl
+        self.analyze = analyze
+        self.interval = interval
+        self.max_clients = max_clients
+        self.max_queue = max_queue
+        self.seen_limit = seen_limit
+
+        self._subscribers = set()
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _article_id(news):
+        """以連結（沒有連結時用標題）的雜湊值作為文章ID"""
+        identity = news.get("link") or news.get("title", "")
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    def subscribe(self, tickers):
+        """
+        登記訂閱，新股票會在下一輪立即爬取以建立基準
+
+        參數:
+            tickers: 股票代號或關鍵字列表
+
+        返回:
+            Subscriber: 訂閱對象
+        """
+        subscriber = Subscriber([NewsStore.normalize_keyword(ticker) for ticker in tickers], self.max_queue)
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                raise SubscriberLimitError(f"訂閱的客戶端數已達上限({self.max_clients})")
+            self._subscribers.add(subscriber)
+            for ticker, display in zip(subscriber.tickers, tickers):
+                state = self._watched.get(ticker)
+                if state is None:
+                    self._watched[ticker] = {"keyword": display, "next_poll": 0, "seen": None}
+                elif state["seen"] is not None:
+                    # 已有基準的股票直接通知，之後與其他訂閱者一起收到新文章
+                    subscriber.push("ready", {"ticker": state["keyword"], "known_articles": len(state["seen"])})
+            self._publish()
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="subscription-poller", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """取消訂閱，沒有訂閱者的股票不再輪詢"""
+        with self._lock:
+            subscriber.closed = True
+            self._subscribers.discard(subscriber)
+            active = {ticker for sub in self._subscribers for ticker in sub.tickers}
+            for ticker in list(self._watched):
+                if ticker not in active:
+                    del self._watched[ticker]
+            self._publish()
+
+    def _publish(self):
+        """更新量表（需持有鎖）"""
+        metrics.set("subscription_clients", len(self._subscribers))
+        metrics.set("subscription_tickers", len(self._watched))
+
+    def _run(self):
+        """輪詢線程：逐個爬取到期的股票，沒有到期的股票時等待"""
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                now = time.time()
+                due = [ticker for ticker, state in self._watched.items() if state["next_poll"] <= now]
+                next_poll = min((state["next_poll"] for state in self._watched.values()), default=now + self.interval)
+
+            if not due:
+                self._wakeup.wait(max(0.1, next_poll - now))
+                self._wakeup.clear()
+                continue
+
+            for ticker in due:
+                self.poll(ticker)
+
+    def poll(self, ticker):
+        """
+        爬取一個股票並把新文章推送給訂閱者
+
+        返回:
+            int: 推送的新文章數
+        """
+        with self._lock:
+            state = self._watched.get(ticker)
+            if state is None:
+                return 0
+            state["next_poll"] = time.time() + self.interval
+            keyword = state["keyword"]
+
+        try:
+            news_list = self.crawl(keyword)
+        except Exception as e:
+            print(f"輪詢 '{keyword}' 時發生錯誤: {e}")
+            metrics.inc("subscription_poll_errors_total")
+            return 0
+        metrics.inc("subscription_polls_total")
+
+        with self._lock:
+            state = self._watched.get(ticker)
+            if state is None:
+                return 0
+            baseline = state["seen"] is None
+            seen = state["seen"] if not baseline else OrderedDict()
+            new_news = []
+            for news in news_list:
+                if news.get("is_sample"):
+                    continue
+                article_id = self._article_id(news)
+                if article_id in seen:
+                    continue
+                seen[article_id] = True
+                new_news.append(news)
+            while len(seen) > self.seen_limit:
+                seen.popitem(last=False)
+            state["seen"] = seen
+            subscribers = [sub for sub in self._subscribers if ticker in sub.tickers]
+
+        if baseline:
+            for subscriber in subscribers:
+                subscriber.push("ready", {"ticker": keyword, "known_articles": len(new_news)})
+            return 0
+        if not new_news:
+            return 0
+
+        # 只對新文章做情感分析，多個訂閱者共用同一份結果
+        sentiments = self.analyze(keyword, new_news)
+        articles = []
+        for news, item in zip(new_news, sentiments):
+            article = dict(news)
+            article["sentiment"] = item["sentiment"]
+            article["label"] = item["label"]
+            articles.append(article)
+
+        payload = {"ticker": keyword, "count": len(articles), "articles": articles}
+        for subscriber in subscribers:
+            subscriber.push("news", payload)
+        metrics.inc("subscription_articles_pushed_total", len(articles))
+        return len(articles)